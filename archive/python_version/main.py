@@ -13,6 +13,10 @@ async def main():
                       help='Job title to search for')
     parser.add_argument('--limit', type=int, default=3, 
                       help='Number of jobs to process')
+    parser.add_argument('--concurrency', type=int, default=3,
+                      help='Number of jobs to process at the same time')
+    parser.add_argument('--delay', type=float, default=1.0,
+                      help='Minimum seconds between job page loads')
     args = parser.parse_args()
 
     # Initialize the appropriate job board
@@ -36,19 +40,29 @@ async def main():
             jobs = await board.extract_job_listings(page)
             print(f"\nFound {len(jobs)} jobs")
             
-            # Process jobs
-            processed_jobs = []
-            for i, job in enumerate(jobs[:args.limit]):
-                print(f"\nProcessing job {i+1}/{args.limit}: {job['position']} at {job['company']}")
-                
-                # Process job in a new browser window
-                processed_job = await board.process_job(job, playwright)
-                if processed_job:
-                    processed_jobs.append(processed_job)
-                
-                # Wait between jobs to avoid rate limiting
-                if i < args.limit - 1:
-                    await asyncio.sleep(3)
+            # Process jobs concurrently, spacing out page loads to avoid rate limiting
+            semaphore = asyncio.Semaphore(max(1, args.concurrency))
+            throttle = asyncio.Lock()
+            next_start = 0
+            total = min(len(jobs), args.limit)
+            
+            async def run(i, job):
+                nonlocal next_start
+                async with semaphore:
+                    async with throttle:
+                        loop = asyncio.get_running_loop()
+                        wait_for = next_start - loop.time()
+                        if wait_for > 0:
+                            await asyncio.sleep(wait_for)
+                        next_start = loop.time() + args.delay
+                    
+                    print(f"\nProcessing job {i+1}/{total}: {job['position']} at {job['company']}")
+                    
+                    # Process job in a new browser window
+                    return await board.process_job(job, playwright)
+            
+            results = await asyncio.gather(*(run(i, job) for i, job in enumerate(jobs[:args.limit])))
+            processed_jobs = [job for job in results if job]
             
             print(f"\nSuccessfully processed {len(processed_jobs)} jobs")
             
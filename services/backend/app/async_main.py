@@ -0,0 +1,351 @@
+"""The jobs API on aiohttp, for serving many concurrent status watchers from one process.
+
+Serves the same /api/jobs contract as app/main.py, with redis.asyncio for
+Redis and pymongo calls run in threads, so a request waiting on a store or
+an event stream waiting on a worker does not hold a thread:
+
+    gunicorn app.async_main:create_app --bind 0.0.0.0:5000 --worker-class aiohttp.GunicornWebWorker
+    python -m app.async_main
+
+Workers (app/worker.py) are unchanged and serve both.
+"""
+import asyncio
+import contextvars
+import json
+import os
+import time
+import uuid
+from datetime import date, datetime
+
+import redis.asyncio as aioredis
+from aiohttp import web
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from werkzeug.http import http_date
+
+from app.db.listings import first_results, job_results
+from app.db.mongodb import ensure_indexes
+from app.queue.job_index import add_job, page_job_ids_async, remove_job
+from app.queue.job_queue import AsyncJobQueue, QueueFullError
+from app.queue.progress import FINISHED_STATUSES, EventNotifier, events_key, format_event, parse_event_id
+from app.queue.search_cache import AsyncSearchCache, search_key
+from job_boards.metrics import API_REQUEST_SECONDS, QUEUE_DEPTH, metrics_enabled, render_metrics
+from job_boards.tracing import span
+
+# Load environment variables
+load_dotenv()
+
+# Same settings as app/main.py
+REDIS_HOST = os.getenv("REDIS_HOST", "redis")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://mongodb:27017")
+JOB_LIMIT_MAX = int(os.getenv("JOB_LIMIT_MAX", 50))
+LIST_JOBS_DEFAULT_LIMIT = int(os.getenv("LIST_JOBS_DEFAULT_LIMIT", 50))
+LIST_JOBS_MAX_LIMIT = int(os.getenv("LIST_JOBS_MAX_LIMIT", 200))
+SSE_HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", 15))
+
+REDIS = web.AppKey("redis", aioredis.Redis)
+DB = web.AppKey("db", object)
+JOB_QUEUE = web.AppKey("job_queue", AsyncJobQueue)
+SEARCH_CACHE = web.AppKey("search_cache", AsyncSearchCache)
+NOTIFIER = web.AppKey("notifier", EventNotifier)
+
+# Set per request by the middleware; the response prepare hook runs in the same task
+_request_start = contextvars.ContextVar("request_start", default=None)
+
+# What flask-cors answers preflight requests with
+CORS_METHODS = "DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+
+
+def _json_default(value):
+    # Dates as Flask's jsonify writes them
+    if isinstance(value, (date, datetime)):
+        return http_date(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data):
+    return json.dumps(data, default=_json_default)
+
+
+def json_response(data, status=200, headers=None):
+    return web.json_response(data, status=status, headers=headers, dumps=dumps)
+
+
+def int_arg(request, name, default):
+    """Query parameter as an int, falling back to default like Flask's request.args.get(type=int)."""
+    try:
+        return int(request.query[name])
+    except (KeyError, ValueError):
+        return default
+
+
+@web.middleware
+async def preflight(request, handler):
+    _request_start.set(time.perf_counter())
+    if request.method == "OPTIONS" and "Access-Control-Request-Method" in request.headers:
+        headers = {"Access-Control-Allow-Methods": CORS_METHODS}
+        if "Access-Control-Request-Headers" in request.headers:
+            headers["Access-Control-Allow-Headers"] = request.headers["Access-Control-Request-Headers"]
+        return web.Response(headers=headers)
+    return await handler(request)
+
+
+async def on_response_prepare(request, response):
+    response.headers.setdefault("Access-Control-Allow-Origin", "*")
+    # Runs as the headers are sent, so event streams are timed to their first byte like in app/main.py
+    start = _request_start.get()
+    if start is not None:
+        API_REQUEST_SECONDS.labels(request.match_info.route.name or "unknown", request.method, response.status).observe(
+            time.perf_counter() - start
+        )
+
+
+async def metrics(request):
+    if not metrics_enabled():
+        return json_response({"error": "Metrics are disabled"}, 404)
+    job_queue = request.app[JOB_QUEUE]
+    QUEUE_DEPTH.labels('pending').set(await job_queue.depth())
+    QUEUE_DEPTH.labels('in_flight').set(await job_queue.in_flight())
+    body, content_type = render_metrics()
+    return web.Response(body=body, headers={"Content-Type": content_type})
+
+
+async def create_job(request):
+    redis_client, search_cache = request.app[REDIS], request.app[SEARCH_CACHE]
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+
+    # Validate required fields
+    if not isinstance(data, dict) or 'board' not in data or 'title' not in data:
+        return json_response({"error": "Missing required fields"}, 400)
+    limit = data.get('limit', 3)
+    if isinstance(limit, bool) or not isinstance(limit, int) or not 1 <= limit <= JOB_LIMIT_MAX:
+        return json_response({"error": f"limit must be an integer from 1 to {JOB_LIMIT_MAX}"}, 400)
+
+    job_id = str(uuid.uuid4())
+    # The job's trace starts here and continues in the worker through the queued message
+    with span("create_job", job_id=job_id, board=data['board'], title=data['title']) as root:
+        force_refresh = bool(data.get('force_refresh', False))
+
+        # Reuse a pending, running or recently completed identical search
+        key = search_key(data['board'], data['title'], limit)
+        existing_id = await search_cache.claim(key, job_id, force=force_refresh)
+        if existing_id:
+            root.set_attribute("attached_to", existing_id)
+            status = await redis_client.hget(f"job:{existing_id}", "status") or "pending"
+            results = []
+            if status == "completed":
+                results = await asyncio.to_thread(job_results, request.app[DB], existing_id)
+            return json_response({
+                "job_id": existing_id,
+                "status": status,
+                "message": "Attached to an identical search",
+                "results": results
+            })
+
+        job_data = {
+            "board": data['board'],
+            "title": data['title'],
+            "limit": limit,
+            "search_key": key,
+            "status": "pending",
+            "created_at": datetime.utcnow().isoformat()
+        }
+        if root.traceparent:
+            job_data["traceparent"] = root.traceparent
+        pipe = redis_client.pipeline()
+        pipe.hset(f"job:{job_id}", mapping=job_data)
+        add_job(pipe, job_id)
+        await pipe.execute()
+
+        # Queue job for the workers, shedding load when they are too far behind
+        try:
+            await request.app[JOB_QUEUE].enqueue({
+                "job_id": job_id,
+                "board": data['board'],
+                "title": data['title'],
+                "limit": limit,
+                "force_refresh": force_refresh,
+                "search_key": key,
+                "traceparent": root.traceparent
+            })
+        except QueueFullError:
+            await redis_client.delete(f"job:{job_id}")
+            await remove_job(redis_client, job_id)
+            await search_cache.release(key, job_id)
+            return json_response({"error": "Too many pending jobs, try again later"}, 429, {"Retry-After": "30"})
+
+        return json_response({
+            "job_id": job_id,
+            "status": "pending",
+            "message": "Job created successfully"
+        })
+
+
+async def get_job_status(request):
+    job_id = request.match_info["job_id"]
+    job_data = await request.app[REDIS].hgetall(f"job:{job_id}")
+    if not job_data:
+        return json_response({"error": "Job not found"}, 404)
+
+    results = []
+    if job_data.get("status") == "completed":
+        results = await asyncio.to_thread(job_results, request.app[DB], job_id)
+
+    return json_response({
+        "job_id": job_id,
+        "status": job_data.get("status", "unknown"),
+        "progress": float(job_data.get("progress", 0)),
+        "result": results[0] if results else None,
+        "results": results,
+        "error": job_data.get("error")
+    })
+
+
+async def job_events(request):
+    job_id = request.match_info["job_id"]
+    redis_client, notifier = request.app[REDIS], request.app[NOTIFIER]
+    job_data = await redis_client.hgetall(f"job:{job_id}")
+    if not job_data:
+        return json_response({"error": "Job not found"}, 404)
+
+    key = events_key(job_id)
+    last_id = request.headers.get("Last-Event-ID") or request.query.get("last_event_id")
+    if last_id and parse_event_id(last_id) is None:
+        return json_response({"error": "Invalid Last-Event-ID"}, 400)
+    if last_id and job_data.get("status") in FINISHED_STATUSES and not await redis_client.xrange(
+            key, min=f"({last_id}", max="+", count=1):
+        # Reconnected after the job finished with nothing left to send; 204 stops EventSource reconnecting
+        return web.Response(status=204)
+
+    response = web.StreamResponse(headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    response.content_type = "text/event-stream"
+    response.charset = "utf-8"
+    await response.prepare(request)
+
+    # Watch before reading history so no event can slip between the two
+    waiter = notifier.watch(job_id)
+    try:
+        if not last_id:
+            # Current state first, for clients that just connected
+            await response.write(format_event("snapshot", json.dumps({"job_id": job_id, **job_data})).encode())
+            if job_data.get("status") in FINISHED_STATUSES:
+                return response
+
+        last_beat = time.monotonic()
+        while True:
+            waiter.clear()
+            # Read the status before the events; the final status and its event are written together
+            finished = await redis_client.hget(f"job:{job_id}", "status") in (None, *FINISHED_STATUSES)
+
+            # Send everything after the last delivered event
+            start = f"({last_id}" if last_id else "-"
+            for event_id, fields in await redis_client.xrange(key, min=start, max="+"):
+                last_id = event_id
+                await response.write(format_event(fields["event"], fields["data"], event_id).encode())
+                if fields["event"] == "status" and json.loads(fields["data"]).get("status") in FINISHED_STATUSES:
+                    return response
+                last_beat = time.monotonic()
+
+            if finished:
+                # The job is done (or expired) and its remaining events were trimmed or already sent
+                return response
+
+            # Wait for the worker to announce new events
+            try:
+                await asyncio.wait_for(waiter.wait(), max(0.0, last_beat + SSE_HEARTBEAT_INTERVAL - time.monotonic()))
+            except asyncio.TimeoutError:
+                await response.write(b": heartbeat\n\n")
+                last_beat = time.monotonic()
+    except ConnectionResetError:
+        # The client went away
+        return response
+    finally:
+        notifier.unwatch(job_id, waiter)
+
+
+async def list_jobs(request):
+    redis_client = request.app[REDIS]
+    # Page through job ids newest first; "after" is the last job id of the previous page
+    limit = min(max(int_arg(request, "limit", LIST_JOBS_DEFAULT_LIMIT), 1), LIST_JOBS_MAX_LIMIT)
+    job_ids = await page_job_ids_async(redis_client, limit + 1, after=request.query.get("after"))
+    if job_ids is None:
+        return json_response({"error": "Unknown cursor"}, 400)
+
+    has_more = len(job_ids) > limit
+    job_ids = job_ids[:limit]
+
+    # Fetch every job hash in one round trip
+    pipe = redis_client.pipeline(transaction=False)
+    for job_id in job_ids:
+        pipe.hgetall(f"job:{job_id}")
+    job_hashes = await pipe.execute()
+
+    # Get results of completed jobs from MongoDB in a single query
+    completed = [job_id for job_id, job_data in zip(job_ids, job_hashes)
+                 if job_data.get("status") == "completed"]
+    results = await asyncio.to_thread(first_results, request.app[DB], completed) if completed else {}
+
+    jobs = []
+    for job_id, job_data in zip(job_ids, job_hashes):
+        if not job_data:
+            continue
+        jobs.append({
+            "job_id": job_id,
+            "status": job_data.get("status", "unknown"),
+            "progress": float(job_data.get("progress", 0)),
+            "result": results.get(job_id),
+            "error": job_data.get("error")
+        })
+
+    headers = {"X-Next-Cursor": job_ids[-1]} if has_more else None
+    return json_response(jobs, headers=headers)
+
+
+def build_app(redis_client, db):
+    """The API on the given redis.asyncio client and pymongo database."""
+    app = web.Application(middlewares=[preflight])
+    app[REDIS] = redis_client
+    app[DB] = db
+    app[JOB_QUEUE] = AsyncJobQueue(redis_client)
+    app[SEARCH_CACHE] = AsyncSearchCache(redis_client)
+    app[NOTIFIER] = EventNotifier(redis_client)
+
+    async def start_notifier(app):
+        app[NOTIFIER].start()
+
+    async def close_notifier(app):
+        await app[NOTIFIER].close()
+
+    app.on_startup.append(start_notifier)
+    app.on_cleanup.append(close_notifier)
+    app.on_response_prepare.append(on_response_prepare)
+
+    app.router.add_get("/metrics", metrics, name="metrics")
+    app.router.add_post("/api/jobs", create_job, name="create_job")
+    app.router.add_get("/api/jobs", list_jobs, name="list_jobs")
+    app.router.add_get("/api/jobs/{job_id}", get_job_status, name="get_job_status")
+    app.router.add_get("/api/jobs/{job_id}/events", job_events, name="job_events")
+    return app
+
+
+async def create_app(argv=None):
+    """App factory for gunicorn's aiohttp worker and python -m aiohttp.web."""
+    redis_client = aioredis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
+    mongo_client = MongoClient(MONGODB_URI)
+    await asyncio.to_thread(ensure_indexes, mongo_client.jobboard)
+    app = build_app(redis_client, mongo_client.jobboard)
+
+    async def close_clients(app):
+        await redis_client.aclose()
+        mongo_client.close()
+
+    app.on_cleanup.append(close_clients)
+    return app
+
+
+if __name__ == "__main__":
+    web.run_app(create_app(), host="0.0.0.0", port=5000)
@@ -0,0 +1,206 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+from pymongo import UpdateOne
+from job_boards.metrics import MONGO_WRITE_SECONDS, record_failure
+from job_boards.seen_index import listing_hash
+from job_boards.tracing import span
+
+# Write buffer configuration
+LISTING_WRITE_BATCH_SIZE = int(os.getenv('LISTING_WRITE_BATCH_SIZE', 50))
+LISTING_WRITE_MAX_DELAY = float(os.getenv('LISTING_WRITE_MAX_DELAY', 2.0))
+LISTING_WRITE_MAX_ATTEMPTS = int(os.getenv('LISTING_WRITE_MAX_ATTEMPTS', 3))
+
+
+class ListingWriteError(Exception):
+    """Raised to a job whose listings could not be written."""
+
+
+def listing_key(listing):
+    """Id a listing is stored under: the board's id, else its URL, else a hash of its data."""
+    if listing.get("job_id"):
+        return str(listing["job_id"])
+    if listing.get("job_url"):
+        return listing["job_url"]
+    return f"sha256:{listing_hash(listing)}"
+
+
+class _PendingWrite:
+    """A buffered listing upsert and the job membership that goes with it."""
+
+    __slots__ = ("job_id", "listing_op", "membership_op", "attempts")
+
+    def __init__(self, job_id, listing_op, membership_op):
+        self.job_id = job_id
+        self.listing_op = listing_op
+        self.membership_op = membership_op
+        self.attempts = 0
+
+
+class ListingWriter:
+    """Buffers processed listings and writes them with unordered bulk upserts.
+
+    Listings are keyed on (board, listing_id), so a listing scraped again by
+    a later job updates the existing document. Which jobs found a listing,
+    and at what rank, is kept in ``job_listings`` with one document per job
+    and listing, so listings found by many jobs do not grow. The buffer is
+    flushed once it holds ``batch_size`` listings or its oldest entry is
+    ``max_delay`` seconds old.
+
+    A failed batch stays buffered and is retried with the next flush; the
+    upserts are idempotent, so retrying a partly applied batch is safe.
+    Writes that failed ``max_attempts`` times are dropped, and the job they
+    belong to finds out from raise_for_job().
+    """
+
+    def __init__(self, listings, job_listings, batch_size=LISTING_WRITE_BATCH_SIZE,
+                 max_delay=LISTING_WRITE_MAX_DELAY, max_attempts=LISTING_WRITE_MAX_ATTEMPTS):
+        self.listings = listings
+        self.job_listings = job_listings
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self._pending = []
+        self._oldest = None
+        self._failed = {}
+        self._lock = asyncio.Lock()
+
+    async def add(self, job_id, board, rank, listing):
+        now = datetime.utcnow()
+        listing_id = listing_key(listing)
+        await self._queue(job_id, board, listing_id, rank, UpdateOne(
+            {"board": board, "listing_id": listing_id},
+            {
+                "$set": {"data": listing, "updated_at": now},
+                "$setOnInsert": {"created_at": now}
+            },
+            upsert=True
+        ))
+
+    async def link(self, job_id, board, rank, listing):
+        """Record that a job found a listing that was already stored, without overwriting it."""
+        now = datetime.utcnow()
+        listing_id = listing_key(listing)
+        await self._queue(job_id, board, listing_id, rank, UpdateOne(
+            {"board": board, "listing_id": listing_id},
+            # Only used if the stored listing has gone missing
+            {"$setOnInsert": {"data": listing, "created_at": now, "updated_at": now}},
+            upsert=True
+        ))
+
+    async def _queue(self, job_id, board, listing_id, rank, listing_op):
+        membership_op = UpdateOne(
+            {"job_id": job_id, "board": board, "listing_id": listing_id},
+            {"$set": {"rank": rank}},
+            upsert=True
+        )
+        self._pending.append(_PendingWrite(job_id, listing_op, membership_op))
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush_if_due(self):
+        if self._oldest is not None and time.monotonic() - self._oldest >= self.max_delay:
+            await self.flush()
+
+    async def flush(self):
+        """Write everything buffered so far; a failed batch is kept for the next flush."""
+        async with self._lock:
+            pending, self._pending, self._oldest = self._pending, [], None
+            if not pending:
+                return
+            try:
+                with MONGO_WRITE_SECONDS.labels('bulk_upsert').time(), span("mongo.bulk_write", operations=len(pending)):
+                    await asyncio.to_thread(
+                        self.listings.bulk_write, [write.listing_op for write in pending], ordered=False
+                    )
+                # After the listings, so a job's results never point at a listing that is not stored yet
+                with MONGO_WRITE_SECONDS.labels('link_jobs').time(), span("mongo.bulk_write", operations=len(pending)):
+                    await asyncio.to_thread(
+                        self.job_listings.bulk_write, [write.membership_op for write in pending], ordered=False
+                    )
+            except Exception as e:
+                record_failure('mongo_write', e)
+                print(f"Error writing {len(pending)} listings: {str(e)}")
+                self._requeue(pending, e)
+
+    def _requeue(self, pending, error):
+        retry = []
+        for write in pending:
+            write.attempts += 1
+            if write.attempts < self.max_attempts:
+                retry.append(write)
+            else:
+                self._failed.setdefault(write.job_id, error)
+        if retry:
+            self._pending = retry + self._pending
+            # Wait a full max_delay before trying again
+            self._oldest = time.monotonic()
+
+    def raise_for_job(self, job_id):
+        """Raise ListingWriteError if some of a job's listings were dropped or are still unwritten.
+
+        Call after flush(). The job's writes that are still buffered are
+        discarded, since the job fails and is retried as a whole.
+        """
+        error = self._failed.pop(job_id, None)
+        unwritten = [write for write in self._pending if write.job_id == job_id]
+        if error is None and not unwritten:
+            return
+        self._pending = [write for write in self._pending if write.job_id != job_id]
+        if not self._pending:
+            self._oldest = None
+        raise ListingWriteError(f"Could not store the listings of job {job_id}: {str(error or 'write pending')}") from error
+
+    async def run_periodic_flush(self, stopping):
+        """Flush on the time threshold until stopping is set, then flush what is left."""
+        while not stopping.is_set():
+            try:
+                await asyncio.wait_for(stopping.wait(), self.max_delay / 2)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush_if_due()
+        await self.flush()
+
+
+# Joins job_listings entries to their listings; listing ids are only unique per board
+_JOIN_LISTING = [
+    {"$lookup": {"from": "listings", "localField": "listing_id", "foreignField": "listing_id", "as": "listing"}},
+    {"$project": {
+        "_id": 0, "job_id": 1, "rank": 1,
+        "listing": {"$filter": {"input": "$listing", "as": "doc", "cond": {"$eq": ["$$doc.board", "$board"]}}}
+    }},
+    {"$unwind": "$listing"},
+    {"$project": {"job_id": 1, "rank": 1, "job_data": "$listing.data", "created_at": "$listing.updated_at"}}
+]
+
+
+def job_results(db, job_id):
+    """Return every listing a job produced, in search result order."""
+    return list(db.job_listings.aggregate([
+        {"$match": {"job_id": job_id}},
+        {"$sort": {"rank": 1}},
+        *_JOIN_LISTING
+    ]))
+
+
+def first_results(db, job_ids):
+    """Return the top-ranked listing of each job with a single aggregate query."""
+    first = {}
+    for row in db.job_listings.aggregate([
+        {"$match": {"job_id": {"$in": job_ids}}},
+        {"$sort": {"job_id": 1, "rank": 1}},
+        {"$group": {
+            "_id": "$job_id",
+            "board": {"$first": "$board"},
+            "listing_id": {"$first": "$listing_id"},
+            "rank": {"$first": "$rank"}
+        }},
+        {"$addFields": {"job_id": "$_id"}},
+        *_JOIN_LISTING
+    ]):
+        first[row["job_id"]] = row
+    return first
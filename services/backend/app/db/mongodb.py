@@ -1,4 +1,4 @@
-from pymongo import MongoClient
+from pymongo import ASCENDING, MongoClient
 from flask import current_app
 
 _client = None
@@ -7,8 +7,20 @@ def init_mongodb(app):
     global _client
     if _client is None:
         _client = MongoClient(app.config.get('MONGODB_URI', 'mongodb://localhost:27017/jobboard'))
+        ensure_indexes(_client.jobboard)
+
+def ensure_indexes(db):
+    """Create the indexes the API and workers rely on; a no-op when they already exist."""
+    # One document per scraped listing; re-scrapes update it in place
+    db.listings.create_index([('board', ASCENDING), ('listing_id', ASCENDING)], unique=True)
+    # Joined to job_listings entries by listing_id
+    db.listings.create_index([('listing_id', ASCENDING)])
+    # One document per job and listing it found, with the listing's rank in the results
+    db.job_listings.create_index(
+        [('job_id', ASCENDING), ('board', ASCENDING), ('listing_id', ASCENDING)], unique=True
+    )
 
 def get_mongodb_client():
     if _client is None:
         raise RuntimeError('MongoDB client not initialized')
-    return _client.jobboard 
\ No newline at end of file
+    return _client.jobboard
@@ -1,12 +1,25 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
+import json
+import time
 import uuid
 from datetime import datetime
-import redis
-from pymongo import MongoClient
 import os
 from dotenv import load_dotenv
-from threading import Thread
+from app.db.listings import first_results, job_results
+from app.db.mongodb import init_mongodb, get_mongodb_client
+from app.queue.job_index import add_job, backfill_job_index, page_job_ids, remove_job
+from app.queue.job_queue import JobQueue, QueueFullError
+from app.queue.progress import FINISHED_STATUSES, events_key, format_event, parse_event_id
+from app.queue.redis import init_redis, get_redis_client
+from app.queue.search_cache import SearchCache, search_key
+from job_boards.analysis_cache import init_analysis_cache
+from job_boards.artifacts import init_artifact_sink
+from job_boards.metrics import API_REQUEST_SECONDS, metrics_enabled, render_metrics, update_queue_depth
+from job_boards.rate_limit import init_rate_limiter
+from job_boards.seen_index import init_seen_index
+from job_boards.storage import ARTIFACT_STORAGE, create_storage
+from job_boards.tracing import span
 
 # Load environment variables
 load_dotenv()
@@ -16,56 +29,67 @@ app = Flask(__name__)
 CORS(app)
 
 # Initialize Redis
-redis_client = redis.Redis(
-    host=os.getenv("REDIS_HOST", "redis"),
-    port=int(os.getenv("REDIS_PORT", 6379)),
-    decode_responses=True
+app.config.update(
+    REDIS_HOST=os.getenv("REDIS_HOST", "redis"),
+    REDIS_PORT=int(os.getenv("REDIS_PORT", 6379))
 )
+init_redis(app)
+redis_client = get_redis_client()
+
+# Cache Groq analyses in Redis so repeat searches skip the LLM
+init_analysis_cache(redis_client)
+
+# All workers draw from the same Groq request and token budget
+init_rate_limiter(redis_client)
+
+# Listings already analyzed and unchanged since are not scraped again
+init_seen_index(redis_client)
+
+# Jobs are handed to the worker processes (app/worker.py) through a durable queue
+job_queue = JobQueue(redis_client)
+
+# Identical searches share one job instead of each starting a scrape
+search_cache = SearchCache(redis_client)
+
+# Most listings a single job may ask for
+JOB_LIMIT_MAX = int(os.getenv("JOB_LIMIT_MAX", 50))
+
+# GET /api/jobs pages through a sorted set of job ids instead of scanning the keyspace
+LIST_JOBS_DEFAULT_LIMIT = int(os.getenv("LIST_JOBS_DEFAULT_LIMIT", 50))
+LIST_JOBS_MAX_LIMIT = int(os.getenv("LIST_JOBS_MAX_LIMIT", 200))
+backfill_job_index(redis_client)
+
+# Seconds between keep-alive comments on idle event streams
+SSE_HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", 15))
 
 # Initialize MongoDB
-mongo_client = MongoClient(os.getenv("MONGODB_URI", "mongodb://mongodb:27017"))
-db = mongo_client.jobboard
+app.config["MONGODB_URI"] = os.getenv("MONGODB_URI", "mongodb://mongodb:27017")
+init_mongodb(app)
+db = get_mongodb_client()
 
-def process_job(job_id: str, board: str, title: str, limit: int):
-    try:
-        # Update job status to processing
-        redis_client.hset(f"job:{job_id}", "status", "processing")
-        
-        # Import job board class based on board
-        board_module = __import__(f"job_boards.{board}.board", fromlist=["Board"])
-        board_class = getattr(board_module, f"{board.capitalize()}Board")
-        
-        # Initialize job board
-        board_instance = board_class(title)
-        
-        # Process jobs
-        with board_instance.playwright() as playwright:
-            jobs = board_instance.extract_job_listings(playwright)
-            total_jobs = min(len(jobs), limit)
-            
-            for i, job in enumerate(jobs[:limit]):
-                # Update progress
-                progress = (i + 1) / total_jobs * 100
-                redis_client.hset(f"job:{job_id}", "progress", progress)
-                
-                # Process job
-                processed_job = board_instance.process_job(job, playwright)
-                if processed_job:
-                    # Store in MongoDB
-                    db.jobs.insert_one({
-                        "job_id": job_id,
-                        "job_data": processed_job,
-                        "created_at": datetime.utcnow()
-                    })
-        
-        # Update job status to completed
-        redis_client.hset(f"job:{job_id}", "status", "completed")
-        redis_client.hset(f"job:{job_id}", "progress", 100)
-        
-    except Exception as e:
-        # Update job status to failed
-        redis_client.hset(f"job:{job_id}", "status", "failed")
-        redis_client.hset(f"job:{job_id}", "error", str(e))
+# Scrape artifacts go to local disk, GridFS or S3 so workers on any node can share them
+init_artifact_sink(create_storage(ARTIFACT_STORAGE, db))
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    # Event streams stay open for the whole job, so only the time to the first byte is measured
+    if "request_start" in g:
+        API_REQUEST_SECONDS.labels(request.endpoint or "unknown", request.method, response.status_code).observe(
+            time.perf_counter() - g.request_start
+        )
+    return response
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    if not metrics_enabled():
+        return jsonify({"error": "Metrics are disabled"}), 404
+    update_queue_depth(job_queue)
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
 
 @app.route("/api/jobs", methods=["POST"])
 def create_job():
@@ -74,30 +98,68 @@ def create_job():
     # Validate required fields
     if not data or 'board' not in data or 'title' not in data:
         return jsonify({"error": "Missing required fields"}), 400
-    
-    job_id = str(uuid.uuid4())
     limit = data.get('limit', 3)
+    if isinstance(limit, bool) or not isinstance(limit, int) or not 1 <= limit <= JOB_LIMIT_MAX:
+        return jsonify({"error": f"limit must be an integer from 1 to {JOB_LIMIT_MAX}"}), 400
     
-    # Store job request in Redis
-    job_data = {
-        "board": data['board'],
-        "title": data['title'],
-        "limit": limit,
-        "status": "pending",
-        "created_at": datetime.utcnow().isoformat()
-    }
-    redis_client.hmset(f"job:{job_id}", job_data)
-    
-    # Start job processing in background
-    thread = Thread(target=process_job, args=(job_id, data['board'], data['title'], limit))
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({
-        "job_id": job_id,
-        "status": "pending",
-        "message": "Job created successfully"
-    }), 200
+    job_id = str(uuid.uuid4())
+    # The job's trace starts here and continues in the worker through the queued message
+    with span("create_job", job_id=job_id, board=data['board'], title=data['title']) as root:
+        # Skip nothing: re-process listings even if they were analyzed before
+        force_refresh = bool(data.get('force_refresh', False))
+        
+        # Reuse a pending, running or recently completed identical search
+        key = search_key(data['board'], data['title'], limit)
+        existing_id = search_cache.claim(key, job_id, force=force_refresh)
+        if existing_id:
+            root.set_attribute("attached_to", existing_id)
+            existing = redis_client.hgetall(f"job:{existing_id}")
+            status = existing.get("status", "pending")
+            return jsonify({
+                "job_id": existing_id,
+                "status": status,
+                "message": "Attached to an identical search",
+                "results": job_results(db, existing_id) if status == "completed" else []
+            }), 200
+        
+        # Store job request in Redis
+        job_data = {
+            "board": data['board'],
+            "title": data['title'],
+            "limit": limit,
+            "search_key": key,
+            "status": "pending",
+            "created_at": datetime.utcnow().isoformat()
+        }
+        if root.traceparent:
+            job_data["traceparent"] = root.traceparent
+        pipe = redis_client.pipeline()
+        pipe.hset(f"job:{job_id}", mapping=job_data)
+        add_job(pipe, job_id)
+        pipe.execute()
+        
+        # Queue job for the workers, shedding load when they are too far behind
+        try:
+            job_queue.enqueue({
+                "job_id": job_id,
+                "board": data['board'],
+                "title": data['title'],
+                "limit": limit,
+                "force_refresh": force_refresh,
+                "search_key": key,
+                "traceparent": root.traceparent
+            })
+        except QueueFullError:
+            redis_client.delete(f"job:{job_id}")
+            remove_job(redis_client, job_id)
+            search_cache.release(key, job_id)
+            return jsonify({"error": "Too many pending jobs, try again later"}), 429, {"Retry-After": "30"}
+        
+        return jsonify({
+            "job_id": job_id,
+            "status": "pending",
+            "message": "Job created successfully"
+        }), 200
 
 @app.route("/api/jobs/<job_id>", methods=["GET"])
 def get_job_status(job_id):
@@ -106,47 +168,118 @@ def get_job_status(job_id):
     if not job_data:
         return jsonify({"error": "Job not found"}), 404
     
-    # Get job result from MongoDB if completed
-    result = None
+    # Get job results from MongoDB if completed
+    results = []
     if job_data.get("status") == "completed":
-        result = db.jobs.find_one({"job_id": job_id})
-        if result:
-            result.pop("_id", None)
+        results = job_results(db, job_id)
     
     return jsonify({
         "job_id": job_id,
         "status": job_data.get("status", "unknown"),
         "progress": float(job_data.get("progress", 0)),
-        "result": result,
+        "result": results[0] if results else None,
+        "results": results,
         "error": job_data.get("error")
     }), 200
 
+@app.route("/api/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    job_data = redis_client.hgetall(f"job:{job_id}")
+    if not job_data:
+        return jsonify({"error": "Job not found"}), 404
+    
+    key = events_key(job_id)
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    if last_id and parse_event_id(last_id) is None:
+        return jsonify({"error": "Invalid Last-Event-ID"}), 400
+    if last_id and job_data.get("status") in FINISHED_STATUSES and not redis_client.xrange(
+            key, min=f"({last_id}", max="+", count=1):
+        # Reconnected after the job finished with nothing left to send; 204 stops EventSource reconnecting
+        return "", 204
+    
+    def stream():
+        nonlocal last_id
+        
+        # Subscribe before reading history so no event can slip between the two
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(key)
+        try:
+            if not last_id:
+                # Current state first, for clients that just connected
+                yield format_event("snapshot", json.dumps({"job_id": job_id, **job_data}))
+                if job_data.get("status") in FINISHED_STATUSES:
+                    return
+            
+            last_beat = time.monotonic()
+            while True:
+                # Read the status before the events; the final status and its event are written together
+                finished = redis_client.hget(f"job:{job_id}", "status") in (None, *FINISHED_STATUSES)
+                
+                # Send everything after the last delivered event
+                start = f"({last_id}" if last_id else "-"
+                for event_id, fields in redis_client.xrange(key, min=start, max="+"):
+                    last_id = event_id
+                    yield format_event(fields["event"], fields["data"], event_id)
+                    if fields["event"] == "status" and json.loads(fields["data"]).get("status") in FINISHED_STATUSES:
+                        return
+                    last_beat = time.monotonic()
+                
+                if finished:
+                    # The job is done (or expired) and its remaining events were trimmed or already sent
+                    return
+                
+                # Block until the worker announces new events; the job is only read again then or for a heartbeat
+                message = pubsub.get_message(timeout=max(0.0, last_beat + SSE_HEARTBEAT_INTERVAL - time.monotonic()))
+                if message is None and time.monotonic() - last_beat >= SSE_HEARTBEAT_INTERVAL:
+                    yield ": heartbeat\n\n"
+                    last_beat = time.monotonic()
+                # One read covers every announcement queued meanwhile
+                while message is not None:
+                    message = pubsub.get_message(timeout=0)
+        finally:
+            pubsub.close()
+    
+    return Response(stream_with_context(stream()), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
 @app.route("/api/jobs", methods=["GET"])
 def list_jobs():
-    # Get all job IDs from Redis
-    job_keys = redis_client.keys("job:*")
-    jobs = []
+    # Page through job ids newest first; "after" is the last job id of the previous page
+    limit = min(max(request.args.get("limit", LIST_JOBS_DEFAULT_LIMIT, type=int), 1), LIST_JOBS_MAX_LIMIT)
+    job_ids = page_job_ids(redis_client, limit + 1, after=request.args.get("after"))
+    if job_ids is None:
+        return jsonify({"error": "Unknown cursor"}), 400
     
-    for key in job_keys:
-        job_id = key.split(":")[1]
-        job_data = redis_client.hgetall(key)
-        
-        # Get job result from MongoDB if completed
-        result = None
-        if job_data.get("status") == "completed":
-            result = db.jobs.find_one({"job_id": job_id})
-            if result:
-                result.pop("_id", None)
-        
+    has_more = len(job_ids) > limit
+    job_ids = job_ids[:limit]
+    
+    # Fetch every job hash in one round trip
+    pipe = redis_client.pipeline(transaction=False)
+    for job_id in job_ids:
+        pipe.hgetall(f"job:{job_id}")
+    job_hashes = pipe.execute()
+    
+    # Get results of completed jobs from MongoDB in a single query
+    completed = [job_id for job_id, job_data in zip(job_ids, job_hashes)
+                 if job_data.get("status") == "completed"]
+    results = first_results(db, completed) if completed else {}
+    
+    jobs = []
+    for job_id, job_data in zip(job_ids, job_hashes):
+        if not job_data:
+            continue
         jobs.append({
             "job_id": job_id,
             "status": job_data.get("status", "unknown"),
             "progress": float(job_data.get("progress", 0)),
-            "result": result,
+            "result": results.get(job_id),
             "error": job_data.get("error")
         })
     
-    return jsonify(jobs), 200
+    headers = {"X-Next-Cursor": job_ids[-1]} if has_more else {}
+    return jsonify(jobs), 200, headers
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000) 
\ No newline at end of file
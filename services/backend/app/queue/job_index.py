@@ -0,0 +1,79 @@
+import time
+from datetime import datetime, timezone
+
+JOB_INDEX_KEY = "jobs:index"
+
+
+def add_job(redis_client, job_id, created_at=None):
+    """Index a job id by its creation time; await the result with a redis.asyncio client."""
+    return redis_client.zadd(JOB_INDEX_KEY, {job_id: created_at or time.time()})
+
+
+def remove_job(redis_client, job_id):
+    return redis_client.zrem(JOB_INDEX_KEY, job_id)
+
+
+def page_job_ids(redis_client, limit, after=None):
+    """Return up to limit job ids, newest first, that come after the given cursor.
+
+    The cursor is the last job id of the previous page. Returns None when the
+    cursor is not in the index.
+    """
+    start = 0
+    if after:
+        rank = redis_client.zrevrank(JOB_INDEX_KEY, after)
+        if rank is None:
+            return None
+        start = rank + 1
+    return redis_client.zrevrange(JOB_INDEX_KEY, start, start + limit - 1)
+
+
+async def page_job_ids_async(redis_client, limit, after=None):
+    """page_job_ids() for a redis.asyncio client."""
+    start = 0
+    if after:
+        rank = await redis_client.zrevrank(JOB_INDEX_KEY, after)
+        if rank is None:
+            return None
+        start = rank + 1
+    return await redis_client.zrevrange(JOB_INDEX_KEY, start, start + limit - 1)
+
+
+def backfill_job_index(redis_client, batch_size=500):
+    """Index job hashes created before the index existed.
+
+    Uses SCAN so Redis keeps serving other clients while this runs.
+    """
+    if redis_client.exists(JOB_INDEX_KEY):
+        return 0
+
+    indexed = 0
+    keys = []
+    for key in redis_client.scan_iter(match="job:*", count=batch_size):
+        # Skip auxiliary keys such as job:<id>:events
+        if key.count(":") != 1:
+            continue
+        keys.append(key)
+        if len(keys) >= batch_size:
+            indexed += _index_keys(redis_client, keys)
+            keys = []
+    if keys:
+        indexed += _index_keys(redis_client, keys)
+    return indexed
+
+
+def _index_keys(redis_client, keys):
+    pipe = redis_client.pipeline(transaction=False)
+    for key in keys:
+        pipe.hget(key, "created_at")
+    created = pipe.execute()
+
+    scores = {}
+    for key, created_at in zip(keys, created):
+        try:
+            # created_at is stored as naive UTC
+            scores[key.split(":", 1)[1]] = datetime.fromisoformat(created_at).replace(tzinfo=timezone.utc).timestamp()
+        except (TypeError, ValueError):
+            scores[key.split(":", 1)[1]] = 0
+    redis_client.zadd(JOB_INDEX_KEY, scores)
+    return len(scores)
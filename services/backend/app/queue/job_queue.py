@@ -0,0 +1,134 @@
+import json
+import os
+import time
+
+# Queue configuration
+JOB_QUEUE_MAX_DEPTH = int(os.getenv('JOB_QUEUE_MAX_DEPTH', 1000))
+JOB_VISIBILITY_TIMEOUT = int(os.getenv('JOB_VISIBILITY_TIMEOUT', 600))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+
+# Push only while the queue is below its depth limit
+ENQUEUE_SCRIPT = """
+if redis.call('LLEN', KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('LPUSH', KEYS[1], ARGV[1])
+return 1
+"""
+
+# Move an expired message back to the consuming end of the queue
+REQUEUE_SCRIPT = """
+if redis.call('ZREM', KEYS[3], ARGV[1]) == 1 then
+    redis.call('LREM', KEYS[2], 1, ARGV[1])
+    redis.call('RPUSH', KEYS[1], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds max_depth pending jobs."""
+
+
+class QueuedJob:
+    """A reserved queue message; pass it back to ack() once handled."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.data = json.loads(raw)
+
+    @property
+    def job_id(self):
+        return self.data['job_id']
+
+
+class JobQueue:
+    """Durable Redis job queue with at-least-once delivery.
+
+    Producers LPUSH onto ``name``. Consumers atomically move a message to
+    ``name:processing`` and record a lease deadline in ``name:leases``.
+    Messages whose lease runs out (the worker crashed or hung) are pushed
+    back onto the queue by requeue_expired().
+    """
+
+    def __init__(self, redis_client, name='job_queue', max_depth=JOB_QUEUE_MAX_DEPTH,
+                 visibility_timeout=JOB_VISIBILITY_TIMEOUT):
+        self.redis = redis_client
+        self.name = name
+        self.processing_key = f"{name}:processing"
+        self.leases_key = f"{name}:leases"
+        self.max_depth = max_depth
+        self.visibility_timeout = visibility_timeout
+        self._enqueue = redis_client.register_script(ENQUEUE_SCRIPT)
+        self._requeue = redis_client.register_script(REQUEUE_SCRIPT)
+
+    def depth(self):
+        return self.redis.llen(self.name)
+
+    def in_flight(self):
+        return self.redis.llen(self.processing_key)
+
+    def enqueue(self, data):
+        """Add a job message, raising QueueFullError when the queue is at max_depth."""
+        if not self._enqueue(keys=[self.name], args=[json.dumps(data), self.max_depth]):
+            raise QueueFullError(f"Queue {self.name} is full")
+
+    def reserve(self, timeout=5):
+        """Block up to timeout seconds for a message and lease it to the caller."""
+        raw = self.redis.blmove(self.name, self.processing_key, timeout, 'RIGHT', 'LEFT')
+        if raw is None:
+            return None
+        self.redis.zadd(self.leases_key, {raw: time.time() + self.visibility_timeout})
+        return QueuedJob(raw)
+
+    def extend(self, job):
+        """Push the lease deadline of a message that is still being worked on."""
+        self.redis.zadd(self.leases_key, {job.raw: time.time() + self.visibility_timeout}, xx=True)
+
+    def ack(self, job):
+        """Remove a handled message for good."""
+        pipe = self.redis.pipeline()
+        pipe.lrem(self.processing_key, 1, job.raw)
+        pipe.zrem(self.leases_key, job.raw)
+        pipe.execute()
+
+    def requeue_expired(self):
+        """Return messages with expired leases to the queue; returns how many moved."""
+        # A worker can die between BLMOVE and ZADD; give such orphans a lease so they expire too
+        orphans = self.redis.lrange(self.processing_key, 0, -1)
+        if orphans:
+            self.redis.zadd(self.leases_key,
+                            {raw: time.time() + self.visibility_timeout for raw in orphans}, nx=True)
+
+        expired = self.redis.zrangebyscore(self.leases_key, '-inf', time.time())
+        return sum(
+            self._requeue(keys=[self.name, self.processing_key, self.leases_key], args=[raw])
+            for raw in expired
+        )
+
+
+class AsyncJobQueue:
+    """Producer side of JobQueue for a redis.asyncio client.
+
+    Pushes onto the same list with the same depth limit; workers consume
+    it with JobQueue.
+    """
+
+    def __init__(self, redis_client, name='job_queue', max_depth=JOB_QUEUE_MAX_DEPTH):
+        self.redis = redis_client
+        self.name = name
+        self.processing_key = f"{name}:processing"
+        self.max_depth = max_depth
+        self._enqueue = redis_client.register_script(ENQUEUE_SCRIPT)
+
+    async def depth(self):
+        return await self.redis.llen(self.name)
+
+    async def in_flight(self):
+        return await self.redis.llen(self.processing_key)
+
+    async def enqueue(self, data):
+        """Add a job message, raising QueueFullError when the queue is at max_depth."""
+        if not await self._enqueue(keys=[self.name], args=[json.dumps(data), self.max_depth]):
+            raise QueueFullError(f"Queue {self.name} is full")
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from .job_index import JOB_INDEX_KEY
+
+# Progress configuration
+PROGRESS_UPDATE_INTERVAL = float(os.getenv('PROGRESS_UPDATE_INTERVAL', 1.0))
+JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', 7 * 24 * 3600))
+JOB_EVENTS_MAXLEN = int(os.getenv('JOB_EVENTS_MAXLEN', 1000))
+
+
+# Pub/sub channels of every job's events, for listeners following all jobs
+EVENTS_PATTERN = "job:*:events"
+
+# Statuses after which a job's stream gets no more events
+FINISHED_STATUSES = ("completed", "failed")
+
+
+def events_key(job_id):
+    """Stream holding a job's progress events; also the pub/sub channel announcing new ones."""
+    return f"job:{job_id}:events"
+
+
+def parse_event_id(event_id):
+    """Split a Redis stream id such as 1710849600000-0 into a comparable tuple."""
+    try:
+        ms, _, seq = event_id.partition("-")
+        return int(ms), int(seq or 0)
+    except (AttributeError, ValueError):
+        return None
+
+
+def format_event(event, data, event_id=None):
+    lines = [f"id: {event_id}"] if event_id else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
+
+
+class ProgressReporter:
+    """Coalesces updates to a job:{id} hash into throttled single-round-trip writes.
+
+    Fields passed to update() are merged and written together with one
+    HSET at most once per ``interval`` seconds. finish() always writes and
+    puts a TTL on the hash so finished jobs eventually leave Redis.
+
+    Every write is also appended as an event to the job's stream and
+    announced on its pub/sub channel, which is what the SSE endpoint follows.
+    Analysis fields passed to queue_analysis() are merged per listing and
+    published as "analysis" events with the next write.
+
+    Methods may be called from several threads, so the event loop can
+    queue fields while a write runs in a worker thread. Writes hold a
+    second lock across their round trip, so they reach Redis in the order
+    they took their fields and no update lands after the final status.
+    """
+
+    def __init__(self, redis_client, job_id, interval=PROGRESS_UPDATE_INTERVAL, ttl=JOB_RESULT_TTL):
+        self.redis = redis_client
+        self.job_id = job_id
+        self.key = f"job:{job_id}"
+        self.events_key = events_key(job_id)
+        self.interval = interval
+        self.ttl = ttl
+        self._pending = {}
+        self._analysis = {}
+        self._last_write = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def update(self, force=False, **fields):
+        """Queue field updates, writing them if forced or the interval has passed."""
+        with self._lock:
+            self._pending.update(fields)
+        if force or self.due():
+            self.flush()
+
+    def queue_analysis(self, listing_id, fields):
+        """Queue analysis fields of a listing for the next write; does no I/O."""
+        with self._lock:
+            self._analysis.setdefault(listing_id, {}).update(fields)
+
+    def due(self):
+        return time.monotonic() - self._last_write >= self.interval
+
+    def flush(self):
+        with self._write_lock:
+            pending, analysis = self._take_pending()
+            if not pending and not analysis:
+                return
+
+            pipe = self.redis.pipeline()
+            self._append_analysis(pipe, analysis)
+            if pending:
+                pipe.hset(self.key, mapping=pending)
+                self._append_event(pipe, "status" if "status" in pending else "progress", pending)
+            pipe.execute()
+            self._last_write = time.monotonic()
+
+    def publish(self, event, data):
+        """Append an event, such as a processed listing, without touching the hash."""
+        # Queued analyses go first, so none arrives after its finished listing
+        with self._write_lock:
+            with self._lock:
+                analysis, self._analysis = self._analysis, {}
+            pipe = self.redis.pipeline()
+            self._append_analysis(pipe, analysis)
+            self._append_event(pipe, event, data)
+            pipe.execute()
+
+    def finish(self, status, **fields):
+        """Write the final status with any pending fields and start the hash's TTL."""
+        with self._lock:
+            self._pending.update(fields, status=status)
+
+        with self._write_lock:
+            pending, analysis = self._take_pending()
+            pipe = self.redis.pipeline()
+            self._append_analysis(pipe, analysis)
+            pipe.hset(self.key, mapping=pending)
+            pipe.expire(self.key, self.ttl)
+            self._append_event(pipe, "status", pending)
+            pipe.expire(self.events_key, self.ttl)
+            # Jobs older than the TTL have expired too; keep the index in step
+            pipe.zremrangebyscore(JOB_INDEX_KEY, '-inf', time.time() - self.ttl)
+            pipe.execute()
+            self._last_write = time.monotonic()
+
+    def _take_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            analysis, self._analysis = self._analysis, {}
+        return pending, analysis
+
+    def _append_analysis(self, pipe, analysis):
+        for listing_id, fields in analysis.items():
+            self._append_event(pipe, "analysis", {"listing_id": listing_id, "fields": fields})
+
+    def _append_event(self, pipe, event, data):
+        payload = json.dumps(data, default=str)
+        pipe.xadd(self.events_key, {"event": event, "data": payload}, maxlen=JOB_EVENTS_MAXLEN, approximate=True)
+        pipe.publish(self.events_key, event)
+
+
+class EventNotifier:
+    """Wakes the event streams of an async API process from one pattern subscription.
+
+    Streams register an asyncio.Event per job with watch(); a single
+    PSUBSCRIBE on every job's channel sets the events of the jobs that get
+    a new event. A process thus holds one subscribed Redis connection no
+    matter how many clients follow jobs. After (re)subscribing every
+    stream is woken, since announcements may have been missed meanwhile.
+    """
+
+    def __init__(self, redis_client, retry_delay=1.0):
+        self.redis = redis_client
+        self.retry_delay = retry_delay
+        self._waiters = {}
+        self._task = None
+
+    def watch(self, job_id):
+        """Return an event set whenever job_id gets a new event; pass it to unwatch() when done."""
+        waiter = asyncio.Event()
+        self._waiters.setdefault(events_key(job_id), set()).add(waiter)
+        return waiter
+
+    def unwatch(self, job_id, waiter):
+        key = events_key(job_id)
+        waiters = self._waiters.get(key)
+        if waiters is not None:
+            waiters.discard(waiter)
+            if not waiters:
+                del self._waiters[key]
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _wake(self, key=None):
+        groups = [self._waiters.get(key, ())] if key else list(self._waiters.values())
+        for waiters in groups:
+            for waiter in waiters:
+                waiter.set()
+
+    async def _listen(self):
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.psubscribe(EVENTS_PATTERN)
+                async for message in pubsub.listen():
+                    if message["type"] == "pmessage":
+                        self._wake(message["channel"])
+                    elif message["type"] == "psubscribe":
+                        self._wake()
+            except Exception as e:
+                print(f"Error listening for job events: {str(e)}")
+            finally:
+                await pubsub.aclose()
+            # Streams fall back to their heartbeat until the subscription is back
+            self._wake()
+            await asyncio.sleep(self.retry_delay)
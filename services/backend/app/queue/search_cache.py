@@ -0,0 +1,89 @@
+import os
+
+# Seconds an identical search reuses an earlier job instead of scraping again
+SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', 3600))
+
+# Points the search key at the new job unless it already points at a job
+# that has not failed. A job whose hash is not written yet counts as running.
+# KEYS: search key
+# ARGV: new job id, ttl
+# Returns the existing job id, or false if the new job was registered.
+CLAIM_SCRIPT = """
+local existing = redis.call('GET', KEYS[1])
+if existing and redis.call('HGET', 'job:' .. existing, 'status') ~= 'failed' then
+    return existing
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return false
+"""
+
+# Restarts the search key's TTL only if it still points at the given job
+# KEYS: search key
+# ARGV: job id, ttl
+REFRESH_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Deletes the search key only if it still points at the given job
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def search_key(board, title, limit):
+    """Key shared by searches for the same board, title and limit, ignoring case and spacing."""
+    normalized = ' '.join(str(title).lower().split())
+    return f"search:{str(board).lower()}:{limit}:{normalized}"
+
+
+class SearchCache:
+    """Coalesces identical searches onto one job.
+
+    The first search for a key registers its job; later ones get that job
+    back while it is pending, processing or completed less than ``ttl``
+    seconds ago. A failed job stops being reused.
+    """
+
+    def __init__(self, redis_client, ttl=SEARCH_CACHE_TTL):
+        self.redis = redis_client
+        self.ttl = ttl
+        self._claim_script = redis_client.register_script(CLAIM_SCRIPT)
+        self._refresh_script = redis_client.register_script(REFRESH_SCRIPT)
+        self._release_script = redis_client.register_script(RELEASE_SCRIPT)
+
+    def claim(self, key, job_id, force=False):
+        """Register job_id for the search, or return the job already registered for it."""
+        if force:
+            self.redis.set(key, job_id, ex=self.ttl)
+            return None
+        return self._claim_script(keys=[key], args=[job_id, self.ttl]) or None
+
+    def completed(self, key, job_id):
+        """Keep a completed job's results reusable for ``ttl`` seconds from now."""
+        self._refresh_script(keys=[key], args=[job_id, self.ttl])
+
+    def release(self, key, job_id):
+        """Stop reusing a job, e.g. because it failed or was never queued."""
+        self._release_script(keys=[key], args=[job_id])
+
+
+class AsyncSearchCache(SearchCache):
+    """SearchCache for a redis.asyncio client: the same keys and scripts, awaited."""
+
+    async def claim(self, key, job_id, force=False):
+        if force:
+            await self.redis.set(key, job_id, ex=self.ttl)
+            return None
+        return await self._claim_script(keys=[key], args=[job_id, self.ttl]) or None
+
+    async def completed(self, key, job_id):
+        await self._refresh_script(keys=[key], args=[job_id, self.ttl])
+
+    async def release(self, key, job_id):
+        await self._release_script(keys=[key], args=[job_id])
@@ -0,0 +1,206 @@
+import asyncio
+import os
+import signal
+from app.db.listings import ListingWriter
+from app.main import redis_client, db, job_queue, search_cache
+from app.queue.job_queue import JOB_MAX_ATTEMPTS
+from app.queue.progress import ProgressReporter
+from job_boards.artifacts import close_artifact_sink
+from job_boards.http_fetch import close_page_fetcher
+from job_boards.llm_client import close_llm_client
+from job_boards.metrics import record_failure, start_metrics_server, update_queue_depth
+from job_boards.pipeline import load_board_class, run_search
+from job_boards.seen_index import get_seen_index
+from job_boards.tracing import span
+
+# Worker configuration
+WORKER_CONCURRENCY = int(os.getenv('WORKER_CONCURRENCY', 2))
+WORKER_POLL_TIMEOUT = int(os.getenv('WORKER_POLL_TIMEOUT', 5))
+WORKER_REQUEUE_INTERVAL = int(os.getenv('WORKER_REQUEUE_INTERVAL', 30))
+
+# Processed listings from all jobs in this process are written to MongoDB in batches
+listing_writer = ListingWriter(db.listings, db.job_listings)
+
+
+async def publish_queued(progress, stopping):
+    """Write queued progress and partial analyses once per interval until stopping is set."""
+    while not stopping.is_set():
+        try:
+            await asyncio.wait_for(stopping.wait(), progress.interval)
+        except asyncio.TimeoutError:
+            try:
+                await asyncio.to_thread(progress.flush)
+            except Exception as e:
+                print(f"Error publishing progress of job {progress.job_id}: {str(e)}")
+
+
+async def process_job(job_id: str, board: str, title: str, limit: int, force_refresh: bool = False,
+                      search_key: str = None):
+    progress = ProgressReporter(redis_client, job_id)
+    # Redis writes run in threads so the event loop keeps serving the other listings and jobs
+    stop_publishing = asyncio.Event()
+    publisher = asyncio.create_task(publish_queued(progress, stop_publishing))
+
+    async def finish(status, **fields):
+        # Let an in-flight write land first so it cannot overwrite the final status
+        stop_publishing.set()
+        await publisher
+        await asyncio.to_thread(progress.finish, status, **fields)
+
+    try:
+        # Update job status to processing
+        await asyncio.to_thread(progress.update, status="processing", force=True)
+
+        # Initialize job board
+        board_class = load_board_class(board)
+        board_instance = board_class(title)
+
+        async def report_progress(done, total, index, job, processed_job):
+            # Update progress; writes are throttled per job
+            await asyncio.to_thread(progress.update, progress=done / total * 100)
+
+            if processed_job:
+                # Buffer for MongoDB; rank keeps the search result order
+                await listing_writer.add(job_id, board, index, processed_job)
+                await asyncio.to_thread(progress.publish, "listing", {"rank": index, "listing": processed_job})
+
+        async def report_unchanged(index, job):
+            # Already analyzed by an earlier job; just record that this job found it
+            await listing_writer.link(job_id, board, index, job)
+            await asyncio.to_thread(progress.publish, "listing", {"rank": index, "listing": job, "unchanged": True})
+
+        def report_partial_analysis(listing_id, fields):
+            # Called on the event loop as the model writes; queued and published with the next write
+            progress.queue_analysis(listing_id, fields)
+
+        # Process new and changed listings concurrently
+        seen_hashes = {}
+        await run_search(
+            board_instance, limit,
+            on_progress=report_progress,
+            on_unchanged=report_unchanged,
+            on_partial_analysis=report_partial_analysis,
+            force_refresh=force_refresh,
+            seen_hashes=seen_hashes
+        )
+
+        # Results must be readable once the job reports completion
+        with span("flush_listings"):
+            await listing_writer.flush()
+        # Fail the job rather than complete it with missing results
+        listing_writer.raise_for_job(job_id)
+        # Only stored listings are skipped by later searches
+        await get_seen_index().mark_seen(board_instance.board_name, seen_hashes)
+
+        # Update job status to completed
+        await finish("completed", progress=100)
+        if search_key:
+            # Identical searches reuse these results for a while
+            await asyncio.to_thread(search_cache.completed, search_key, job_id)
+
+    except Exception as e:
+        # Update job status to failed
+        record_failure('job', e)
+        await finish("failed", error=str(e))
+        if search_key:
+            await asyncio.to_thread(search_cache.release, search_key, job_id)
+    finally:
+        stop_publishing.set()
+
+
+async def keep_lease(job):
+    """Extend a message's lease while its job is still running."""
+    while True:
+        await asyncio.sleep(max(1, job_queue.visibility_timeout / 3))
+        await asyncio.to_thread(job_queue.extend, job)
+
+
+async def give_up(job, error):
+    """Fail a job that cannot run and free its search for a new job."""
+    await asyncio.to_thread(ProgressReporter(redis_client, job.job_id).finish, "failed", error=error)
+    if job.data.get('search_key'):
+        await asyncio.to_thread(search_cache.release, job.data['search_key'], job.job_id)
+
+
+async def handle(job):
+    data = job.data
+    attempts = await asyncio.to_thread(redis_client.hincrby, f"job:{job.job_id}", "attempts", 1)
+    if attempts > JOB_MAX_ATTEMPTS:
+        # Delivered too many times without finishing; give up instead of looping forever
+        await give_up(job, f"Gave up after {JOB_MAX_ATTEMPTS} attempts")
+        return
+
+    try:
+        limit = int(data['limit'])
+    except (KeyError, TypeError, ValueError):
+        # Redelivering a malformed message would only fail again
+        await give_up(job, f"Invalid limit: {data.get('limit')!r}")
+        return
+
+    heartbeat = asyncio.create_task(keep_lease(job))
+    try:
+        # Continue the trace started by the API when the job was created
+        with span("run_job", parent=data.get('traceparent'), job_id=job.job_id, board=data['board'], attempt=attempts):
+            await process_job(
+                job.job_id, data['board'], data['title'], limit,
+                force_refresh=bool(data.get('force_refresh', False)),
+                search_key=data.get('search_key')
+            )
+    finally:
+        heartbeat.cancel()
+
+
+async def consume(worker_id, stopping):
+    """Reserve and run jobs one at a time until asked to stop."""
+    while not stopping.is_set():
+        job = await asyncio.to_thread(job_queue.reserve, WORKER_POLL_TIMEOUT)
+        if job is None:
+            continue
+
+        print(f"Worker {worker_id} processing job {job.job_id}")
+        try:
+            await handle(job)
+        except Exception as e:
+            # Leave the message leased; it is redelivered once the lease expires
+            print(f"Worker {worker_id} failed on job {job.job_id}: {str(e)}")
+            continue
+        await asyncio.to_thread(job_queue.ack, job)
+
+
+async def requeue_expired(stopping):
+    """Periodically return jobs whose worker died to the queue."""
+    while not stopping.is_set():
+        moved = await asyncio.to_thread(job_queue.requeue_expired)
+        if moved:
+            print(f"Requeued {moved} expired jobs")
+        await asyncio.to_thread(update_queue_depth, job_queue)
+        try:
+            await asyncio.wait_for(stopping.wait(), WORKER_REQUEUE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run(concurrency=WORKER_CONCURRENCY):
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    metrics_port = start_metrics_server()
+    if metrics_port:
+        print(f"Serving metrics on port {metrics_port}")
+    print(f"Starting {concurrency} workers on queue {job_queue.name}")
+    try:
+        await asyncio.gather(
+            requeue_expired(stopping),
+            listing_writer.run_periodic_flush(stopping),
+            *(consume(i, stopping) for i in range(concurrency))
+        )
+    finally:
+        await close_llm_client()
+        await close_page_fetcher()
+        await asyncio.to_thread(close_artifact_sink)
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
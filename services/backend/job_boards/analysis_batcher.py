@@ -0,0 +1,150 @@
+import asyncio
+import os
+from .llm_client import estimate_tokens
+from .metrics import LLM_ANALYSES, LLM_BATCH_LISTINGS
+
+# Batching configuration; a batch size of 1 sends every description on its own
+LLM_BATCH_SIZE = int(os.getenv('LLM_BATCH_SIZE', 5))
+LLM_BATCH_TOKEN_BUDGET = int(os.getenv('LLM_BATCH_TOKEN_BUDGET', 6000))
+# Detail pages of a board load SCRAPE_POLITENESS_DELAY apart, so descriptions
+# arrive about that far apart too; by default a batch waits long enough for
+# the next one to join. Shorter waits cut latency but mostly send batches of one.
+LLM_BATCH_MAX_WAIT = float(os.getenv('LLM_BATCH_MAX_WAIT', 1.5 * float(os.getenv('SCRAPE_POLITENESS_DELAY', 1.0))))
+LLM_BATCH_MAX_TOKENS = int(os.getenv('LLM_BATCH_MAX_TOKENS', 8000))
+
+
+class AnalysisBatcher:
+    """Packs descriptions submitted close together into one LLM request.
+
+    Descriptions are collected until ``batch_size`` are waiting, the next
+    one would push the batch over ``token_budget`` prompt tokens, or the
+    oldest has waited ``max_wait`` seconds. ``analyze_batch(items)`` gets a
+    list of (listing_id, text) pairs and returns {listing_id: analysis}.
+    Results are matched to descriptions by listing id. If the answer does
+    not hold exactly the listings sent, none of it is trusted and every
+    description is analyzed on its own with ``analyze_one(text)``; so is
+    any listing returned with an "error" key.
+    """
+
+    def __init__(self, analyze_batch, analyze_one, batch_size=LLM_BATCH_SIZE,
+                 token_budget=LLM_BATCH_TOKEN_BUDGET, max_wait=LLM_BATCH_MAX_WAIT):
+        self.analyze_batch = analyze_batch
+        self.analyze_one = analyze_one
+        self.batch_size = batch_size
+        self.token_budget = token_budget
+        self.max_wait = max_wait
+        self._pending = []
+        self._pending_tokens = 0
+        self._timer = None
+        self._tasks = set()
+
+        # Counters for monitoring
+        self.requests = 0
+        self.batches = 0
+        self.batched_listings = 0
+        self.single_calls = 0
+        self.fallbacks = 0
+
+    async def submit(self, text, listing_id=None):
+        """Analyze a description, possibly together with others submitted around the same time."""
+        tokens = estimate_tokens(text)
+        if self.batch_size <= 1 or tokens >= self.token_budget:
+            return await self._analyze_single(text)
+
+        if self._pending and self._pending_tokens + tokens > self.token_budget:
+            self._flush()
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((listing_id, text, future))
+        self._pending_tokens += tokens
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_tokens = self._pending, [], 0
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _batch_ids(batch):
+        """Id each description is sent under: its listing id, or its position if it has none or shares one."""
+        ids = []
+        for i, (listing_id, _, _) in enumerate(batch):
+            batch_id = str(listing_id) if listing_id is not None else f"item-{i}"
+            ids.append(batch_id if batch_id not in ids else f"item-{i}")
+        return ids
+
+    async def _run(self, batch):
+        try:
+            if len(batch) == 1:
+                _, text, future = batch[0]
+                _resolve(future, await self._analyze_single(text))
+                return
+
+            self.requests += 1
+            self.batches += 1
+            self.batched_listings += len(batch)
+            LLM_BATCH_LISTINGS.observe(len(batch))
+            ids = self._batch_ids(batch)
+            try:
+                results = await self.analyze_batch([(batch_id, text) for batch_id, (_, text, _) in zip(ids, batch)])
+            except Exception as e:
+                print(f"Batched analysis of {len(batch)} descriptions failed: {str(e)}")
+                results = {}
+
+            if set(results) != set(ids):
+                # Listings left out, added or renamed; the answer may be shifted, so use none of it
+                results = {}
+
+            retry = []
+            for batch_id, (_, text, future) in zip(ids, batch):
+                result = results.get(batch_id)
+                if isinstance(result, dict) and "error" not in result:
+                    LLM_ANALYSES.labels('batched').inc()
+                    _resolve(future, result)
+                else:
+                    retry.append((text, future))
+
+            # Listings without a usable batched answer are analyzed one by one
+            self.fallbacks += len(retry)
+            LLM_ANALYSES.labels('fallback').inc(len(retry))
+            singles = await asyncio.gather(*(self._analyze_single(text, count=False) for text, _ in retry))
+            for (_, future), result in zip(retry, singles):
+                _resolve(future, result)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _analyze_single(self, text, count=True):
+        self.requests += 1
+        self.single_calls += 1
+        if count:
+            LLM_ANALYSES.labels('single').inc()
+        return await self.analyze_one(text)
+
+    def stats(self):
+        return {
+            "batch_size": self.batch_size,
+            "token_budget": self.token_budget,
+            "requests": self.requests,
+            "batches": self.batches,
+            "batched_listings": self.batched_listings,
+            "single_calls": self.single_calls,
+            "fallbacks": self.fallbacks
+        }
+
+
+def _resolve(future, result):
+    # The caller may have been cancelled while its batch was in flight
+    if not future.done():
+        future.set_result(result)
@@ -0,0 +1,129 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+# Cache configuration
+ANALYSIS_CACHE_TTL = int(os.getenv('ANALYSIS_CACHE_TTL', 7 * 24 * 3600))
+ANALYSIS_CACHE_MEMORY_SIZE = int(os.getenv('ANALYSIS_CACHE_MEMORY_SIZE', 1024))
+ANALYSIS_CACHE_MEMORY_TTL = int(os.getenv('ANALYSIS_CACHE_MEMORY_TTL', 3600))
+
+
+def analysis_cache_key(text, model, prompt_version):
+    """Build a content-addressed key from the description, model and prompt version."""
+    normalized = ' '.join(text.split())
+    digest = hashlib.sha256(f"{model}\0{prompt_version}\0{normalized}".encode('utf-8')).hexdigest()
+    return f"analysis:{digest}"
+
+
+class LRUCache:
+    """Size-bounded in-process cache whose entries also expire after a TTL."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+class AnalysisCache:
+    """Two-tier cache for Groq analyses: an in-process LRU in front of Redis.
+
+    Values are stored as JSON strings so every hit hands back a fresh dict
+    that callers are free to mutate.
+    """
+
+    def __init__(self, redis_client=None, ttl=ANALYSIS_CACHE_TTL,
+                 memory_size=ANALYSIS_CACHE_MEMORY_SIZE, memory_ttl=ANALYSIS_CACHE_MEMORY_TTL):
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.memory = LRUCache(memory_size, memory_ttl)
+
+        # Counters for monitoring
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @property
+    def hits(self):
+        return self.memory_hits + self.redis_hits
+
+    async def get(self, key):
+        """Return the cached analysis for key, or None on a miss."""
+        payload = self.memory.get(key)
+        if payload is not None:
+            self.memory_hits += 1
+            return json.loads(payload)
+
+        if self.redis_client is not None:
+            try:
+                payload = await asyncio.to_thread(self.redis_client.get, key)
+            except Exception as e:
+                print(f"Analysis cache read failed: {str(e)}")
+                payload = None
+            if payload is not None:
+                self.redis_hits += 1
+                self.memory.set(key, payload)
+                return json.loads(payload)
+
+        self.misses += 1
+        return None
+
+    async def set(self, key, analysis):
+        """Store an analysis in both tiers."""
+        payload = json.dumps(analysis, ensure_ascii=False)
+        self.memory.set(key, payload)
+
+        if self.redis_client is not None:
+            try:
+                await asyncio.to_thread(self.redis_client.set, key, payload, ex=self.ttl)
+            except Exception as e:
+                print(f"Analysis cache write failed: {str(e)}")
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "memory_entries": len(self.memory)
+        }
+
+
+_cache = None
+
+def init_analysis_cache(redis_client=None, **options):
+    """Configure the process-wide cache, optionally backed by Redis."""
+    global _cache
+    _cache = AnalysisCache(redis_client=redis_client, **options)
+    return _cache
+
+def get_analysis_cache():
+    """Return the process-wide cache, falling back to an in-process only cache."""
+    global _cache
+    if _cache is None:
+        _cache = AnalysisCache()
+    return _cache
@@ -0,0 +1,206 @@
+import atexit
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+from .metrics import ARTIFACT_WRITE_SECONDS, record_failure
+from .storage import create_storage
+
+try:
+    import orjson
+except ImportError:  # Falls back to the standard library serializer
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # zstd compression falls back to gzip
+    zstandard = None
+
+# Artifact sink configuration
+ARTIFACT_COMPRESSION = os.getenv('ARTIFACT_COMPRESSION', '').lower()
+ARTIFACT_FSYNC_INTERVAL = float(os.getenv('ARTIFACT_FSYNC_INTERVAL', 5.0))
+
+COMPRESSION_SUFFIXES = {"": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def dumps_line(record):
+    """Serialize a record as one UTF-8 JSON Lines entry."""
+    if orjson is not None:
+        return orjson.dumps(record, default=str) + b"\n"
+    return (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode('utf-8')
+
+
+class ArtifactSink:
+    """Appends artifact records to JSON Lines files from a background thread.
+
+    Records are serialized by the caller, so later changes to the source
+    dicts cannot race with the writer, and handed to a thread that owns
+    every open file in ``storage``. Files stay open between records, are
+    flushed and synced every ``fsync_interval`` seconds and closed by
+    release() once a run is done. ``compression`` is "", "gzip" or "zstd"; every writer
+    appends a new compressed member, which the decompressors read back as
+    one stream.
+    """
+
+    def __init__(self, storage=None, compression=ARTIFACT_COMPRESSION, fsync_interval=ARTIFACT_FSYNC_INTERVAL):
+        if compression == "zstd" and zstandard is None:
+            print("zstandard is not installed, compressing artifacts with gzip")
+            compression = "gzip"
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown artifact compression: {compression}")
+        self.storage = storage if storage is not None else create_storage()
+        self.compression = compression
+        self.suffix = COMPRESSION_SUFFIXES[compression]
+        self.fsync_interval = fsync_interval
+        self._queue = queue.Queue()
+        self._files = {}
+        self._dirty = set()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Counters for monitoring
+        self.records_written = 0
+        self.bytes_written = 0
+        self.fsyncs = 0
+
+    def name_for(self, name):
+        return f"{name}{self.suffix}"
+
+    def write(self, name, record):
+        """Queue a record for appending to file ``name`` (plus the compression suffix)."""
+        self._start()
+        self._queue.put(("write", self.name_for(name), dumps_line(record)))
+
+    def release(self, directory):
+        """Flush and close every file under ``directory``; call when a run is done."""
+        if self._thread is not None:
+            self._queue.put(("release", str(directory).rstrip('/') + '/', None))
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is written and fsynced."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(("flush", None, done))
+        done.wait(timeout)
+
+    def close(self):
+        """Write what is queued, close all files and stop the thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(("stop", None, None))
+            thread.join()
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="artifact-sink", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        next_sync = time.monotonic() + self.fsync_interval
+        while True:
+            try:
+                op, name, payload = self._queue.get(timeout=max(0.01, next_sync - time.monotonic()))
+            except queue.Empty:
+                op = None
+
+            if op == "write":
+                self._append(name, payload)
+            elif op == "release":
+                for file_name in [n for n in self._files if n.startswith(name)]:
+                    self._close_file(file_name)
+            elif op == "flush":
+                self._sync()
+                payload.set()
+            elif op == "stop":
+                for file_name in list(self._files):
+                    self._close_file(file_name)
+                return
+
+            if time.monotonic() >= next_sync:
+                self._sync()
+                next_sync = time.monotonic() + self.fsync_interval
+
+    def _open(self, name):
+        stream = self.storage.open(name)
+        if self.compression == "gzip":
+            return stream, gzip.GzipFile(fileobj=stream, mode='wb')
+        if self.compression == "zstd":
+            return stream, zstandard.ZstdCompressor().stream_writer(stream, closefd=False)
+        return stream, stream
+
+    def _append(self, name, payload):
+        try:
+            with ARTIFACT_WRITE_SECONDS.time():
+                if name not in self._files:
+                    self._files[name] = self._open(name)
+                self._files[name][1].write(payload)
+            self._dirty.add(name)
+            self.records_written += 1
+            self.bytes_written += len(payload)
+        except Exception as e:
+            print(f"Error writing artifact {name}: {str(e)}")
+            record_failure('artifact', e)
+
+    def _sync(self):
+        for name in list(self._dirty):
+            self._sync_file(name)
+
+    def _sync_file(self, name):
+        self._dirty.discard(name)
+        stream, writer = self._files[name]
+        try:
+            if writer is not stream:
+                writer.flush()
+            stream.sync()
+            self.fsyncs += 1
+        except Exception as e:
+            print(f"Error syncing artifact {name}: {str(e)}")
+
+    def _close_file(self, name):
+        stream, writer = self._files.pop(name)
+        self._dirty.discard(name)
+        try:
+            # Closing the compressor writes the end of its member to the stream
+            if writer is not stream:
+                writer.close()
+            stream.close()
+            self.fsyncs += 1
+        except Exception as e:
+            print(f"Error closing artifact {name}: {str(e)}")
+
+    def stats(self):
+        return {
+            "records_written": self.records_written,
+            "bytes_written": self.bytes_written,
+            "fsyncs": self.fsyncs,
+            "open_files": len(self._files)
+        }
+
+
+_sink = None
+
+def init_artifact_sink(storage=None, **options):
+    """Create the process-wide sink, writing to ``storage`` (ARTIFACT_STORAGE by default)."""
+    global _sink
+    if _sink is not None:
+        _sink.close()
+    _sink = ArtifactSink(storage, **options)
+    atexit.register(_sink.close)
+    return _sink
+
+def get_artifact_sink():
+    """Return the process-wide sink, creating it on first use."""
+    if _sink is None:
+        init_artifact_sink()
+    return _sink
+
+def close_artifact_sink():
+    """Write everything still queued and stop the sink's thread."""
+    if _sink is not None:
+        _sink.close()
@@ -1,33 +1,73 @@
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from collections import Counter, defaultdict
 from datetime import datetime
-import json
 import os
-from pathlib import Path
-import aiohttp
-from dotenv import load_dotenv
+import uuid
+from urllib.parse import urlparse
+from .analysis_batcher import AnalysisBatcher, LLM_BATCH_MAX_TOKENS
+from .analysis_cache import analysis_cache_key, get_analysis_cache
+from .artifacts import get_artifact_sink
+from .browser_pool import BrowserPool
+from .http_fetch import get_page_fetcher, lightweight_available
+from .json_extract import StreamingJSONParser, extract_json_array, extract_json_object, is_object_array
+from .llm_client import LLM_STREAM, LLMAPIError, get_llm_client
+from .metrics import CACHE_REQUESTS, PAGE_LOAD_SECONDS, InstrumentedPage, metrics_enabled
+from .preprocess import preprocess_description
+from .request_filter import RequestFilter
+from .tracing import traced
 
-# Load environment variables
-load_dotenv()
-GROQ_API_KEY = os.getenv('GROQ_API_KEY')
-if not GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY environment variable is not set")
+# Bump whenever the analysis prompt changes so cached analyses are not reused
+PROMPT_VERSION = 1
 
 class BaseJobBoard(ABC):
-    def __init__(self, job_title):
+    # Only these resource types are loaded while scraping; the boards read text only
+    allowed_resource_types = {"document", "script", "xhr", "fetch"}
+    # Extra domains to load resources from besides the board's own domain
+    extra_allowed_domains = set()
+    # Boards with server-rendered pages set this to scrape them over plain HTTP
+    lightweight = False
+    # Also loaded when such a board falls back to the browser; pages that did
+    # not parse over HTTP are likely rendered by scripts
+    lightweight_fallback_resource_types = {"script"}
+    # Lines stripped from descriptions before analysis, as full-line regular expressions
+    boilerplate_patterns = ()
+    
+    def __init__(self, job_title, browser_pool=None):
         self.job_title = job_title
-        self.base_url = self.get_base_url()
+        self.board_name = self.__class__.__name__.lower().replace('board', '')
+        # BOARD_BASE_URL_<BOARD> points the board at a mirror, such as the benchmark's recorded pages
+        self.base_url = os.getenv(f"BOARD_BASE_URL_{self.board_name.upper()}") or self.get_base_url()
         self.search_url = self.generate_search_url()
         
-        # Create board-specific artifact directories
-        self.board_name = self.__class__.__name__.lower().replace('board', '')
-        self.artifacts_dir = Path("artifacts") / self.board_name / self.job_title.lower().replace(" ", "_")
-        self.metadata_dir = self.artifacts_dir / "metadata"
-        self.groq_dir = self.artifacts_dir / "groq_responses"
-        self.job_listings_dir = self.artifacts_dir / "job_listings"
+        # Browsers are shared across listings; a pool is created on first use if none is given
+        self.browser_pool = browser_pool
+        self._owns_browser_pool = False
+        
+        # Descriptions of concurrently processed listings share LLM requests
+        self.analysis_batcher = AnalysisBatcher(self.analyze_descriptions, self.analyze_description)
+        
+        # Called with (listing_id, fields) as analysis fields stream in; set by the pipeline
+        self.on_partial_analysis = None
+        self._waiting_listings = defaultdict(list)
+        
+        # Descriptions whose last analysis was cut off at max_tokens and repaired; those are not cached
+        self._truncated_analyses = Counter()
         
-        # Create directories if they don't exist
-        for directory in [self.metadata_dir, self.groq_dir, self.job_listings_dir]:
-            directory.mkdir(parents=True, exist_ok=True)
+        # Pages scraped over HTTP vs. with the browser, for monitoring
+        self.scrape_stats = Counter()
+        
+        # Images, fonts, media and third-party requests are blocked
+        self.request_filter = RequestFilter(
+            self.allowed_resource_types,
+            {urlparse(self.base_url).hostname} | set(self.extra_allowed_domains)
+        )
+        
+        # Each run appends its artifacts to JSON Lines files in a directory of its own,
+        # on whichever storage backend the process is configured with
+        self.artifacts_dir = f"{self.board_name}/{self.job_title.lower().replace(' ', '_')}"
+        self.run_dir = f"{self.artifacts_dir}/{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.artifact_sink = get_artifact_sink()
     
     @abstractmethod
     def get_base_url(self):
@@ -44,23 +84,140 @@ class BaseJobBoard(ABC):
         """Extract job listings from the search page."""
         pass
     
+    @abstractmethod
+    async def scrape_job_details(self, page):
+        """Extract the full description and job details from a loaded detail page."""
+        pass
+    
     @abstractmethod
     async def process_job(self, job, playwright):
         """Process a single job listing."""
         pass
     
-    async def parse_job_description(self, text):
-        """Parse job description using GROQ API."""
+    def parse_job_listings_html(self, html):
+        """Extract job listings from search page HTML without a browser, or None if it needs one."""
+        return None
+    
+    def parse_job_details_html(self, html):
+        """Return (full_description, job_details) from detail page HTML, or None if it needs a browser."""
+        return None
+    
+    def use_lightweight(self):
+        return self.lightweight and lightweight_available()
+    
+    async def fetch_html(self, url):
+        """Fetch a page over HTTP, returning None on any failure so callers can fall back."""
+        try:
+            return await get_page_fetcher().fetch(url)
+        except Exception as e:
+            print(f"HTTP fetch of {url} failed: {str(e)}")
+            return None
+    
+    def browser_fallback_types(self):
+        """Resource types to allow on top of the board's own when the HTTP path was tried first."""
+        return self.lightweight_fallback_resource_types if self.use_lightweight() else ()
+    
+    async def get_job_listings(self, playwright):
+        """Return the search page's listings, without a browser when the markup allows it."""
+        if self.use_lightweight():
+            with PAGE_LOAD_SECONDS.labels(self.board_name, 'search', 'http').time():
+                html = await self.fetch_html(self.search_url)
+                jobs = self.parse_job_listings_html(html) if html else None
+            if jobs:
+                self.scrape_stats["http"] += 1
+                return jobs
+        
+        self.scrape_stats["browser"] += 1
+        with PAGE_LOAD_SECONDS.labels(self.board_name, 'search', 'browser').time():
+            async with self.new_page(playwright, self.browser_fallback_types()) as page:
+                await page.goto(self.search_url)
+                return await self.extract_job_listings(page)
+    
+    @traced("fetch_job_details")
+    async def get_job_details(self, job_url, playwright):
+        """Return (full_description, job_details), without a browser when the markup allows it.
+        
+        The browser context is released before returning, so it is not held
+        while the description is sent to Groq.
+        """
+        if self.use_lightweight():
+            with PAGE_LOAD_SECONDS.labels(self.board_name, 'detail', 'http').time():
+                html = await self.fetch_html(job_url)
+                details = self.parse_job_details_html(html) if html else None
+            if details is not None:
+                self.scrape_stats["http"] += 1
+                return details
+        
+        self.scrape_stats["browser"] += 1
+        with PAGE_LOAD_SECONDS.labels(self.board_name, 'detail', 'browser').time():
+            async with self.new_page(playwright, self.browser_fallback_types()) as page:
+                await page.goto(job_url)
+                return await self.scrape_job_details(page)
+    
+    @asynccontextmanager
+    async def new_page(self, playwright, extra_resource_types=()):
+        """Open a page in a fresh context from the shared browser pool."""
+        if self.browser_pool is None:
+            self.browser_pool = BrowserPool(playwright)
+            self._owns_browser_pool = True
+        
+        async with self.browser_pool.page() as page:
+            await self.request_filter.install(page, extra_resource_types)
+            # Time Playwright calls only when someone collects the numbers
+            yield InstrumentedPage(page, self.board_name) if metrics_enabled() else page
+    
+    async def close(self):
+        """Close this run's artifact files and release the browser pool if this board created it."""
+        self.artifact_sink.release(self.run_dir)
+        if self._owns_browser_pool and self.browser_pool is not None:
+            await self.browser_pool.close()
+            self.browser_pool = None
+            self._owns_browser_pool = False
+    
+    def prepare_description(self, text):
+        """Normalize, de-boilerplate and truncate a description; returns (text, token counts)."""
+        return preprocess_description(text, self.boilerplate_patterns)
+    
+    @traced("analyze_description")
+    async def parse_job_description(self, text, listing_id=None):
+        """Parse job description using GROQ API.
+        
+        Fields of the analysis are passed to on_partial_analysis with
+        ``listing_id`` as they stream in, before the analysis is complete.
+        """
         if not text:
             return {"error": "Empty description"}
-            
-        async with aiohttp.ClientSession() as session:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {GROQ_API_KEY}"
-            }
-            
-            prompt = f"""Analyze the following job description and create a structured JSON representation of the key information. 
+        
+        # Identical descriptions are only analyzed once
+        llm_client = get_llm_client()
+        cache = get_analysis_cache()
+        cache_key = analysis_cache_key(text, llm_client.model, PROMPT_VERSION)
+        cached = await cache.get(cache_key)
+        CACHE_REQUESTS.labels('analysis', 'miss' if cached is None else 'hit').inc()
+        if cached is not None:
+            return cached
+        
+        if listing_id is not None and self.on_partial_analysis:
+            self._waiting_listings[text].append(listing_id)
+        try:
+            parsed = await self.analysis_batcher.submit(text, listing_id)
+        finally:
+            if listing_id in self._waiting_listings.get(text, ()):
+                self._waiting_listings[text].remove(listing_id)
+                if not self._waiting_listings[text]:
+                    del self._waiting_listings[text]
+        if self._truncated_analyses[text]:
+            # Served this time, but the next request asks the model again instead of reusing a partial answer
+            self._truncated_analyses[text] -= 1
+            if not self._truncated_analyses[text]:
+                del self._truncated_analyses[text]
+        elif "error" not in parsed:
+            await cache.set(cache_key, parsed)
+        return parsed
+    
+    async def analyze_description(self, text):
+        """Analyze a single description with its own chat completion."""
+        prompt = f"""Analyze the following job description and create a structured JSON representation of the key information. 
 Organize the information in a way that makes sense for this specific job posting.
 Focus on extracting the most important details that would help a candidate understand the role and requirements.
 
@@ -68,65 +225,118 @@ Here's the job description:
 {text}
 
 Return a JSON object with your analysis. Do not include any markdown formatting or additional text."""
+        
+        messages = [{
+            "role": "user",
+            "content": prompt
+        }]
+        try:
+            if LLM_STREAM:
+                # Report fields as they complete and stop once the object is closed
+                parser = StreamingJSONParser('{')
+                
+                def on_content(delta):
+                    fields = dict(parser.feed(delta))
+                    if fields:
+                        self.report_partial_analysis(text, fields)
+                    return parser.result is not None
+                
+                result = await get_llm_client().stream_chat(messages, on_content, temperature=0.1, max_tokens=2000)
+            else:
+                result = await get_llm_client().chat(messages, temperature=0.1, max_tokens=2000)
+        except LLMAPIError as e:
+            return {"error": f"API error: {e.status}"}
+        except Exception as e:
+            return {"error": f"Request failed: {str(e)}"}
+        
+        if "choices" not in result or not result["choices"]:
+            return {"error": "No choices in API response"}
             
-            data = {
-                "model": "meta-llama/llama-4-scout-17b-16e-instruct",
-                "messages": [{
-                    "role": "user",
-                    "content": prompt
-                }],
-                "temperature": 0.1,
-                "max_tokens": 2000
-            }
+        parsed_text = result["choices"][0]["message"]["content"]
+        print("\nRaw Groq Response:")
+        print("-" * 50)
+        print(parsed_text)
+        print("-" * 50)
+        
+        parsed = self.clean_groq_response(parsed_text)
+        if result["choices"][0].get("finish_reason") == "length" and "error" not in parsed:
+            # Hit max_tokens; the object was completed from what arrived and lacks the rest
+            self._truncated_analyses[text] += 1
+        return parsed
+    
+    async def analyze_descriptions(self, items):
+        """Analyze several (listing_id, description) pairs in one chat completion.
+        
+        Returns {listing_id: analysis}; listings the model left out are
+        simply missing, and API errors are raised for the batcher to handle.
+        """
+        listings = "\n\n".join(f"### Listing {listing_id}\n{text}" for listing_id, text in items)
+        prompt = f"""Analyze each of the following job descriptions and create a structured JSON representation of the key information for each one.
+Organize the information in a way that makes sense for each specific job posting.
+Focus on extracting the most important details that would help a candidate understand the role and requirements.
+
+Here are the job descriptions, each introduced by its listing id:
+{listings}
+
+Return a JSON array with one element per listing, each of the form {{"listing_id": "<id>", "analysis": {{...}}}}. Do not include any markdown formatting or additional text."""
+        
+        messages = [{
+            "role": "user",
+            "content": prompt
+        }]
+        max_tokens = min(2000 * len(items), LLM_BATCH_MAX_TOKENS)
+        if LLM_STREAM:
+            # Report each listing's analysis as soon as its entry is complete
+            texts = {str(listing_id): text for listing_id, text in items}
+            parser = StreamingJSONParser('[', accept=is_object_array)
             
+            def on_content(delta):
+                for _, entry in parser.feed(delta):
+                    if isinstance(entry, dict) and isinstance(entry.get("analysis"), dict):
+                        text = texts.get(str(entry.get("listing_id")))
+                        if text is not None:
+                            self.report_partial_analysis(text, entry["analysis"])
+                return parser.result is not None
+            
+            result = await get_llm_client().stream_chat(messages, on_content, temperature=0.1, max_tokens=max_tokens)
+        else:
+            result = await get_llm_client().chat(messages, temperature=0.1, max_tokens=max_tokens)
+        if "choices" not in result or not result["choices"]:
+            return {}
+        return self.clean_groq_batch_response(result["choices"][0]["message"]["content"])
+    
+    def report_partial_analysis(self, text, fields):
+        """Pass analysis fields of ``text`` to on_partial_analysis for each listing waiting on it."""
+        for listing_id in list(self._waiting_listings.get(text, ())):
             try:
-                async with session.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    headers=headers,
-                    json=data
-                ) as response:
-                    if response.status != 200:
-                        return {"error": f"API error: {response.status}"}
-                        
-                    result = await response.json()
-                    if "choices" not in result or not result["choices"]:
-                        return {"error": "No choices in API response"}
-                        
-                    parsed_text = result["choices"][0]["message"]["content"]
-                    print("\nRaw Groq Response:")
-                    print("-" * 50)
-                    print(parsed_text)
-                    print("-" * 50)
-                    
-                    return self.clean_groq_response(parsed_text)
-                    
+                self.on_partial_analysis(listing_id, fields)
             except Exception as e:
-                return {"error": f"Request failed: {str(e)}"}
+                print(f"Error reporting partial analysis for {listing_id}: {str(e)}")
     
     def clean_groq_response(self, text):
-        """Clean the Groq response to extract valid JSON."""
-        # Remove markdown code block markers if present
-        text = text.replace('```json', '').replace('```', '').strip()
-        
-        # Find the first { and last }
-        json_start = text.find('{')
-        json_end = text.rfind('}') + 1
+        """Extract the JSON object from a Groq response."""
+        parsed = extract_json_object(text)
+        if parsed is None:
+            print(f"No JSON object found in response: {text[:200]}")
+            return {"error": "No JSON object found in response"}
+        return parsed
+    
+    def clean_groq_batch_response(self, text):
+        """Extract {listing_id: analysis} from a batched Groq response."""
+        entries = extract_json_array(text)
+        if entries is None:
+            print("No JSON array found in batched response")
+            return {}
         
-        if json_start >= 0 and json_end > json_start:
-            json_str = text[json_start:json_end]
-            try:
-                return json.loads(json_str)
-            except json.JSONDecodeError as e:
-                print(f"JSON decode error: {e}")
-                print(f"Problematic JSON string: {json_str}")
-                return {"error": f"JSON decode error: {str(e)}"}
-        return {"error": "No JSON object found in response"}
+        return {
+            str(entry["listing_id"]): entry["analysis"]
+            for entry in entries
+            if isinstance(entry, dict) and "listing_id" in entry and isinstance(entry.get("analysis"), dict)
+        }
     
     def save_metadata(self, job_id, metadata):
         """Save job metadata."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{job_id}_{timestamp}_metadata.json"
-        filepath = self.metadata_dir / filename
         
         # Add search context to metadata
         metadata.update({
@@ -138,14 +348,11 @@ Return a JSON object with your analysis. Do not include any markdown formatting
             }
         })
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        self.artifact_sink.write(f"{self.run_dir}/metadata.jsonl", {"job_id": job_id, "data": metadata})
     
     def save_groq_response(self, job_id, response):
         """Save GROQ API response."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{job_id}_{timestamp}_groq.json"
-        filepath = self.groq_dir / filename
         
         # Add search context to GROQ response
         if isinstance(response, dict):
@@ -155,14 +362,11 @@ Return a JSON object with your analysis. Do not include any markdown formatting
                 "timestamp": timestamp
             }
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(response, f, indent=2, ensure_ascii=False)
+        self.artifact_sink.write(f"{self.run_dir}/groq_responses.jsonl", {"job_id": job_id, "data": response})
     
     def save_job_listing(self, job_id, job_data):
         """Save processed job listing."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{job_id}_{timestamp}_listing.json"
-        filepath = self.job_listings_dir / filename
         
         # Add search context to job listing
         job_data["search_context"] = {
@@ -172,5 +376,4 @@ Return a JSON object with your analysis. Do not include any markdown formatting
             "timestamp": timestamp
         }
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(job_data, f, indent=2, ensure_ascii=False) 
\ No newline at end of file
+        self.artifact_sink.write(f"{self.run_dir}/job_listings.jsonl", {"job_id": job_id, "data": job_data}) 
\ No newline at end of file
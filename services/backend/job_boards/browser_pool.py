@@ -0,0 +1,154 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager, suppress
+from .metrics import ACTIVE_BROWSERS
+
+# Pool configuration
+BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', 2))
+BROWSER_CONTEXTS_PER_BROWSER = int(os.getenv('BROWSER_CONTEXTS_PER_BROWSER', 4))
+BROWSER_MAX_PAGES = int(os.getenv('BROWSER_MAX_PAGES', 50))
+BROWSER_HEADLESS = os.getenv('BROWSER_HEADLESS', 'true').lower() != 'false'
+
+
+class PooledBrowser:
+    """A launched browser plus the bookkeeping the pool needs to recycle it."""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.active = 0
+        self.pages_served = 0
+        self.retiring = False
+
+    @property
+    def usable(self):
+        return not self.retiring and self.browser.is_connected()
+
+
+class BrowserPool:
+    """Keeps a few long-lived browsers and hands out a fresh context per listing.
+
+    Browsers are launched lazily up to ``size``. Each one serves at most
+    ``contexts_per_browser`` contexts at a time and is retired after
+    ``max_pages`` contexts to bound memory growth. Browsers that crash or
+    disconnect are dropped and replaced on the next checkout.
+    """
+
+    def __init__(self, playwright, size=BROWSER_POOL_SIZE,
+                 contexts_per_browser=BROWSER_CONTEXTS_PER_BROWSER,
+                 max_pages=BROWSER_MAX_PAGES, headless=BROWSER_HEADLESS):
+        self.playwright = playwright
+        self.size = max(1, size)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.max_pages = max(1, max_pages)
+        self.headless = headless
+
+        self._browsers = []
+        self._lock = asyncio.Lock()
+        self._capacity = asyncio.Semaphore(self.size * self.contexts_per_browser)
+        self._closed = False
+
+        # Counters for monitoring
+        self.launches = 0
+        self.recycled = 0
+        self.crashes = 0
+
+    @property
+    def browser_count(self):
+        return len(self._browsers)
+
+    async def _launch(self):
+        browser = await self.playwright.chromium.launch(headless=self.headless)
+        pooled = PooledBrowser(browser)
+        browser.on('disconnected', lambda _: self._discard(pooled, crashed=True))
+        self._browsers.append(pooled)
+        ACTIVE_BROWSERS.inc()
+        self.launches += 1
+        return pooled
+
+    def _discard(self, pooled, crashed=False):
+        if pooled in self._browsers:
+            self._browsers.remove(pooled)
+            ACTIVE_BROWSERS.dec()
+            if crashed and not pooled.retiring and not self._closed:
+                self.crashes += 1
+        pooled.retiring = True
+
+    async def _checkout(self):
+        async with self._lock:
+            if self._closed:
+                raise RuntimeError('Browser pool is closed')
+
+            # Drop browsers that died since the last checkout
+            for pooled in [b for b in self._browsers if not b.retiring and not b.browser.is_connected()]:
+                self._discard(pooled, crashed=True)
+
+            candidates = [b for b in self._browsers
+                          if b.usable and b.active < self.contexts_per_browser]
+            if candidates:
+                pooled = min(candidates, key=lambda b: b.active)
+            else:
+                pooled = await self._launch()
+
+            pooled.active += 1
+            pooled.pages_served += 1
+            if pooled.pages_served >= self.max_pages:
+                pooled.retiring = True
+            return pooled
+
+    async def _checkin(self, pooled):
+        pooled.active -= 1
+        if pooled.retiring and pooled.active == 0:
+            if pooled in self._browsers:
+                self._browsers.remove(pooled)
+                ACTIVE_BROWSERS.dec()
+                self.recycled += 1
+            with suppress(Exception):
+                await pooled.browser.close()
+
+    @asynccontextmanager
+    async def context(self, **context_options):
+        """Yield a fresh browser context, closing it when the block exits."""
+        async with self._capacity:
+            pooled = await self._checkout()
+            try:
+                try:
+                    context = await pooled.browser.new_context(**context_options)
+                except Exception:
+                    if pooled.browser.is_connected():
+                        raise
+                    # The browser crashed between checkout and use; retry once on a new one
+                    self._discard(pooled, crashed=True)
+                    await self._checkin(pooled)
+                    pooled = await self._checkout()
+                    context = await pooled.browser.new_context(**context_options)
+
+                try:
+                    yield context
+                finally:
+                    with suppress(Exception):
+                        await context.close()
+            finally:
+                await self._checkin(pooled)
+
+    @asynccontextmanager
+    async def page(self, **context_options):
+        """Yield a new page living in its own browser context."""
+        async with self.context(**context_options) as context:
+            yield await context.new_page()
+
+    async def close(self):
+        """Close every browser owned by the pool."""
+        async with self._lock:
+            self._closed = True
+            browsers, self._browsers = self._browsers, []
+            ACTIVE_BROWSERS.dec(len(browsers))
+        for pooled in browsers:
+            pooled.retiring = True
+            with suppress(Exception):
+                await pooled.browser.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import aiohttp
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:  # Lightweight extraction is skipped and the boards use Playwright
+    HTMLParser = None
+
+# Lightweight extraction configuration
+SCRAPE_LIGHTWEIGHT = os.getenv('SCRAPE_LIGHTWEIGHT', 'true').lower() != 'false'
+HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', 20))
+HTTP_REQUEST_TIMEOUT = float(os.getenv('HTTP_REQUEST_TIMEOUT', 20))
+HTTP_USER_AGENT = os.getenv(
+    'HTTP_USER_AGENT',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+)
+
+
+def lightweight_available():
+    return SCRAPE_LIGHTWEIGHT and HTMLParser is not None
+
+
+def parse_html(html):
+    """Parse an HTML document into a selectolax tree."""
+    return HTMLParser(html)
+
+
+def node_text(node):
+    """Whitespace-trimmed text content of a node, or '' when it is missing."""
+    return node.text().strip() if node is not None else ''
+
+
+class PageFetcher:
+    """Fetches board pages over pooled keep-alive HTTP connections.
+
+    Like the LLM client, one aiohttp session is kept per running event loop.
+    """
+
+    def __init__(self, max_connections=HTTP_MAX_CONNECTIONS, request_timeout=HTTP_REQUEST_TIMEOUT,
+                 user_agent=HTTP_USER_AGENT):
+        self.max_connections = max_connections
+        self.timeout = aiohttp.ClientTimeout(total=request_timeout)
+        self.headers = {
+            "User-Agent": user_agent,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Language": "en-US,en;q=0.9"
+        }
+        self._sessions = {}
+
+    def _get_session(self):
+        loop = asyncio.get_running_loop()
+        for stale in [l for l in self._sessions if l.is_closed()]:
+            del self._sessions[stale]
+
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=self.timeout,
+                headers=self.headers
+            )
+            self._sessions[loop] = session
+        return session
+
+    async def fetch(self, url):
+        """Return the page body, or None if the server did not answer with 200."""
+        async with self._get_session().get(url) as response:
+            if response.status != 200:
+                return None
+            return await response.text()
+
+    async def close(self):
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+
+
+_fetcher = None
+
+def get_page_fetcher():
+    """Return the process-wide page fetcher, creating it on first use."""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = PageFetcher()
+    return _fetcher
+
+async def close_page_fetcher():
+    if _fetcher is not None:
+        await _fetcher.close()
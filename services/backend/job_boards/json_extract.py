@@ -0,0 +1,278 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # Falls back to the standard library decoder
+    orjson = None
+
+# Next character that can change the nesting (or end a member) outside and inside a string
+_STRUCTURE = re.compile(r'["{}\[\],]')
+_STRING_END = re.compile(r'["\\]')
+
+# A string (kept as is) or a comma right before a closing bracket (dropped)
+_TRAILING_COMMA = re.compile(r'("(?:[^"\\]|\\.)*")|,(\s*[}\]])', re.DOTALL)
+
+
+def loads(text):
+    """Decode JSON with orjson when it is installed. Raises ValueError on bad input."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def strip_trailing_commas(text):
+    """Remove commas directly before } or ], leaving strings untouched."""
+    return _TRAILING_COMMA.sub(lambda m: m.group(1) or m.group(2), text)
+
+
+class JSONScanner:
+    """Finds complete top-level JSON values in text that arrives in pieces.
+
+    Only the characters that change the nesting are looked at: brackets
+    outside strings and quotes and escapes inside them. Text before a
+    value starts, such as prose or markdown fences, is skipped.
+    ``opening`` picks which values are looked for, objects and/or arrays.
+    ``member_end`` is where the last complete member of the pending value
+    ends, i.e. the position of its last top-level comma.
+    """
+
+    def __init__(self, opening='{['):
+        self._find_start = re.compile('[' + re.escape(opening) + ']')
+        self.text = ''
+        self.pos = 0
+        self.start = None
+        self.depth = 0
+        self.in_string = False
+        self.member_end = None
+
+    def feed(self, chunk):
+        """Add text and return the values completed by it, as JSON strings."""
+        text = self.text + chunk
+        pos = self.pos
+        found = []
+        while True:
+            if self.start is None:
+                match = self._find_start.search(text, pos)
+                if match is None:
+                    pos = len(text)
+                    break
+                self.start = match.start()
+                self.depth = 1
+                self.member_end = None
+                pos = match.end()
+            elif self.in_string:
+                match = _STRING_END.search(text, pos)
+                if match is None:
+                    pos = len(text)
+                    break
+                if match.group() == '\\':
+                    if match.end() >= len(text):
+                        # Wait for the escaped character
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                else:
+                    self.in_string = False
+                    pos = match.end()
+            else:
+                match = _STRUCTURE.search(text, pos)
+                if match is None:
+                    pos = len(text)
+                    break
+                char = match.group()
+                pos = match.end()
+                if char == '"':
+                    self.in_string = True
+                elif char == ',':
+                    if self.depth == 1:
+                        self.member_end = match.start()
+                elif char in '{[':
+                    self.depth += 1
+                else:
+                    self.depth -= 1
+                    if self.depth == 0:
+                        found.append(text[self.start:pos])
+                        self.start = None
+
+        # Only keep the value still being read
+        if self.start is None:
+            self.text, self.pos = '', 0
+        else:
+            if self.member_end is not None:
+                self.member_end -= self.start
+            self.text, self.pos, self.start = text[self.start:], pos - self.start, 0
+        return found
+
+    @property
+    def pending(self):
+        """The value read so far that has not been closed yet."""
+        return self.text if self.start is not None else ''
+
+
+class StreamingJSONParser:
+    """Parses a JSON object or array from a response that is still arriving.
+
+    feed() returns the top-level members each chunk completed: (key, value)
+    pairs of an object or (index, element) pairs of an array. Members are
+    only decoded when a top-level comma ends one, so the cost does not grow
+    with the number of chunks. ``result`` is set once the value is complete;
+    complete values rejected by ``accept`` are skipped like invalid ones.
+    """
+
+    def __init__(self, opening='{', accept=None):
+        self.scanner = JSONScanner(opening)
+        self.closer = '}' if opening == '{' else ']'
+        self.accept = accept
+        self.result = None
+        self._members = 0
+        self._decoded_to = None
+
+    def feed(self, chunk):
+        if self.result is not None:
+            return []
+        for candidate in self.scanner.feed(chunk):
+            try:
+                value = decode_lenient(candidate)
+            except ValueError:
+                continue
+            if self.accept is not None and not self.accept(value):
+                continue
+            self.result = value
+            return self._new_members(value)
+
+        end = self.scanner.member_end
+        if end is None or end == self._decoded_to:
+            return []
+        self._decoded_to = end
+        try:
+            value = decode_lenient(self.scanner.pending[:end] + self.closer)
+        except ValueError:
+            return []
+        return self._new_members(value)
+
+    def _new_members(self, value):
+        members = list(value.items() if isinstance(value, dict) else enumerate(value))
+        new, self._members = members[self._members:], max(self._members, len(members))
+        return new
+
+
+def _open_state(text):
+    """Closers still open at the end of ``text``, whether it ends inside a
+    string, and the (position, closers) of each comma outside strings."""
+    closers = []
+    commas = []
+    in_string = False
+    escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            closers.append('}')
+        elif char == '[':
+            closers.append(']')
+        elif char in '}]':
+            if closers:
+                closers.pop()
+        elif char == ',':
+            commas.append((i, ''.join(closers)))
+    return ''.join(closers), in_string, escaped, commas
+
+
+def decode_truncated(text, max_cutbacks=3):
+    """Decode JSON that was cut off, e.g. by max_tokens.
+
+    Open strings and containers are closed and a dangling key gets a null
+    value. If that still does not decode, the unfinished last member is
+    dropped by cutting back to the previous comma. Raises ValueError.
+    """
+    closers, in_string, escaped, commas = _open_state(text)
+    if escaped:
+        text = text[:-1]
+    attempts = [(text + ('"' if in_string else ''), closers)]
+    attempts.extend((text[:pos], open_closers) for pos, open_closers in reversed(commas[-max_cutbacks:]))
+
+    for body, open_closers in attempts:
+        body = body.rstrip()
+        if body.endswith(':'):
+            body += ' null'
+        try:
+            return loads(strip_trailing_commas(body + open_closers[::-1]))
+        except ValueError:
+            continue
+    raise ValueError("Could not repair truncated JSON")
+
+
+def decode_lenient(text, repair=True):
+    """Decode a JSON value, fixing trailing commas if ``repair`` is set. Raises ValueError."""
+    try:
+        return loads(text)
+    except ValueError:
+        if not repair:
+            raise
+    return loads(strip_trailing_commas(text))
+
+
+def is_object_array(value):
+    """Whether ``value`` is a non-empty list of objects, as batched analyses are."""
+    return isinstance(value, list) and bool(value) and all(isinstance(item, dict) for item in value)
+
+
+def extract_json_object(text, repair=True):
+    """Return the first JSON object in an LLM response, or None.
+
+    Balanced values that are not valid JSON, such as braces in prose, are
+    skipped. With ``repair`` trailing commas are dropped and an object
+    cut off at the end of the response is completed.
+    """
+    scanner = JSONScanner('{')
+    for candidate in scanner.feed(text):
+        try:
+            value = decode_lenient(candidate, repair)
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            return value
+
+    if repair and scanner.pending:
+        try:
+            value = decode_truncated(scanner.pending)
+        except ValueError:
+            return None
+        if isinstance(value, dict):
+            return value
+    return None
+
+
+def extract_json_array(text, repair=True):
+    """Return the first JSON array of objects in an LLM response, or None.
+
+    With ``repair``, an array that does not decode, e.g. because it was cut
+    off, yields the complete objects it contains; an unfinished last
+    element is left out rather than guessed.
+    """
+    scanner = JSONScanner('[')
+    for candidate in scanner.feed(text):
+        try:
+            value = decode_lenient(candidate, repair)
+        except ValueError:
+            continue
+        if is_object_array(value):
+            return value
+
+    if not repair or not scanner.pending:
+        return None
+    items = []
+    for candidate in JSONScanner('{').feed(scanner.pending[1:]):
+        try:
+            items.append(decode_lenient(candidate))
+        except ValueError:
+            continue
+    return items or None
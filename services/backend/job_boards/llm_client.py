@@ -0,0 +1,263 @@
+import asyncio
+import json
+import os
+import time
+import aiohttp
+from dotenv import load_dotenv
+from .metrics import LLM_SECONDS, LLM_TOKENS, LLM_WAIT_SECONDS, record_failure
+from .tracing import span
+from .rate_limit import (
+    LLM_BACKOFF_BASE, LLM_BACKOFF_MAX, LLM_MAX_RETRIES,
+    CircuitBreaker, backoff_delay, get_rate_limiter, parse_retry_after
+)
+
+# Load environment variables
+load_dotenv()
+GROQ_API_KEY = os.getenv('GROQ_API_KEY')
+if not GROQ_API_KEY:
+    raise ValueError("GROQ_API_KEY environment variable is not set")
+
+GROQ_API_URL = os.getenv('GROQ_API_URL', 'https://api.groq.com/openai/v1/chat/completions')
+GROQ_MODEL = os.getenv('GROQ_MODEL', 'meta-llama/llama-4-scout-17b-16e-instruct')
+
+# Connection pool configuration
+LLM_MAX_CONNECTIONS = int(os.getenv('LLM_MAX_CONNECTIONS', 20))
+LLM_KEEPALIVE_TIMEOUT = float(os.getenv('LLM_KEEPALIVE_TIMEOUT', 60))
+LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', 10))
+LLM_REQUEST_TIMEOUT = float(os.getenv('LLM_REQUEST_TIMEOUT', 120))
+
+# Stream completions so results can be used before the model finishes
+LLM_STREAM = os.getenv('LLM_STREAM', 'true').lower() != 'false'
+
+
+def estimate_tokens(text):
+    """Rough token count used for budgeting; about four characters per token of English."""
+    return len(text) // 4 + 1
+
+
+def completion_tokens(result):
+    """Completion tokens of a chat-completions body, estimated if it reports no usage."""
+    usage = result.get("usage") or {}
+    if usage.get("completion_tokens") is not None:
+        return usage["completion_tokens"]
+    return sum(estimate_tokens((choice.get("message") or {}).get("content") or "") for choice in result.get("choices") or [])
+
+
+class LLMAPIError(Exception):
+    """Raised when the chat-completions endpoint answers with a non-200 status."""
+
+    def __init__(self, status, body=None, retry_after=None):
+        super().__init__(f"API error: {status}")
+        self.status = status
+        self.body = body
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self):
+        return self.status == 429 or self.status >= 500
+
+
+class LLMClient:
+    """Chat-completions client that keeps connections to Groq alive between calls.
+
+    aiohttp sessions are bound to the event loop that created them, so one
+    session is kept per running loop and created on first use.
+
+    Every call first waits for the shared rate limiter and the circuit
+    breaker. Rate limits (429), server errors and connection failures are
+    retried with jittered exponential backoff that honors Retry-After.
+
+    stream_chat() reads the completion as server-sent events and hands each
+    piece of content to a callback, which can end the generation early.
+    """
+
+    def __init__(self, api_key=GROQ_API_KEY, api_url=GROQ_API_URL, model=GROQ_MODEL,
+                 max_connections=LLM_MAX_CONNECTIONS, keepalive_timeout=LLM_KEEPALIVE_TIMEOUT,
+                 connect_timeout=LLM_CONNECT_TIMEOUT, request_timeout=LLM_REQUEST_TIMEOUT,
+                 max_retries=LLM_MAX_RETRIES, backoff_base=LLM_BACKOFF_BASE, backoff_max=LLM_BACKOFF_MAX,
+                 rate_limiter=None, circuit_breaker=None):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.model = model
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=request_timeout, sock_connect=connect_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.retries = 0
+        self.streams_stopped_early = 0
+        self._sessions = {}
+
+    @property
+    def rate_limiter(self):
+        return self._rate_limiter or get_rate_limiter()
+
+    def _get_session(self):
+        loop = asyncio.get_running_loop()
+
+        # Forget sessions whose event loop has already shut down
+        for stale in [l for l in self._sessions if l.is_closed()]:
+            del self._sessions[stale]
+
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {self.api_key}"
+                }
+            )
+            self._sessions[loop] = session
+        return session
+
+    async def chat(self, messages, model=None, **params):
+        """Send a chat-completions request and return the decoded JSON body."""
+        data = {
+            "model": model or self.model,
+            "messages": messages,
+            **params
+        }
+        return await self._send(messages, lambda: self._post(data))
+
+    async def stream_chat(self, messages, on_content=None, model=None, **params):
+        """Stream a chat completion, calling ``on_content(delta)`` as content arrives.
+
+        If on_content returns True the connection is closed, which stops the
+        generation. Returns a body shaped like chat()'s with the content
+        received and a finish_reason of "early_stop" in that case. Failures
+        after content was handed to on_content are not retried.
+        """
+        data = {
+            "model": model or self.model,
+            "messages": messages,
+            "stream": True,
+            **params
+        }
+        received = False
+
+        def deliver(delta):
+            nonlocal received
+            received = True
+            return on_content(delta) if on_content else False
+
+        return await self._send(messages, lambda: self._post_stream(data, deliver), lambda: not received)
+
+    async def _send(self, messages, request, retryable=None):
+        prompt_tokens = sum(estimate_tokens(message.get("content") or "") for message in messages)
+        with span("llm.chat", model=self.model, prompt_tokens=prompt_tokens) as llm_span:
+            result = await self._send_with_retries(request, prompt_tokens, retryable, llm_span)
+            llm_span.set_attribute("completion_tokens", completion_tokens(result))
+            return result
+
+    async def _send_with_retries(self, request, prompt_tokens, retryable, llm_span):
+        attempt = 0
+        while True:
+            llm_span.set_attribute("attempts", attempt + 1)
+            with LLM_WAIT_SECONDS.time():
+                await self.circuit_breaker.wait()
+                await self.rate_limiter.acquire(prompt_tokens)
+            LLM_TOKENS.labels('prompt').inc(prompt_tokens)
+            start = time.perf_counter()
+            try:
+                result = await request()
+            except (LLMAPIError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                LLM_SECONDS.labels('error').observe(time.perf_counter() - start)
+                record_failure('llm', e)
+                if isinstance(e, LLMAPIError) and not e.retryable:
+                    raise
+                # Being rate limited says nothing about the upstream's health
+                if not (isinstance(e, LLMAPIError) and e.status == 429):
+                    self.circuit_breaker.record_failure()
+                # A retry would repeat content already handed out
+                if attempt >= self.max_retries or (retryable is not None and not retryable()):
+                    raise
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max, getattr(e, 'retry_after', None))
+                print(f"Groq request failed ({str(e) or type(e).__name__}), retrying in {delay:.1f}s")
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(delay)
+                continue
+
+            LLM_SECONDS.labels('ok').observe(time.perf_counter() - start)
+            LLM_TOKENS.labels('completion').inc(completion_tokens(result))
+            self.circuit_breaker.record_success()
+            return result
+
+    async def _post(self, data):
+        async with self._get_session().post(self.api_url, json=data) as response:
+            if response.status != 200:
+                raise LLMAPIError(
+                    response.status,
+                    await response.text(),
+                    parse_retry_after(response.headers.get('Retry-After'))
+                )
+            return await response.json()
+
+    async def _post_stream(self, data, deliver):
+        async with self._get_session().post(self.api_url, json=data) as response:
+            if response.status != 200:
+                raise LLMAPIError(
+                    response.status,
+                    await response.text(),
+                    parse_retry_after(response.headers.get('Retry-After'))
+                )
+
+            content = []
+            finish_reason = None
+            async for line in response.content:
+                line = line.strip()
+                if not line.startswith(b"data:"):
+                    continue
+                payload = line[5:].strip()
+                if payload == b"[DONE]":
+                    break
+
+                choices = json.loads(payload).get("choices") or [{}]
+                delta = (choices[0].get("delta") or {}).get("content")
+                finish_reason = choices[0].get("finish_reason") or finish_reason
+                if delta:
+                    content.append(delta)
+                    if deliver(delta):
+                        # Dropping the connection stops the generation
+                        finish_reason = "early_stop"
+                        self.streams_stopped_early += 1
+                        response.close()
+                        break
+
+            return {
+                "choices": [{
+                    "message": {"role": "assistant", "content": "".join(content)},
+                    "finish_reason": finish_reason
+                }]
+            }
+
+    async def close(self):
+        """Close the session owned by the running event loop."""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+
+
+_client = None
+
+def get_llm_client():
+    """Return the process-wide LLM client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = LLMClient()
+    return _client
+
+async def close_llm_client():
+    """Close the process-wide client's connections for the running event loop."""
+    if _client is not None:
+        await _client.close()
@@ -0,0 +1,166 @@
+import os
+import time
+from contextlib import nullcontext
+
+try:
+    import prometheus_client
+except ImportError:  # Metrics are disabled without it
+    prometheus_client = None
+
+# Metrics configuration; disabled metrics are no-op objects that cost one method call
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() != 'false'
+WORKER_METRICS_PORT = int(os.getenv('WORKER_METRICS_PORT', 9100))
+# Workers sharing a host take the first free port from WORKER_METRICS_PORT on
+WORKER_METRICS_PORT_ATTEMPTS = int(os.getenv('WORKER_METRICS_PORT_ATTEMPTS', 10))
+
+# From quick artifact writes up to slow page loads and batched LLM calls
+LATENCY_BUCKETS = (0.001, 0.005, 0.025, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_NULL_TIMER = nullcontext()
+
+
+def metrics_enabled():
+    return METRICS_ENABLED and prometheus_client is not None
+
+
+class NoopMetric:
+    """Stands in for every metric when metrics are disabled."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, amount):
+        pass
+
+    def time(self):
+        return _NULL_TIMER
+
+
+def _metric(kind, name, documentation, labelnames=(), **options):
+    if not metrics_enabled():
+        return NoopMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labelnames, **options)
+
+
+def _histogram(name, documentation, labelnames=()):
+    return _metric('Histogram', name, documentation, labelnames, buckets=LATENCY_BUCKETS)
+
+
+# Scraping
+LISTINGS_FOUND = _metric('Counter', 'jobboard_listings_found', 'Listings found on search pages', ['board'])
+LISTINGS_PROCESSED = _metric(
+    'Counter', 'jobboard_listings_processed',
+    'Listings handled by the pipeline, by outcome (processed, failed, unchanged)', ['board', 'outcome']
+)
+PAGE_LOAD_SECONDS = _histogram(
+    'jobboard_page_load_seconds', 'Time to load and parse a search or detail page', ['board', 'page', 'method']
+)
+BROWSER_STEP_SECONDS = _histogram(
+    'jobboard_browser_step_seconds', 'Time spent in Playwright page calls (goto, wait_for_selector, evaluate)',
+    ['board', 'step']
+)
+ACTIVE_BROWSERS = _metric('Gauge', 'jobboard_active_browsers', 'Browsers currently launched by browser pools')
+
+# Analysis
+LLM_SECONDS = _histogram('jobboard_llm_seconds', 'Latency of each Groq request', ['outcome'])
+LLM_WAIT_SECONDS = _histogram('jobboard_llm_wait_seconds', 'Time spent waiting for the rate limiter and circuit breaker')
+LLM_TOKENS = _metric('Counter', 'jobboard_llm_tokens', 'Groq tokens by direction; prompt tokens are estimated', ['direction'])
+CACHE_REQUESTS = _metric('Counter', 'jobboard_cache_requests', 'Cache lookups by cache and result', ['cache', 'result'])
+LLM_BATCH_LISTINGS = _metric(
+    'Histogram', 'jobboard_llm_batch_listings', 'Descriptions sent per batched Groq request',
+    buckets=(2, 3, 4, 5, 6, 8, 10, 15, 20)
+)
+LLM_ANALYSES = _metric(
+    'Counter', 'jobboard_llm_analyses',
+    'Descriptions analyzed, by how (batched, single, or fallback to single after a batch)', ['mode']
+)
+
+# Persistence
+ARTIFACT_WRITE_SECONDS = _histogram('jobboard_artifact_write_seconds', 'Time to append one artifact record')
+MONGO_WRITE_SECONDS = _histogram('jobboard_mongo_write_seconds', 'Time of each bulk write of listings', ['operation'])
+
+# API and jobs
+API_REQUEST_SECONDS = _histogram(
+    'jobboard_api_request_seconds', 'Time to answer API requests', ['endpoint', 'method', 'status']
+)
+QUEUE_DEPTH = _metric('Gauge', 'jobboard_queue_depth', 'Jobs waiting in or leased from the queue', ['state'])
+FAILURES = _metric('Counter', 'jobboard_failures', 'Failures by pipeline stage and error type', ['stage', 'type'])
+
+
+def record_failure(stage, error):
+    """Count a failure of ``stage`` under the error's class name."""
+    FAILURES.labels(stage, type(error).__name__).inc()
+
+
+def update_queue_depth(job_queue):
+    """Set the queue depth gauges from Redis."""
+    if metrics_enabled():
+        QUEUE_DEPTH.labels('pending').set(job_queue.depth())
+        QUEUE_DEPTH.labels('in_flight').set(job_queue.in_flight())
+
+
+def _registry():
+    """Registry to expose: with PROMETHEUS_MULTIPROC_DIR set, the samples of every process on the host."""
+    if not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        return prometheus_client.REGISTRY
+    from prometheus_client import multiprocess
+    registry = prometheus_client.CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics():
+    """Return (body, content type) of every metric in the Prometheus text format."""
+    return prometheus_client.generate_latest(_registry()), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port=WORKER_METRICS_PORT, attempts=WORKER_METRICS_PORT_ATTEMPTS):
+    """Serve /metrics from a background thread, for processes without a web app.
+
+    Takes the first free port of ``attempts`` ports starting at ``port`` and
+    returns it, or None if metrics are disabled or every port is taken.
+    """
+    if not metrics_enabled() or not port:
+        return None
+    registry = _registry()
+    for candidate in range(port, port + max(1, attempts)):
+        try:
+            prometheus_client.start_http_server(candidate, registry=registry)
+        except OSError:
+            continue
+        return candidate
+    print(f"Not serving metrics: ports {port}-{port + max(1, attempts) - 1} are all in use")
+    return None
+
+
+class InstrumentedPage:
+    """Wraps a Playwright page to time goto, wait_for_selector and evaluate."""
+
+    timed_steps = ('goto', 'wait_for_selector', 'evaluate')
+
+    def __init__(self, page, board_name):
+        self._page = page
+        self._board_name = board_name
+
+    def __getattr__(self, name):
+        attr = getattr(self._page, name)
+        if name not in self.timed_steps:
+            return attr
+        histogram = BROWSER_STEP_SECONDS.labels(self._board_name, name)
+
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await attr(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return timed
@@ -0,0 +1,164 @@
+import asyncio
+import importlib
+import inspect
+import os
+from collections import defaultdict
+from urllib.parse import urlparse
+from playwright.async_api import async_playwright
+from .base import BaseJobBoard
+from .metrics import CACHE_REQUESTS, LISTINGS_FOUND, LISTINGS_PROCESSED, record_failure
+from .seen_index import get_seen_index, listing_hash
+from .tracing import span
+
+# Default pipeline configuration; override per board with e.g. SCRAPE_CONCURRENCY_REMOTEOK
+SCRAPE_CONCURRENCY = int(os.getenv('SCRAPE_CONCURRENCY', 4))
+SCRAPE_POLITENESS_DELAY = float(os.getenv('SCRAPE_POLITENESS_DELAY', 1.0))
+
+
+def load_board_class(board):
+    """Return the BaseJobBoard subclass defined in job_boards.<board>.board."""
+    module = importlib.import_module(f"job_boards.{board}.board")
+    for _, obj in inspect.getmembers(module, inspect.isclass):
+        if issubclass(obj, BaseJobBoard) and obj is not BaseJobBoard and obj.__module__ == module.__name__:
+            return obj
+    raise ValueError(f"Unknown job board: {board}")
+
+
+def board_setting(board, name, default, cast):
+    """Read a per-board override such as SCRAPE_CONCURRENCY_REMOTEOK from the environment."""
+    value = os.getenv(f"{name}_{board.board_name.upper()}")
+    return cast(value) if value is not None else default
+
+
+async def notify(callback, *args):
+    """Call an optional progress callback, awaiting it if it returns an awaitable."""
+    if callback:
+        reported = callback(*args)
+        if inspect.isawaitable(reported):
+            await reported
+
+
+class DomainThrottle:
+    """Spaces out request starts to the same domain by a minimum delay."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self._next_start = {}
+        self._locks = defaultdict(asyncio.Lock)
+
+    async def wait(self, url):
+        domain = urlparse(url).netloc
+        async with self._locks[domain]:
+            loop = asyncio.get_running_loop()
+            wait_for = self._next_start.get(domain, 0) - loop.time()
+            if wait_for > 0:
+                await asyncio.sleep(wait_for)
+            self._next_start[domain] = loop.time() + self.delay
+
+
+async def process_jobs(board, jobs, playwright, concurrency=None, politeness_delay=None, on_progress=None):
+    """Process listings concurrently and return the results in listing order.
+
+    At most ``concurrency`` listings are in flight at once and detail page
+    loads to the same domain start at least ``politeness_delay`` seconds
+    apart. ``on_progress(done, total, index, job, result)`` is called as each
+    listing finishes (and awaited if it is a coroutine function); ``result``
+    is None when the board failed to process it.
+    """
+    if concurrency is None:
+        concurrency = board_setting(board, 'SCRAPE_CONCURRENCY', SCRAPE_CONCURRENCY, int)
+    if politeness_delay is None:
+        politeness_delay = board_setting(board, 'SCRAPE_POLITENESS_DELAY', SCRAPE_POLITENESS_DELAY, float)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    throttle = DomainThrottle(politeness_delay)
+    total = len(jobs)
+    done = 0
+
+    async def run(index, job):
+        nonlocal done
+        async with semaphore:
+            await throttle.wait(board.base_url)
+            try:
+                with span("process_job", board=board.board_name, listing_id=str(job.get('job_id', '')), rank=index):
+                    result = await board.process_job(job, playwright)
+            except Exception as e:
+                print(f"Error processing job {job.get('position', '')}: {str(e)}")
+                record_failure('listing', e)
+                result = None
+        LISTINGS_PROCESSED.labels(board.board_name, 'processed' if result else 'failed').inc()
+        done += 1
+        await notify(on_progress, done, total, index, job, result)
+        return result
+
+    return await asyncio.gather(*(run(i, job) for i, job in enumerate(jobs)))
+
+
+async def run_search(board, limit, concurrency=None, politeness_delay=None, on_progress=None,
+                     on_unchanged=None, on_partial_analysis=None, force_refresh=False, seen_hashes=None):
+    """Scrape the board's search page and process up to ``limit`` listings.
+
+    Listings processed before whose search-page data has not changed since
+    are skipped unless ``force_refresh`` is set: ``on_unchanged(index, job)``
+    is called for each of them instead and their result is None. Indexes
+    passed to both callbacks are positions in the search results.
+    ``on_partial_analysis(listing_id, fields)`` gets analysis fields while
+    they stream in.
+
+    Processed listings are marked seen before returning. Callers that store
+    the results themselves pass a dict as ``seen_hashes`` instead; it gets
+    the {listing_id: listing_hash} to pass to mark_seen() once the results
+    are stored, so listings whose results were lost are processed again.
+    """
+    seen_index = get_seen_index()
+    board.on_partial_analysis = on_partial_analysis
+    async with async_playwright() as playwright:
+        try:
+            with span("extract_job_listings", board=board.board_name) as search_span:
+                listings = await board.get_job_listings(playwright)
+                search_span.set_attribute("listings", len(listings))
+            LISTINGS_FOUND.labels(board.board_name).inc(len(listings))
+            jobs = listings[:limit]
+
+            # Hash before processing; process_job adds its results to the listing dicts
+            hashes = [listing_hash(job) for job in jobs]
+            unchanged = set() if force_refresh else await seen_index.unchanged(board.board_name, jobs)
+            if not force_refresh:
+                CACHE_REQUESTS.labels('seen_listing', 'hit').inc(len(unchanged))
+                CACHE_REQUESTS.labels('seen_listing', 'miss').inc(len(jobs) - len(unchanged))
+            LISTINGS_PROCESSED.labels(board.board_name, 'unchanged').inc(len(unchanged))
+            for index in sorted(unchanged):
+                await notify(on_unchanged, index, jobs[index])
+            fresh = [i for i in range(len(jobs)) if i not in unchanged]
+
+            def report_progress(done, total, index, job, result):
+                if on_progress:
+                    return on_progress(done, total, fresh[index], job, result)
+
+            processed = await process_jobs(
+                board, [jobs[i] for i in fresh], playwright,
+                concurrency=concurrency,
+                politeness_delay=politeness_delay,
+                on_progress=report_progress
+            )
+
+            # Listings whose analysis failed are tried again next time
+            processed_hashes = {
+                jobs[i]['job_id']: hashes[i]
+                for i, result in zip(fresh, processed)
+                if result and jobs[i].get('job_id') and "error" not in (result.get('parsed_description') or {})
+            }
+            if seen_hashes is None:
+                await seen_index.mark_seen(board.board_name, processed_hashes)
+            else:
+                seen_hashes.update(processed_hashes)
+
+            results = [None] * len(jobs)
+            for i, result in zip(fresh, processed):
+                results[i] = result
+            print(f"Skipped {len(unchanged)} unchanged listings on {board.board_name}")
+            return results
+        finally:
+            print(f"Request filter stats for {board.board_name}: {board.request_filter.stats()}")
+            print(f"Pages scraped for {board.board_name}: {dict(board.scrape_stats)}")
+            await board.close()
@@ -0,0 +1,53 @@
+import os
+import re
+from .llm_client import estimate_tokens
+
+# Descriptions are cut to roughly this many tokens before being sent to Groq
+DESCRIPTION_TOKEN_BUDGET = int(os.getenv('DESCRIPTION_TOKEN_BUDGET', 3000))
+
+# Lines that are never part of a job description on any board
+COMMON_BOILERPLATE = (
+    r'apply( now| for this (job|position))?',
+    r'share this (job|position):?',
+    r'report this job',
+    r'save( job)?',
+)
+
+
+def preprocess_description(text, boilerplate=(), max_tokens=DESCRIPTION_TOKEN_BUDGET):
+    """Clean a scraped description and cap its size.
+
+    Whitespace is collapsed line by line, lines matching a boilerplate
+    pattern in full (case-insensitively) are dropped, repeated lines are
+    kept once, and the result is cut at ``max_tokens`` estimated tokens.
+    Returns (text, counts) where counts holds the estimated token count of
+    the original and of the cleaned text.
+    """
+    patterns = [re.compile(pattern, re.IGNORECASE) for pattern in (*COMMON_BOILERPLATE, *boilerplate)]
+
+    lines = []
+    seen = set()
+    for line in text.splitlines():
+        line = ' '.join(line.split())
+        if not line or any(pattern.fullmatch(line) for pattern in patterns):
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+
+    cleaned = truncate_to_tokens('\n'.join(lines), max_tokens)
+    return cleaned, {
+        "original_tokens": estimate_tokens(text) if text else 0,
+        "sent_tokens": estimate_tokens(cleaned) if cleaned else 0
+    }
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text to about ``max_tokens`` estimated tokens, at a word boundary."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[:(max_tokens - 1) * 4]
+    space = cut.rfind(' ')
+    return cut[:space] if space > 0 else cut
@@ -0,0 +1,205 @@
+import asyncio
+import os
+import random
+import time
+
+# Groq limits shared by every worker; 0 disables a limit
+GROQ_REQUESTS_PER_MINUTE = int(os.getenv('GROQ_REQUESTS_PER_MINUTE', 30))
+GROQ_TOKENS_PER_MINUTE = int(os.getenv('GROQ_TOKENS_PER_MINUTE', 30000))
+
+# Retry and circuit breaker configuration
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 4))
+LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', 1.0))
+LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', 60.0))
+LLM_BREAKER_THRESHOLD = int(os.getenv('LLM_BREAKER_THRESHOLD', 5))
+LLM_BREAKER_RESET_TIMEOUT = float(os.getenv('LLM_BREAKER_RESET_TIMEOUT', 30.0))
+
+# Takes from a request bucket and a token bucket together, or from neither.
+# KEYS: request bucket, token bucket
+# ARGV: now, requests per minute, tokens per minute, tokens wanted
+# Returns the milliseconds to wait before trying again, 0 when taken.
+TAKE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local wait = 0
+local levels = {}
+for i = 1, 2 do
+    local capacity = tonumber(ARGV[i + 1])
+    local wanted = i == 1 and 1 or math.min(tonumber(ARGV[4]), capacity)
+    if capacity > 0 then
+        local state = redis.call('HMGET', KEYS[i], 'level', 'ts')
+        local level = tonumber(state[1]) or capacity
+        local ts = tonumber(state[2]) or now
+        level = math.min(capacity, level + (now - ts) * capacity / 60)
+        levels[i] = {level, wanted}
+        if level < wanted then
+            wait = math.max(wait, (wanted - level) * 60 / capacity)
+        end
+    end
+end
+for i = 1, 2 do
+    if levels[i] then
+        local level = levels[i][1]
+        if wait == 0 then
+            level = level - levels[i][2]
+        end
+        redis.call('HSET', KEYS[i], 'level', tostring(level), 'ts', tostring(now))
+        redis.call('EXPIRE', KEYS[i], 120)
+    end
+end
+return math.ceil(wait * 1000)
+"""
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header, or None if it is missing or not a number."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base=LLM_BACKOFF_BASE, maximum=LLM_BACKOFF_MAX, retry_after=None):
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    delay = random.uniform(0, min(maximum, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, maximum))
+    return delay
+
+
+class TokenBucketLimiter:
+    """Requests-per-minute and tokens-per-minute limits shared through Redis.
+
+    Both buckets refill continuously and a call takes one request and its
+    estimated tokens from them atomically. Without Redis, or if Redis
+    fails, the buckets are kept in process.
+    """
+
+    def __init__(self, redis_client=None, requests_per_minute=GROQ_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=GROQ_TOKENS_PER_MINUTE, prefix='llm:ratelimit'):
+        self.redis = redis_client
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.keys = [f"{prefix}:requests", f"{prefix}:tokens"]
+        self._take_script = redis_client.register_script(TAKE_SCRIPT) if redis_client is not None else None
+        self._local = {}
+
+        # Counters for monitoring
+        self.waits = 0
+        self.seconds_waited = 0.0
+
+    async def acquire(self, tokens=0):
+        """Wait until a request using ``tokens`` tokens fits in both limits."""
+        while True:
+            wait = await self._take(tokens)
+            if wait <= 0:
+                return
+            self.waits += 1
+            self.seconds_waited += wait
+            await asyncio.sleep(wait)
+
+    async def _take(self, tokens):
+        if self.requests_per_minute <= 0 and self.tokens_per_minute <= 0:
+            return 0
+        now = time.time()
+        if self._take_script is not None:
+            try:
+                wait_ms = await asyncio.to_thread(
+                    self._take_script,
+                    keys=self.keys,
+                    args=[now, self.requests_per_minute, self.tokens_per_minute, tokens]
+                )
+                return int(wait_ms) / 1000
+            except Exception as e:
+                print(f"Rate limiter Redis error, limiting in process: {str(e)}")
+        return self._take_local(now, tokens)
+
+    def _take_local(self, now, tokens):
+        buckets = []
+        wait = 0
+        for key, capacity, wanted in zip(self.keys, (self.requests_per_minute, self.tokens_per_minute), (1, tokens)):
+            if capacity <= 0:
+                continue
+            wanted = min(wanted, capacity)
+            level, ts = self._local.get(key, (capacity, now))
+            level = min(capacity, level + (now - ts) * capacity / 60)
+            buckets.append((key, level, wanted))
+            if level < wanted:
+                wait = max(wait, (wanted - level) * 60 / capacity)
+
+        for key, level, wanted in buckets:
+            self._local[key] = (level - wanted if wait == 0 else level, now)
+        return wait
+
+    def stats(self):
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "waits": self.waits,
+            "seconds_waited": round(self.seconds_waited, 3)
+        }
+
+
+class CircuitBreaker:
+    """Pauses calls to an upstream after repeated failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    callers wait in wait() until ``reset_timeout`` seconds have passed.
+    Calls then go through again; one more failure reopens the circuit and
+    a success closes it.
+    """
+
+    def __init__(self, failure_threshold=LLM_BREAKER_THRESHOLD, reset_timeout=LLM_BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+        # Counters for monitoring
+        self.times_opened = 0
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "open" if self.retry_after() > 0 else "half-open"
+
+    def retry_after(self):
+        """Seconds until calls may go through again."""
+        if self.opened_at is None:
+            return 0
+        return max(0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    async def wait(self):
+        delay = self.retry_after()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.opened_at = time.monotonic()
+
+    def stats(self):
+        return {"state": self.state, "failures": self.failures, "times_opened": self.times_opened}
+
+
+_limiter = None
+
+def init_rate_limiter(redis_client=None, **options):
+    """Create the process-wide limiter, sharing its buckets through Redis if a client is given."""
+    global _limiter
+    _limiter = TokenBucketLimiter(redis_client, **options)
+    return _limiter
+
+def get_rate_limiter():
+    """Return the process-wide limiter, limiting in process if init_rate_limiter was not called."""
+    global _limiter
+    if _limiter is None:
+        _limiter = TokenBucketLimiter()
+    return _limiter
@@ -1,18 +1,17 @@
 import re
-import json
-import aiohttp
-import os
-from datetime import datetime
-from dotenv import load_dotenv
 from ..base import BaseJobBoard
-
-# Load environment variables
-load_dotenv()
-GROQ_API_KEY = os.getenv('GROQ_API_KEY')
-if not GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY environment variable is not set")
+from ..http_fetch import node_text, parse_html
 
 class RemoteOKBoard(BaseJobBoard):
+    # Search and detail pages are server-rendered
+    allowed_resource_types = {"document"}
+    lightweight = True
+    boilerplate_patterns = (
+        r'please mention the word .* when applying.*',
+        r'apply for this job.*',
+        r'[\d,]+ (views|applied).*',
+    )
+    
     def get_base_url(self):
         return "https://remoteok.com"
     
@@ -43,60 +42,117 @@ class RemoteOKBoard(BaseJobBoard):
             return jobs;
         }''')
     
-    async def process_job(self, job, playwright):
-        """Process a single job listing."""
-        browser = await playwright.chromium.launch(headless=False)
-        page = await browser.new_page()
+    def parse_job_listings_html(self, html):
+        """Extract job listings from search page HTML without a browser."""
+        jobs = []
+        for job in parse_html(html).css('tr.job'):
+            jobs.append({
+                "position": node_text(job.css_first('h2')),
+                "company": node_text(job.css_first('h3')),
+                "location": node_text(job.css_first('.location')),
+                "salary": node_text(job.css_first('.salary')),
+                "tags": [node_text(tag) for tag in job.css('.tags .tag')],
+                "posted": '',
+                "description": node_text(job.css_first('.description')),
+                "job_id": job.attributes.get('data-id') or ''
+            })
+        return jobs
+    
+    def parse_job_details_html(self, html):
+        """Extract the full description and job details from detail page HTML."""
+        tree = parse_html(html)
+        desc = tree.css_first('.description')
+        if desc is None:
+            return None
+        for script in desc.css('script'):
+            script.decompose()
+        full_description = node_text(desc)
         
-        try:
-            # Navigate to the job listing
-            job_url = f"{self.base_url}/remote-jobs/{job['job_id']}"
-            await page.goto(job_url)
-            
-            # Wait for the content to load
-            await page.wait_for_selector('.description', timeout=10000)
-            
-            # Get the full job description
-            full_description = await page.evaluate('''() => {
-                const desc = document.querySelector('.description');
-                if (!desc) return '';
-                Array.from(desc.querySelectorAll('script')).forEach(s => s.remove());
-                return desc.textContent.trim();
-            }''')
-            
-            # Extract additional job details
-            job_details = await page.evaluate('''() => {
-                const details = {};
+        details = {}
+        
+        # Get exact posting time from datetime attribute
+        time_element = tree.css_first('time')
+        if time_element is not None:
+            details['posted'] = time_element.attributes.get('datetime')
+        
+        # Get company profile stats
+        company_profile = tree.css_first('.company_profile')
+        if company_profile is not None:
+            paragraphs = company_profile.css('p')
+            if len(paragraphs) >= 2:
+                # First paragraph contains views
+                details['views'] = node_text(paragraphs[0])
                 
-                // Get exact posting time from datetime attribute
-                const timeElement = document.querySelector('time');
-                if (timeElement) {
-                    details.posted = timeElement.getAttribute('datetime');
-                }
+                # Second paragraph contains applicants and apply percentage
+                apply_stats = node_text(paragraphs[1])
+                applicants_match = re.search(r'(\d+)\s+applied', apply_stats)
+                percentage_match = re.search(r'\((\d+)%\)', apply_stats)
                 
-                // Get company profile stats
-                const companyProfile = document.querySelector('.company_profile');
-                if (companyProfile) {
-                    const paragraphs = companyProfile.querySelectorAll('p');
-                    if (paragraphs.length >= 2) {
-                        // First paragraph contains views
-                        details.views = paragraphs[0].innerText.trim();
-                        
-                        // Second paragraph contains applicants and apply percentage
-                        const applyStats = paragraphs[1].innerText.trim();
-                        const applicantsMatch = applyStats.match(/(\d+)\s+applied/);
-                        const percentageMatch = applyStats.match(/\((\d+)%\)/);
-                        
-                        if (applicantsMatch) details.applicants = applicantsMatch[1];
-                        if (percentageMatch) details.apply_percentage = percentageMatch[1] + '%';
-                    }
+                if applicants_match:
+                    details['applicants'] = applicants_match.group(1)
+                if percentage_match:
+                    details['apply_percentage'] = percentage_match.group(1) + '%'
+        
+        return full_description, details
+    
+    async def scrape_job_details(self, page):
+        """Extract the full description and job details from a loaded detail page."""
+        # Wait for the content to load
+        await page.wait_for_selector('.description', timeout=10000)
+        
+        # Get the full job description
+        full_description = await page.evaluate('''() => {
+            const desc = document.querySelector('.description');
+            if (!desc) return '';
+            Array.from(desc.querySelectorAll('script')).forEach(s => s.remove());
+            return desc.textContent.trim();
+        }''')
+        
+        # Extract additional job details
+        job_details = await page.evaluate('''() => {
+            const details = {};
+            
+            // Get exact posting time from datetime attribute
+            const timeElement = document.querySelector('time');
+            if (timeElement) {
+                details.posted = timeElement.getAttribute('datetime');
+            }
+            
+            // Get company profile stats
+            const companyProfile = document.querySelector('.company_profile');
+            if (companyProfile) {
+                const paragraphs = companyProfile.querySelectorAll('p');
+                if (paragraphs.length >= 2) {
+                    // First paragraph contains views
+                    details.views = paragraphs[0].innerText.trim();
+                    
+                    // Second paragraph contains applicants and apply percentage
+                    const applyStats = paragraphs[1].innerText.trim();
+                    const applicantsMatch = applyStats.match(/(\d+)\s+applied/);
+                    const percentageMatch = applyStats.match(/\((\d+)%\)/);
+                    
+                    if (applicantsMatch) details.applicants = applicantsMatch[1];
+                    if (percentageMatch) details.apply_percentage = percentageMatch[1] + '%';
                 }
-                
-                return details;
-            }''')
+            }
+            
+            return details;
+        }''')
+        
+        return full_description, job_details
+    
+    async def process_job(self, job, playwright):
+        """Process a single job listing."""
+        try:
+            # Fetch the detail page over HTTP when possible, otherwise with the browser
+            job_url = f"{self.base_url}/remote-jobs/{job['job_id']}"
+            full_description, job_details = await self.get_job_details(job_url, playwright)
             
             print(f"\nJob Description Length: {len(full_description)} characters")
             
+            # Drop boilerplate and cap the size of what is sent to Groq
+            description, token_counts = self.prepare_description(full_description)
+            
             # Save metadata
             metadata = {
                 "job_id": job['job_id'],
@@ -110,12 +166,14 @@ class RemoteOKBoard(BaseJobBoard):
                 "views": job_details.get('views', ''),
                 "applicants": job_details.get('applicants', ''),
                 "apply_percentage": job_details.get('apply_percentage', ''),
-                "description_length": len(full_description)
+                "description_length": len(full_description),
+                "original_tokens": token_counts["original_tokens"],
+                "sent_tokens": token_counts["sent_tokens"]
             }
             self.save_metadata(job['job_id'], metadata)
             
             # Parse the description using Groq API
-            parsed_description = await self.parse_job_description(full_description)
+            parsed_description = await self.parse_job_description(description, listing_id=job['job_id'])
             
             # Save GROQ response
             self.save_groq_response(job['job_id'], parsed_description)
@@ -136,79 +194,3 @@ class RemoteOKBoard(BaseJobBoard):
         except Exception as e:
             print(f"Error processing job {job['position']}: {str(e)}")
             return None
-            
-        finally:
-            await browser.close()
-    
-    async def parse_job_description(self, text):
-        """Parse job description using GROQ API."""
-        if not text:
-            return {"error": "Empty description"}
-            
-        async with aiohttp.ClientSession() as session:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {GROQ_API_KEY}"
-            }
-            
-            prompt = f"""Analyze the following job description and create a structured JSON representation of the key information. 
-Organize the information in a way that makes sense for this specific job posting.
-Focus on extracting the most important details that would help a candidate understand the role and requirements.
-
-Here's the job description:
-{text}
-
-Return a JSON object with your analysis. Do not include any markdown formatting or additional text."""
-            
-            data = {
-                "model": "meta-llama/llama-4-scout-17b-16e-instruct",
-                "messages": [{
-                    "role": "user",
-                    "content": prompt
-                }],
-                "temperature": 0.1,
-                "max_tokens": 2000
-            }
-            
-            try:
-                async with session.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    headers=headers,
-                    json=data
-                ) as response:
-                    if response.status != 200:
-                        return {"error": f"API error: {response.status}"}
-                        
-                    result = await response.json()
-                    if "choices" not in result or not result["choices"]:
-                        return {"error": "No choices in API response"}
-                        
-                    parsed_text = result["choices"][0]["message"]["content"]
-                    print("\nRaw Groq Response:")
-                    print("-" * 50)
-                    print(parsed_text)
-                    print("-" * 50)
-                    
-                    return self.clean_groq_response(parsed_text)
-                    
-            except Exception as e:
-                return {"error": f"Request failed: {str(e)}"}
-    
-    def clean_groq_response(self, text):
-        """Clean the Groq response to extract valid JSON."""
-        # Remove markdown code block markers if present
-        text = text.replace('```json', '').replace('```', '').strip()
-        
-        # Find the first { and last }
-        json_start = text.find('{')
-        json_end = text.rfind('}') + 1
-        
-        if json_start >= 0 and json_end > json_start:
-            json_str = text[json_start:json_end]
-            try:
-                return json.loads(json_str)
-            except json.JSONDecodeError as e:
-                print(f"JSON decode error: {e}")
-                print(f"Problematic JSON string: {json_str}")
-                return {"error": f"JSON decode error: {str(e)}"}
-        return {"error": "No JSON object found in response"} 
\ No newline at end of file
@@ -0,0 +1,79 @@
+import functools
+import os
+from collections import Counter
+from urllib.parse import urlparse
+
+SCRAPE_BLOCK_RESOURCES = os.getenv('SCRAPE_BLOCK_RESOURCES', 'true').lower() != 'false'
+
+# Rough transfer size of a blocked request by resource type, used to estimate savings
+TYPICAL_RESOURCE_BYTES = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 30_000,
+    "script": 80_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+}
+DEFAULT_RESOURCE_BYTES = 10_000
+
+
+class RequestFilter:
+    """Aborts requests a scrape does not need, using Playwright request routing.
+
+    A request is let through only if its resource type is in
+    ``allowed_types`` and its host is one of ``allowed_domains`` or a
+    subdomain of one; install() can let more types through on a given
+    page. Counts of allowed and blocked requests, the bytes
+    actually received and an estimate of the bytes saved are kept for
+    monitoring.
+    """
+
+    def __init__(self, allowed_types, allowed_domains, enabled=SCRAPE_BLOCK_RESOURCES):
+        self.allowed_types = set(allowed_types)
+        self.allowed_domains = {domain.lower().lstrip('.') for domain in allowed_domains}
+        self.enabled = enabled
+
+        # Counters for monitoring
+        self.allowed = 0
+        self.blocked = Counter()
+        self.bytes_received = 0
+        self.estimated_bytes_saved = 0
+
+    def is_allowed(self, resource_type, url, extra_types=()):
+        if resource_type not in self.allowed_types and resource_type not in extra_types:
+            return False
+        host = (urlparse(url).hostname or '').lower()
+        return any(host == domain or host.endswith(f".{domain}") for domain in self.allowed_domains)
+
+    async def install(self, page, extra_types=()):
+        """Route every request of the page through the filter, also allowing ``extra_types`` on it."""
+        if not self.enabled:
+            return
+        page.on('response', self._record_response)
+        await page.route('**/*', functools.partial(self._handle_route, extra_types=frozenset(extra_types)))
+
+    async def _handle_route(self, route, extra_types=()):
+        request = route.request
+        if self.is_allowed(request.resource_type, request.url, extra_types):
+            self.allowed += 1
+            await route.continue_()
+        else:
+            self.blocked[request.resource_type] += 1
+            self.estimated_bytes_saved += TYPICAL_RESOURCE_BYTES.get(request.resource_type, DEFAULT_RESOURCE_BYTES)
+            await route.abort()
+
+    def _record_response(self, response):
+        try:
+            self.bytes_received += int(response.headers.get('content-length', 0))
+        except (TypeError, ValueError):
+            pass
+
+    def stats(self):
+        return {
+            "allowed": self.allowed,
+            "blocked": sum(self.blocked.values()),
+            "blocked_by_type": dict(self.blocked),
+            "bytes_received": self.bytes_received,
+            "estimated_bytes_saved": self.estimated_bytes_saved
+        }
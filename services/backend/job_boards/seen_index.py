@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+# Listings are processed again once they were last processed this long ago
+SEEN_LISTING_MAX_AGE = int(os.getenv('SEEN_LISTING_MAX_AGE', 7 * 24 * 3600))
+
+
+def listing_hash(job):
+    """Fingerprint of a listing as shown on the search page, to notice edits."""
+    encoded = json.dumps(job, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class SeenIndex:
+    """Remembers which listings of a board were processed, and in what state.
+
+    Each processed listing is stored under seen:{board}:{listing_id} with
+    the hash of its search-page data and a TTL of ``max_age``, so a listing
+    is processed again when it changes or once its entry expires. Without
+    Redis the index is kept in process.
+    """
+
+    def __init__(self, redis_client=None, max_age=SEEN_LISTING_MAX_AGE):
+        self.redis = redis_client
+        self.max_age = max_age
+        self._local = {}
+
+    @staticmethod
+    def key(board_name, listing_id):
+        return f"seen:{board_name}:{listing_id}"
+
+    async def unchanged(self, board_name, jobs):
+        """Return the indexes of ``jobs`` that were processed before and have not changed since."""
+        candidates = [(i, job) for i, job in enumerate(jobs) if job.get('job_id')]
+        if not candidates:
+            return set()
+
+        keys = [self.key(board_name, job['job_id']) for _, job in candidates]
+        if self.redis is not None:
+            stored = await asyncio.to_thread(self.redis.mget, keys)
+        else:
+            now = time.monotonic()
+            stored = [
+                entry[0] if entry and entry[1] > now else None
+                for entry in (self._local.get(key) for key in keys)
+            ]
+
+        return {
+            i for (i, job), seen_hash in zip(candidates, stored)
+            if seen_hash is not None and seen_hash == listing_hash(job)
+        }
+
+    async def mark_seen(self, board_name, hashes):
+        """Record processed listings given as {listing_id: listing_hash}."""
+        if not hashes:
+            return
+        if self.redis is not None:
+            pipe = self.redis.pipeline()
+            for listing_id, digest in hashes.items():
+                pipe.set(self.key(board_name, listing_id), digest, ex=self.max_age)
+            await asyncio.to_thread(pipe.execute)
+        else:
+            expires = time.monotonic() + self.max_age
+            for listing_id, digest in hashes.items():
+                self._local[self.key(board_name, listing_id)] = (digest, expires)
+
+
+_index = None
+
+def init_seen_index(redis_client=None, **options):
+    """Create the process-wide index, stored in Redis if a client is given."""
+    global _index
+    _index = SeenIndex(redis_client, **options)
+    return _index
+
+def get_seen_index():
+    """Return the process-wide index, kept in process if init_seen_index was not called."""
+    global _index
+    if _index is None:
+        _index = SeenIndex()
+    return _index
@@ -0,0 +1,193 @@
+import os
+from abc import ABC, abstractmethod
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import boto3
+except ImportError:  # Only needed for the S3 backend
+    boto3 = None
+
+# Storage configuration
+ARTIFACT_STORAGE = os.getenv('ARTIFACT_STORAGE', 'local')
+ARTIFACTS_DIR = os.getenv('ARTIFACTS_DIR', 'artifacts')
+ARTIFACT_GRIDFS_BUCKET = os.getenv('ARTIFACT_GRIDFS_BUCKET', 'artifacts')
+ARTIFACT_S3_BUCKET = os.getenv('ARTIFACT_S3_BUCKET', 'job-board-artifacts')
+ARTIFACT_S3_ENDPOINT_URL = os.getenv('ARTIFACT_S3_ENDPOINT_URL')
+ARTIFACT_S3_PREFIX = os.getenv('ARTIFACT_S3_PREFIX', '')
+ARTIFACT_S3_PART_SIZE = int(os.getenv('ARTIFACT_S3_PART_SIZE', 8 * 1024 * 1024))
+ARTIFACT_S3_UPLOAD_CONCURRENCY = int(os.getenv('ARTIFACT_S3_UPLOAD_CONCURRENCY', 4))
+
+# S3 rejects multipart parts smaller than this, except the last one
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class ArtifactStorage(ABC):
+    """Where artifact files live. Names are relative paths such as remoteok/devops/<run>/metadata.jsonl."""
+
+    @abstractmethod
+    def open(self, name):
+        """Open a stream that appends to ``name``; it has write(), flush(), sync() and close()."""
+        pass
+
+
+class LocalStorage(ArtifactStorage):
+    """Files under a directory on local disk; reopened files are appended to."""
+
+    def __init__(self, root=ARTIFACTS_DIR):
+        self.root = Path(root)
+
+    def open(self, name):
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return LocalStream(open(path, 'ab'))
+
+
+class LocalStream:
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, data):
+        return self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.sync()
+        self.file.close()
+
+
+class GridFSStorage(ArtifactStorage):
+    """Files in a MongoDB GridFS bucket, streamed in chunks as they are written.
+
+    GridFS files cannot be appended to, so reopening a name stores another
+    revision under the same filename; read all revisions in upload order.
+    """
+
+    def __init__(self, db, bucket_name=ARTIFACT_GRIDFS_BUCKET):
+        from gridfs import GridFSBucket
+        self.bucket = GridFSBucket(db, bucket_name=bucket_name)
+
+    def open(self, name):
+        return GridFSStream(self.bucket.open_upload_stream(name))
+
+
+class GridFSStream:
+    def __init__(self, upload):
+        self.upload = upload
+
+    def write(self, data):
+        self.upload.write(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def sync(self):
+        # Full chunks are already in MongoDB; the tail is written on close
+        pass
+
+    def close(self):
+        self.upload.close()
+
+
+class S3Storage(ArtifactStorage):
+    """Objects in an S3-compatible bucket (AWS, MinIO, ...) written with multipart uploads.
+
+    Objects cannot be appended to, so reopening a name writes a new object
+    with a numeric suffix (name.1, name.2, ...).
+    """
+
+    def __init__(self, bucket=ARTIFACT_S3_BUCKET, prefix=ARTIFACT_S3_PREFIX, client=None,
+                 endpoint_url=ARTIFACT_S3_ENDPOINT_URL, part_size=ARTIFACT_S3_PART_SIZE,
+                 upload_concurrency=ARTIFACT_S3_UPLOAD_CONCURRENCY):
+        if client is None:
+            if boto3 is None:
+                raise RuntimeError("boto3 is required for ARTIFACT_STORAGE=s3")
+            client = boto3.client('s3', endpoint_url=endpoint_url)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.part_size = max(part_size, S3_MIN_PART_SIZE)
+        self.executor = ThreadPoolExecutor(max_workers=upload_concurrency, thread_name_prefix="artifact-upload")
+        self._opened = Counter()
+
+    def open(self, name):
+        key = f"{self.prefix}/{name}" if self.prefix else name
+        if self._opened[name]:
+            key = f"{key}.{self._opened[name]}"
+        self._opened[name] += 1
+        return S3Stream(self, key)
+
+
+class S3Stream:
+    """Buffers writes and uploads each full part in the background."""
+
+    def __init__(self, storage, key):
+        self.storage = storage
+        self.client = storage.client
+        self.key = key
+        self.buffer = bytearray()
+        self.upload_id = None
+        self.parts = []
+
+    def write(self, data):
+        self.buffer.extend(data)
+        if len(self.buffer) >= self.storage.part_size:
+            self._upload_part()
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def sync(self):
+        # Parts below the minimum size cannot be uploaded until the stream is closed
+        pass
+
+    def _upload_part(self):
+        if self.upload_id is None:
+            self.upload_id = self.client.create_multipart_upload(Bucket=self.storage.bucket, Key=self.key)['UploadId']
+        number = len(self.parts) + 1
+        body, self.buffer = bytes(self.buffer), bytearray()
+        self.parts.append((number, self.storage.executor.submit(
+            self.client.upload_part,
+            Bucket=self.storage.bucket, Key=self.key, UploadId=self.upload_id,
+            PartNumber=number, Body=body
+        )))
+
+    def close(self):
+        if self.upload_id is None:
+            # Small enough for a single request
+            self.client.put_object(Bucket=self.storage.bucket, Key=self.key, Body=bytes(self.buffer))
+            return
+
+        if self.buffer:
+            self._upload_part()
+        try:
+            parts = [{"PartNumber": number, "ETag": future.result()['ETag']} for number, future in self.parts]
+        except Exception:
+            self.client.abort_multipart_upload(Bucket=self.storage.bucket, Key=self.key, UploadId=self.upload_id)
+            raise
+        self.client.complete_multipart_upload(
+            Bucket=self.storage.bucket, Key=self.key, UploadId=self.upload_id,
+            MultipartUpload={"Parts": parts}
+        )
+
+
+def create_storage(kind=ARTIFACT_STORAGE, mongo_db=None):
+    """Build the storage backend named by ARTIFACT_STORAGE: local, gridfs or s3."""
+    if kind == 'local':
+        return LocalStorage()
+    if kind == 'gridfs':
+        if mongo_db is None:
+            raise ValueError("ARTIFACT_STORAGE=gridfs needs a MongoDB database")
+        return GridFSStorage(mongo_db)
+    if kind == 's3':
+        return S3Storage()
+    raise ValueError(f"Unknown artifact storage: {kind}")
@@ -0,0 +1,78 @@
+import argparse
+import json
+from collections import defaultdict
+
+
+def load_traces(path):
+    """Group the spans of a JSON Lines trace dump by trace id."""
+    traces = defaultdict(list)
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                span = json.loads(line)
+                traces[span["trace_id"]].append(span)
+    return traces
+
+
+def trace_duration_ms(spans):
+    """Wall time from the first span's start to the last span's end."""
+    return (max(s["end_ns"] for s in spans) - min(s["start_ns"] for s in spans)) / 1e6
+
+
+def slowest_traces(traces, top=10):
+    """Return (trace_id, duration_ms, spans) of the ``top`` longest traces, slowest first."""
+    ranked = sorted(traces.items(), key=lambda item: trace_duration_ms(item[1]), reverse=True)
+    return [(trace_id, trace_duration_ms(spans), spans) for trace_id, spans in ranked[:top]]
+
+
+def render_trace(spans, max_children=20):
+    """Render a trace as an indented tree with each span's offset and duration.
+
+    Spans whose parent is missing from the dump, such as the API's span in
+    a worker-only dump, are shown as roots. Only the ``max_children``
+    slowest children of a span are listed.
+    """
+    start = min(s["start_ns"] for s in spans)
+    ids = {s["span_id"] for s in spans}
+    children = defaultdict(list)
+    for s in spans:
+        children[s["parent_id"] if s["parent_id"] in ids else None].append(s)
+
+    lines = []
+
+    def walk(span, depth):
+        attributes = " ".join(f"{k}={v}" for k, v in span["attributes"].items())
+        error = f" ERROR {span['error']}" if span.get("error") else ""
+        lines.append(
+            f"{'  ' * depth}{span['name']:<{max(1, 40 - 2 * depth)}} "
+            f"+{(span['start_ns'] - start) / 1e6:>9.1f}ms {span['duration_ms']:>9.1f}ms  {attributes}{error}".rstrip()
+        )
+        kids = sorted(children[span["span_id"]], key=lambda s: s["duration_ms"], reverse=True)
+        for kid in sorted(kids[:max_children], key=lambda s: s["start_ns"]):
+            walk(kid, depth + 1)
+        if len(kids) > max_children:
+            lines.append(f"{'  ' * (depth + 1)}... {len(kids) - max_children} faster spans")
+
+    for root in sorted(children[None], key=lambda s: s["start_ns"]):
+        walk(root, 0)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Show the slowest traces of a JSON trace dump')
+    parser.add_argument('path', help='JSON Lines file written with TRACE_EXPORTER=json')
+    parser.add_argument('--top', type=int, default=5,
+                        help='Number of traces to show')
+    parser.add_argument('--max-children', type=int, default=20,
+                        help='Slowest child spans to show per span')
+    args = parser.parse_args(argv)
+
+    traces = load_traces(args.path)
+    print(f"{len(traces)} traces in {args.path}")
+    for trace_id, duration, spans in slowest_traces(traces, args.top):
+        print(f"\nTrace {trace_id}: {duration:.1f}ms, {len(spans)} spans")
+        print(render_trace(spans, args.max_children))
+
+
+if __name__ == "__main__":
+    main()
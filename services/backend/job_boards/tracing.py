@@ -0,0 +1,292 @@
+import atexit
+import contextvars
+import functools
+import json
+import os
+import queue
+import re
+import secrets
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+# Tracing configuration; TRACE_EXPORTER is "" (off), "json" or "otlp"
+TRACE_EXPORTER = os.getenv('TRACE_EXPORTER', '').lower()
+TRACE_FILE = os.getenv('TRACE_FILE', 'traces.jsonl')
+TRACE_OTLP_ENDPOINT = os.getenv('TRACE_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces')
+TRACE_SERVICE_NAME = os.getenv('TRACE_SERVICE_NAME', 'job-board')
+
+# W3C trace context header: version-trace_id-parent_id-flags
+TRACEPARENT_PATTERN = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$')
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """One timed operation of a trace, with OpenTelemetry's ids and fields."""
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    @property
+    def traceparent(self):
+        """This span as a W3C traceparent value, for handing the trace to another process."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+class NoopSpan:
+    """Returned by a disabled tracer; records nothing and carries no trace."""
+
+    traceparent = None
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_NOOP_SPAN = NoopSpan()
+
+
+def parse_traceparent(value):
+    """Return (trace_id, span_id) from a traceparent value, or None if it is not one."""
+    match = TRACEPARENT_PATTERN.match(value or '')
+    return match.groups() if match else None
+
+
+class BatchingExporter(ABC):
+    """Queues finished spans and hands them to write_batch() from a background thread.
+
+    A batch is written once it holds ``batch_size`` spans or ``interval``
+    seconds have passed, so traced code never waits on the file or network.
+    close() writes what is left.
+    """
+
+    def __init__(self, batch_size=100, interval=2.0):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span):
+        self._queue.put(span)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    @abstractmethod
+    def write_batch(self, spans):
+        """Write a list of finished spans; called from the exporter thread only."""
+        pass
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.interval
+        while True:
+            try:
+                span = self._queue.get(timeout=max(0.01, deadline - time.monotonic()))
+            except queue.Empty:
+                span = False
+            if span:
+                batch.append(span)
+            if batch and (span is None or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                try:
+                    self.write_batch(batch)
+                except Exception as e:
+                    print(f"Error exporting {len(batch)} spans: {str(e)}")
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.interval
+            if span is None:
+                return
+
+
+class JSONFileExporter(BatchingExporter):
+    """Appends finished spans to a JSON Lines file, one span per line, in batches."""
+
+    def __init__(self, path=TRACE_FILE, batch_size=100, interval=2.0):
+        self.path = path
+        super().__init__(batch_size, interval)
+
+    def write_batch(self, spans):
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+
+class OTLPExporter(BatchingExporter):
+    """Sends finished spans to an OpenTelemetry collector over OTLP/HTTP JSON.
+
+    Spans are posted in batches from a background thread; failed posts
+    are dropped.
+    """
+
+    def __init__(self, endpoint=TRACE_OTLP_ENDPOINT, service_name=TRACE_SERVICE_NAME, batch_size=100, interval=2.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        super().__init__(batch_size, interval)
+
+    def write_batch(self, spans):
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(self.payload(spans)).encode('utf-8'),
+            headers={"Content-Type": "application/json"}
+        )
+        urllib.request.urlopen(request, timeout=5).close()
+
+    def payload(self, spans):
+        """OTLP ExportTraceServiceRequest for the spans, in its JSON mapping."""
+        return {"resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+            "scopeSpans": [{
+                "scope": {"name": "job_boards.tracing"},
+                "spans": [{
+                    "traceId": span.trace_id,
+                    "spanId": span.span_id,
+                    "parentSpanId": span.parent_id or "",
+                    "name": span.name,
+                    "kind": 1,
+                    "startTimeUnixNano": str(span.start_ns),
+                    "endTimeUnixNano": str(span.end_ns),
+                    "attributes": [_otlp_attribute(k, v) for k, v in span.attributes.items()],
+                    "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+                } for span in spans]
+            }]
+        }]}
+
+
+def _otlp_attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Tracer:
+    """Creates spans and hands finished ones to an exporter.
+
+    The active span is kept in a context variable, so spans opened inside
+    it, including in asyncio tasks started from it, become its children.
+    Without an exporter spans are not created at all.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self):
+        return self.exporter is not None
+
+    @contextmanager
+    def span(self, name, parent=None, **attributes):
+        """Time a block as a span. ``parent`` is a traceparent value from another process;
+        by default the span is a child of the active one or starts a new trace."""
+        if self.exporter is None:
+            yield _NOOP_SPAN
+            return
+
+        remote = parse_traceparent(parent) if parent else None
+        if remote:
+            trace_id, parent_id = remote
+        elif _current_span.get() is not None:
+            trace_id, parent_id = _current_span.get().trace_id, _current_span.get().span_id
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+
+        span = Span(name, trace_id, parent_id, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {str(e)}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            try:
+                self.exporter.export(span)
+            except Exception as e:
+                print(f"Error exporting span {name}: {str(e)}")
+
+    def close(self):
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+def create_exporter(kind=TRACE_EXPORTER):
+    """Build the exporter named by TRACE_EXPORTER, or None to disable tracing."""
+    if not kind:
+        return None
+    if kind == 'json':
+        return JSONFileExporter()
+    if kind == 'otlp':
+        return OTLPExporter()
+    raise ValueError(f"Unknown trace exporter: {kind}")
+
+
+_tracer = None
+_close_at_exit = False
+
+def init_tracer(exporter=None):
+    """Create the process-wide tracer; pass no exporter to disable tracing."""
+    global _tracer, _close_at_exit
+    if _tracer is not None:
+        _tracer.close()
+    _tracer = Tracer(exporter)
+    if not _close_at_exit:
+        # Registered once; closes whichever tracer is current at exit
+        atexit.register(_close_tracer)
+        _close_at_exit = True
+    return _tracer
+
+def _close_tracer():
+    if _tracer is not None:
+        _tracer.close()
+
+def get_tracer():
+    """Return the process-wide tracer, configured from TRACE_EXPORTER on first use."""
+    if _tracer is None:
+        init_tracer(create_exporter())
+    return _tracer
+
+def span(name, parent=None, **attributes):
+    """Open a span on the process-wide tracer."""
+    return get_tracer().span(name, parent, **attributes)
+
+def traced(name):
+    """Run every call of the decorated coroutine function in a span called ``name``."""
+    def decorate(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorate
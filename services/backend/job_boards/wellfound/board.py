@@ -1,10 +1,19 @@
 from ..base import BaseJobBoard
 
 class WellFoundBoard(BaseJobBoard):
-    def __init__(self, job_title):
-        super().__init__(job_title)
-        self.base_url = "https://wellfound.com"
-        self.search_url = f"{self.base_url}/jobs?query={job_title.replace(' ', '+')}"
+    # Listings are rendered client-side, so this board always needs the browser
+    lightweight = False
+    boilerplate_patterns = (
+        r'(easy )?apply',
+        r'(learn more|view) about .*',
+        r'posted \d+ \w+ ago',
+    )
+    
+    def get_base_url(self):
+        return "https://wellfound.com"
+    
+    def generate_search_url(self):
+        return f"{self.base_url}/jobs?query={self.job_title.replace(' ', '+')}"
     
     async def extract_job_listings(self, page):
         """Extract job listings from the search page."""
@@ -29,49 +38,53 @@ class WellFoundBoard(BaseJobBoard):
             return jobs;
         }''')
     
-    async def process_job(self, job, playwright):
-        """Process a single job listing."""
-        browser = await playwright.chromium.launch(headless=False)
-        page = await browser.new_page()
+    async def scrape_job_details(self, page):
+        """Extract the full description and job details from a loaded detail page."""
+        # Wait for the content to load
+        await page.wait_for_selector('.job-description', timeout=10000)
         
-        try:
-            # Navigate to the job listing
-            job_url = f"{self.base_url}/jobs/{job['job_id']}"
-            await page.goto(job_url)
+        # Get the full job description
+        full_description = await page.evaluate('''() => {
+            const desc = document.querySelector('.job-description');
+            if (!desc) return '';
+            return desc.textContent.trim();
+        }''')
+        
+        # Extract additional job details
+        job_details = await page.evaluate('''() => {
+            const details = {};
             
-            # Wait for the content to load
-            await page.wait_for_selector('.job-description', timeout=10000)
+            // Get posting date
+            const dateElement = document.querySelector('.posted-date');
+            if (dateElement) {
+                details.posted = dateElement.getAttribute('datetime');
+            }
             
-            # Get the full job description
-            full_description = await page.evaluate('''() => {
-                const desc = document.querySelector('.job-description');
-                if (!desc) return '';
-                return desc.textContent.trim();
-            }''')
+            // Get job stats
+            const stats = document.querySelectorAll('.job-stats .stat');
+            stats.forEach(stat => {
+                const label = stat.querySelector('.label').textContent.trim();
+                const value = stat.querySelector('.value').textContent.trim();
+                details[label.toLowerCase()] = value;
+            });
             
-            # Extract additional job details
-            job_details = await page.evaluate('''() => {
-                const details = {};
-                
-                // Get posting date
-                const dateElement = document.querySelector('.posted-date');
-                if (dateElement) {
-                    details.posted = dateElement.getAttribute('datetime');
-                }
-                
-                // Get job stats
-                const stats = document.querySelectorAll('.job-stats .stat');
-                stats.forEach(stat => {
-                    const label = stat.querySelector('.label').textContent.trim();
-                    const value = stat.querySelector('.value').textContent.trim();
-                    details[label.toLowerCase()] = value;
-                });
-                
-                return details;
-            }''')
+            return details;
+        }''')
+        
+        return full_description, job_details
+    
+    async def process_job(self, job, playwright):
+        """Process a single job listing."""
+        try:
+            # Fetch the detail page over HTTP when possible, otherwise with the browser
+            job_url = f"{self.base_url}/jobs/{job['job_id']}"
+            full_description, job_details = await self.get_job_details(job_url, playwright)
             
             print(f"\nJob Description Length: {len(full_description)} characters")
             
+            # Drop boilerplate and cap the size of what is sent to Groq
+            description, token_counts = self.prepare_description(full_description)
+            
             # Save metadata
             metadata = {
                 "job_id": job['job_id'],
@@ -83,12 +96,14 @@ class WellFoundBoard(BaseJobBoard):
                 "posted": job_details.get('posted', ''),
                 "views": job_details.get('views', ''),
                 "applicants": job_details.get('applicants', ''),
-                "description_length": len(full_description)
+                "description_length": len(full_description),
+                "original_tokens": token_counts["original_tokens"],
+                "sent_tokens": token_counts["sent_tokens"]
             }
             self.save_metadata(job['job_id'], metadata)
             
             # Parse the description using Groq API
-            parsed_description = await self.parse_job_description(full_description)
+            parsed_description = await self.parse_job_description(description, listing_id=job['job_id'])
             
             # Save GROQ response
             self.save_groq_response(job['job_id'], parsed_description)
@@ -107,7 +122,4 @@ class WellFoundBoard(BaseJobBoard):
             
         except Exception as e:
             print(f"Error processing job {job['position']}: {str(e)}")
-            return None
-            
-        finally:
-            await browser.close() 
\ No newline at end of file
+            return None 
\ No newline at end of file
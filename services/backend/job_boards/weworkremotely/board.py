@@ -1,10 +1,23 @@
 from ..base import BaseJobBoard
+from ..http_fetch import node_text, parse_html
 
 class WeWorkRemotelyBoard(BaseJobBoard):
-    def __init__(self, job_title):
-        super().__init__(job_title)
-        self.base_url = "https://weworkremotely.com"
-        self.search_url = f"{self.base_url}/remote-jobs/search?term={job_title.replace(' ', '+')}"
+    # Search and detail pages are server-rendered
+    allowed_resource_types = {"document"}
+    lightweight = True
+    boilerplate_patterns = (
+        r'back to all jobs',
+        r'view company profile',
+        r'posted on .*',
+        r'(more|other) jobs (at|from) .*',
+        r'apply for this position.*',
+    )
+    
+    def get_base_url(self):
+        return "https://weworkremotely.com"
+    
+    def generate_search_url(self):
+        return f"{self.base_url}/remote-jobs/search?term={self.job_title.replace(' ', '+')}"
     
     async def extract_job_listings(self, page):
         """Extract job listings from the search page."""
@@ -29,52 +42,98 @@ class WeWorkRemotelyBoard(BaseJobBoard):
             return jobs;
         }''')
     
-    async def process_job(self, job, playwright):
-        """Process a single job listing."""
-        browser = await playwright.chromium.launch(headless=False)
-        page = await browser.new_page()
+    def parse_job_listings_html(self, html):
+        """Extract job listings from search page HTML without a browser."""
+        jobs = []
+        for job in parse_html(html).css('.jobs article'):
+            title = job.css_first('.title')
+            company = job.css_first('.company')
+            location = job.css_first('.location')
+            
+            if title is not None and company is not None:
+                jobs.append({
+                    "position": node_text(title),
+                    "company": node_text(company),
+                    "location": node_text(location) if location is not None else 'Remote',
+                    "tags": [node_text(tag) for tag in job.css('.tags .tag')],
+                    "job_id": job.attributes.get('data-id')
+                })
+        return jobs
+    
+    def parse_job_details_html(self, html):
+        """Extract the full description and job details from detail page HTML."""
+        tree = parse_html(html)
+        desc = tree.css_first('.listing-container')
+        if desc is None:
+            return None
+        full_description = node_text(desc)
         
-        try:
-            # Navigate to the job listing
-            job_url = f"{self.base_url}/remote-jobs/{job['job_id']}"
-            await page.goto(job_url)
+        details = {}
+        
+        # Get posting date
+        date_element = tree.css_first('.listing-header-container time')
+        if date_element is not None:
+            details['posted'] = date_element.attributes.get('datetime')
+        
+        # Get company profile stats
+        company_profile = tree.css_first('.company-profile')
+        if company_profile is not None:
+            for stat in company_profile.css('.stat'):
+                label = node_text(stat.css_first('.label'))
+                details[label.lower()] = node_text(stat.css_first('.value'))
+        
+        return full_description, details
+    
+    async def scrape_job_details(self, page):
+        """Extract the full description and job details from a loaded detail page."""
+        # Wait for the content to load
+        await page.wait_for_selector('.listing-container', timeout=10000)
+        
+        # Get the full job description
+        full_description = await page.evaluate('''() => {
+            const desc = document.querySelector('.listing-container');
+            if (!desc) return '';
+            return desc.textContent.trim();
+        }''')
+        
+        # Extract additional job details
+        job_details = await page.evaluate('''() => {
+            const details = {};
             
-            # Wait for the content to load
-            await page.wait_for_selector('.listing-container', timeout=10000)
+            // Get posting date
+            const dateElement = document.querySelector('.listing-header-container time');
+            if (dateElement) {
+                details.posted = dateElement.getAttribute('datetime');
+            }
             
-            # Get the full job description
-            full_description = await page.evaluate('''() => {
-                const desc = document.querySelector('.listing-container');
-                if (!desc) return '';
-                return desc.textContent.trim();
-            }''')
+            // Get company profile stats
+            const companyProfile = document.querySelector('.company-profile');
+            if (companyProfile) {
+                const stats = companyProfile.querySelectorAll('.stat');
+                stats.forEach(stat => {
+                    const label = stat.querySelector('.label').textContent.trim();
+                    const value = stat.querySelector('.value').textContent.trim();
+                    details[label.toLowerCase()] = value;
+                });
+            }
             
-            # Extract additional job details
-            job_details = await page.evaluate('''() => {
-                const details = {};
-                
-                // Get posting date
-                const dateElement = document.querySelector('.listing-header-container time');
-                if (dateElement) {
-                    details.posted = dateElement.getAttribute('datetime');
-                }
-                
-                // Get company profile stats
-                const companyProfile = document.querySelector('.company-profile');
-                if (companyProfile) {
-                    const stats = companyProfile.querySelectorAll('.stat');
-                    stats.forEach(stat => {
-                        const label = stat.querySelector('.label').textContent.trim();
-                        const value = stat.querySelector('.value').textContent.trim();
-                        details[label.toLowerCase()] = value;
-                    });
-                }
-                
-                return details;
-            }''')
+            return details;
+        }''')
+        
+        return full_description, job_details
+    
+    async def process_job(self, job, playwright):
+        """Process a single job listing."""
+        try:
+            # Fetch the detail page over HTTP when possible, otherwise with the browser
+            job_url = f"{self.base_url}/remote-jobs/{job['job_id']}"
+            full_description, job_details = await self.get_job_details(job_url, playwright)
             
             print(f"\nJob Description Length: {len(full_description)} characters")
             
+            # Drop boilerplate and cap the size of what is sent to Groq
+            description, token_counts = self.prepare_description(full_description)
+            
             # Save metadata
             metadata = {
                 "job_id": job['job_id'],
@@ -86,12 +145,14 @@ class WeWorkRemotelyBoard(BaseJobBoard):
                 "posted": job_details.get('posted', ''),
                 "views": job_details.get('views', ''),
                 "applicants": job_details.get('applicants', ''),
-                "description_length": len(full_description)
+                "description_length": len(full_description),
+                "original_tokens": token_counts["original_tokens"],
+                "sent_tokens": token_counts["sent_tokens"]
             }
             self.save_metadata(job['job_id'], metadata)
             
             # Parse the description using Groq API
-            parsed_description = await self.parse_job_description(full_description)
+            parsed_description = await self.parse_job_description(description, listing_id=job['job_id'])
             
             # Save GROQ response
             self.save_groq_response(job['job_id'], parsed_description)
@@ -110,7 +171,4 @@ class WeWorkRemotelyBoard(BaseJobBoard):
             
         except Exception as e:
             print(f"Error processing job {job['position']}: {str(e)}")
-            return None
-            
-        finally:
-            await browser.close() 
\ No newline at end of file
+            return None 
\ No newline at end of file
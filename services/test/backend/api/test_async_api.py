@@ -0,0 +1,159 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+
+fakeredis = pytest.importorskip("fakeredis")
+mongomock = pytest.importorskip("mongomock")
+
+from aiohttp.test_utils import TestClient, TestServer
+from app.async_main import JOB_QUEUE, build_app
+from app.queue.progress import ProgressReporter
+
+
+@pytest.fixture
+def stores():
+    """Create sync and asyncio clients of one in-memory Redis, and an in-memory MongoDB"""
+    server = fakeredis.FakeServer()
+    return (fakeredis.FakeRedis(server=server, decode_responses=True),
+            fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+            mongomock.MongoClient().jobboard)
+
+
+@pytest_asyncio.fixture
+async def client(stores):
+    """Serve the async API on the in-memory stores"""
+    _, async_redis, db = stores
+    client = TestClient(TestServer(build_app(async_redis, db)))
+    await client.start_server()
+    yield client
+    await client.close()
+
+
+async def read_events(response):
+    """Parse a finished event stream into (event, data) pairs"""
+    body = (await response.read()).decode()
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_create_status_and_list(client, stores):
+    """Test jobs are queued, looked up and paged through like on the Flask API"""
+    redis_client, _, _ = stores
+    created = []
+    for title in ("DevOps Engineer", "SRE", "Platform Engineer"):
+        response = await client.post("/api/jobs", json={"board": "remoteok", "title": title})
+        assert response.status == 200
+        created.append((await response.json())["job_id"])
+
+    response = await client.get(f"/api/jobs/{created[0]}")
+    status = await response.json()
+    assert status["status"] == "pending" and status["progress"] == 0.0 and status["results"] == []
+    assert redis_client.llen("job_queue") == 3
+
+    first = await client.get("/api/jobs", params={"limit": 2})
+    second = await client.get("/api/jobs", params={"limit": 2, "after": first.headers["X-Next-Cursor"]})
+    listed = [job["job_id"] for job in await first.json() + await second.json()]
+    assert sorted(listed) == sorted(created) and "X-Next-Cursor" not in second.headers
+    assert first.headers["Access-Control-Allow-Origin"] == "*"
+
+
+@pytest.mark.asyncio
+async def test_errors(client):
+    """Test invalid requests get the same answers as on the Flask API"""
+    assert (await client.post("/api/jobs", json={"board": "remoteok"})).status == 400
+    assert (await client.post("/api/jobs", data="not json")).status == 400
+    for limit in (0, -1, "3", 2.5, True, 10 ** 6):
+        assert (await client.post("/api/jobs", json={"board": "remoteok", "title": "SRE", "limit": limit})).status == 400
+    assert (await client.get("/api/jobs/missing")).status == 404
+    assert (await client.get("/api/jobs", params={"after": "missing"})).status == 400
+    assert (await client.get("/api/jobs/missing/events")).status == 404
+
+
+@pytest.mark.asyncio
+async def test_identical_search_attaches_to_completed_job(client, stores):
+    """Test a repeated search returns the completed job with its results"""
+    redis_client, _, db = stores
+    response = await client.post("/api/jobs", json={"board": "remoteok", "title": "SRE", "limit": 1})
+    job_id = (await response.json())["job_id"]
+    redis_client.hset(f"job:{job_id}", mapping={"status": "completed", "progress": 100})
+    db.listings.insert_one({"board": "remoteok", "listing_id": "1", "data": {"position": "SRE"}})
+    db.job_listings.insert_one({"job_id": job_id, "board": "remoteok", "listing_id": "1", "rank": 0})
+
+    attached = await (await client.post("/api/jobs", json={"board": "remoteok", "title": "sre", "limit": 1})).json()
+    listed = await (await client.get("/api/jobs")).json()
+
+    assert attached["job_id"] == job_id and attached["message"] == "Attached to an identical search"
+    assert attached["results"][0]["job_data"] == {"position": "SRE"}
+    assert listed[0]["result"]["job_data"] == {"position": "SRE"}
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_load(client, stores):
+    """Test a full queue answers 429 and leaves no trace of the job"""
+    redis_client, _, _ = stores
+    client.server.app[JOB_QUEUE].max_depth = 0
+
+    response = await client.post("/api/jobs", json={"board": "remoteok", "title": "SRE"})
+
+    assert response.status == 429 and response.headers["Retry-After"] == "30"
+    assert redis_client.zcard("jobs:index") == 0 and not redis_client.keys("search:*")
+
+
+@pytest.mark.asyncio
+async def test_event_stream_follows_worker(client, stores):
+    """Test a watcher is woken by the worker's events and the stream ends with the job"""
+    redis_client, _, _ = stores
+    job_id = (await (await client.post("/api/jobs", json={"board": "remoteok", "title": "SRE"})).json())["job_id"]
+
+    stream = asyncio.create_task(client.get(f"/api/jobs/{job_id}/events"))
+    await asyncio.sleep(0.1)
+    reporter = ProgressReporter(redis_client, job_id, interval=0)
+    reporter.update(status="processing", progress=50)
+    await asyncio.sleep(0.05)
+    reporter.finish("completed", progress=100)
+    response = await asyncio.wait_for(stream, 5)
+
+    assert response.headers["Content-Type"] == "text/event-stream; charset=utf-8"
+    events = await asyncio.wait_for(read_events(response), 5)
+    assert [event for event, _ in events] == ["snapshot", "status", "status"]
+    assert events[0][1]["status"] == "pending" and events[-1][1]["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_event_stream_of_finished_job_ends(client, stores):
+    """Test resuming a finished job's stream sends what is left and ends, and reconnecting afterwards gets 204"""
+    redis_client, _, _ = stores
+    job_id = (await (await client.post("/api/jobs", json={"board": "remoteok", "title": "SRE"})).json())["job_id"]
+    reporter = ProgressReporter(redis_client, job_id, interval=0)
+    reporter.update(status="processing", progress=50)
+    reporter.publish("listing", {"rank": 0, "listing": {"job_id": "L1"}})
+    first_id, last_id = [event_id for event_id, _ in redis_client.xrange(f"job:{job_id}:events")]
+    # Finished while its final event was trimmed from the stream
+    redis_client.hset(f"job:{job_id}", "status", "completed")
+
+    response = await client.get(f"/api/jobs/{job_id}/events", headers={"Last-Event-ID": first_id})
+    events = await asyncio.wait_for(read_events(response), 5)
+    reconnect = await client.get(f"/api/jobs/{job_id}/events", headers={"Last-Event-ID": last_id})
+
+    assert [event for event, _ in events] == ["listing"]
+    assert reconnect.status == 204
+
+
+@pytest.mark.asyncio
+async def test_preflight(client):
+    """Test CORS preflight requests are answered for any origin"""
+    response = await client.options("/api/jobs", headers={
+        "Origin": "http://localhost:3000",
+        "Access-Control-Request-Method": "POST",
+        "Access-Control-Request-Headers": "content-type"
+    })
+
+    assert response.status == 200
+    assert response.headers["Access-Control-Allow-Origin"] == "*"
+    assert response.headers["Access-Control-Allow-Headers"] == "content-type"
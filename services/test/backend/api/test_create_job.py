@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("fakeredis")
+pytest.importorskip("mongomock")
+
+
+@pytest.mark.parametrize("limit", [0, -1, "3", 2.5, True, 10 ** 6])
+def test_invalid_limit_is_rejected(api, limit):
+    """Test a job with a limit that is not a positive integer within JOB_LIMIT_MAX is not queued"""
+    depth = api.job_queue.depth()
+
+    response = api.app.test_client().post("/api/jobs", json={"board": "remoteok", "title": "SRE", "limit": limit})
+
+    assert response.status_code == 400
+    assert api.job_queue.depth() == depth
+
+
+def test_limit_defaults_to_three(api):
+    """Test a job without a limit is queued with the default"""
+    response = api.app.test_client().post("/api/jobs", json={"board": "remoteok", "title": "Default limit"})
+
+    assert response.status_code == 200
+    assert api.redis_client.hget(f"job:{response.get_json()['job_id']}", "limit") == "3"
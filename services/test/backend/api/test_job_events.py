@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+pytest.importorskip("fakeredis")
+pytest.importorskip("mongomock")
+
+from app.queue.progress import ProgressReporter
+
+
+@pytest.fixture
+def job_id(api, request):
+    """Create a pending job through the API; each test searches its own title so no job is shared"""
+    response = api.app.test_client().post("/api/jobs", json={"board": "remoteok", "title": request.node.name})
+    return response.get_json()["job_id"]
+
+
+def read_events(body):
+    """Parse an event stream body into (id, event, data) triples"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if line and not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields.get("id"), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def get_events(api, job_id, last_id=None):
+    headers = {"Last-Event-ID": last_id} if last_id else {}
+    return api.app.test_client().get(f"/api/jobs/{job_id}/events", headers=headers)
+
+
+def test_snapshot_of_finished_job_ends_the_stream(api, job_id):
+    """Test a new client gets the current state, and nothing more once the job is done"""
+    ProgressReporter(api.redis_client, job_id).finish("completed", progress=100)
+
+    response = get_events(api, job_id)
+
+    assert response.mimetype == "text/event-stream"
+    events = read_events(response.get_data(as_text=True))
+    assert [(event, data["status"]) for _, event, data in events] == [("snapshot", "completed")]
+
+
+def test_resume_sends_only_later_events(api, job_id):
+    """Test a reconnecting client gets the events after its Last-Event-ID and no snapshot"""
+    reporter = ProgressReporter(api.redis_client, job_id, interval=0)
+    reporter.update(status="processing", progress=0)
+    reporter.publish("listing", {"rank": 0, "listing": {"job_id": "L1"}})
+    reporter.finish("completed", progress=100)
+    first_id = api.redis_client.xrange(f"job:{job_id}:events")[0][0]
+
+    events = read_events(get_events(api, job_id, last_id=first_id).get_data(as_text=True))
+
+    assert [event for _, event, _ in events] == ["listing", "status"]
+    assert events[-1][2]["status"] == "completed"
+
+
+def test_stream_ends_when_job_finishes_without_a_final_event(api, job_id):
+    """Test a resumed stream closes once the job is done even if its final event is gone"""
+    reporter = ProgressReporter(api.redis_client, job_id, interval=0)
+    reporter.update(status="processing", progress=50)
+    last_id = api.redis_client.xrange(f"job:{job_id}:events")[-1][0]
+    result = {}
+
+    def follow():
+        result["body"] = get_events(api, job_id, last_id=last_id).get_data(as_text=True)
+
+    # Without an announcement the status is read again at the next heartbeat
+    with patch.object(api, "SSE_HEARTBEAT_INTERVAL", 0.2):
+        follower = threading.Thread(target=follow, daemon=True)
+        follower.start()
+        time.sleep(0.2)
+        # Final status written while the events stream was trimmed
+        api.redis_client.hset(f"job:{job_id}", "status", "completed")
+        follower.join(5)
+
+    assert not follower.is_alive()
+    assert read_events(result["body"]) == []
+
+
+def test_idle_stream_waits_for_announcements(api, job_id):
+    """Test a stream reads the job only when the worker announces an event, not on a timer"""
+    reporter = ProgressReporter(api.redis_client, job_id, interval=0)
+    reporter.update(status="processing", progress=0)
+    last_id = api.redis_client.xrange(f"job:{job_id}:events")[-1][0]
+    result = {}
+
+    def follow():
+        result["body"] = get_events(api, job_id, last_id=last_id).get_data(as_text=True)
+
+    with patch.object(api.redis_client, "xrange", wraps=api.redis_client.xrange) as xrange:
+        follower = threading.Thread(target=follow, daemon=True)
+        follower.start()
+        time.sleep(2)
+        reads_while_idle = xrange.call_count
+        reporter.finish("completed", progress=100)
+        follower.join(5)
+
+    assert not follower.is_alive()
+    assert reads_while_idle <= 2
+    assert [event for _, event, _ in read_events(result["body"])] == ["status"]
+
+
+def test_reconnect_after_completion_is_told_to_stop(api, job_id):
+    """Test a client reconnecting after the final event gets 204 instead of a heartbeat-only stream"""
+    ProgressReporter(api.redis_client, job_id).finish("failed", error="boom")
+    final_id = api.redis_client.xrange(f"job:{job_id}:events")[-1][0]
+
+    response = get_events(api, job_id, last_id=final_id)
+
+    assert response.status_code == 204
+    assert get_events(api, job_id, last_id="0-0").status_code == 200
@@ -0,0 +1,72 @@
+import argparse
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+mongomock = pytest.importorskip("mongomock")
+
+from app.db.listings import first_results, job_results
+from app.queue.job_index import page_job_ids
+from load_test import LoadGenerator, compare, parse_mix, seed_history, seeded_job_ids
+
+
+@pytest.fixture
+def stores():
+    """Create in-memory Redis and MongoDB stand-ins"""
+    return fakeredis.FakeRedis(decode_responses=True), mongomock.MongoClient().jobboard
+
+
+def endpoint(ok_rps, p95, p99):
+    return {"ok_rps": ok_rps, "latency_ms": {"p50": 1.0, "p90": 2.0, "p95": p95, "p99": p99, "max": p99}}
+
+
+def test_seeded_history_reads_like_the_api(stores):
+    """Test seeded jobs are listed, looked up and joined to their results like jobs the worker ran"""
+    redis_client, db = stores
+    job_ids = seeded_job_ids(200, seed=3)
+
+    counts = seed_history(redis_client, db, job_ids, results_per_job=3, seed=3)
+
+    assert sum(counts.values()) == 200 and counts["completed"] > counts["failed"] > 0
+    assert seeded_job_ids(200, seed=3) == job_ids
+    assert sorted(page_job_ids(redis_client, 500)) == sorted(job_ids)
+
+    completed = [job_id for job_id in job_ids if redis_client.hget(f"job:{job_id}", "status") == "completed"]
+    results = job_results(db, completed[0])
+    assert [result["rank"] for result in results] == [0, 1, 2]
+    assert results[0]["job_data"]["parsed_description"]["skills"]
+    assert set(first_results(db, completed[:10])) == set(completed[:10])
+    # Indexes are rebuilt after the bulk load
+    assert "board_1_listing_id_1" in db.listings.index_information()
+
+
+def test_parse_mix():
+    """Test the endpoint mix is normalized and unknown endpoints are rejected"""
+    assert parse_mix("create=1,status=6,list=3") == {"create": 0.1, "status": 0.6, "list": 0.3}
+
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("create=1,delete=1")
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("list=0")
+
+
+def test_report_counts_only_successes_as_throughput():
+    """Test per-endpoint throughput, error rate and percentiles"""
+    generator = LoadGenerator("http://localhost:5000", [], parse_mix("status=1"))
+    generator.samples["status"] = [float(v) for v in range(1, 101)]
+    generator.statuses["status"].update({"200": 90, "404": 5, "TimeoutError": 5})
+
+    stats = generator.report(elapsed=10.0)["GET /api/jobs/<id>"]
+
+    assert stats["requests"] == 100 and stats["throughput_rps"] == 10.0
+    assert stats["ok_rps"] == 9.0 and stats["error_rate"] == 0.1
+    assert stats["latency_ms"]["p95"] == 95.0 and stats["latency_ms"]["max"] == 100.0
+
+
+def test_compare_flags_regressions_past_the_threshold():
+    """Test lower throughput and higher tail latency count as regressions, noise does not"""
+    baseline = {"endpoints": {"GET /api/jobs": endpoint(100.0, 50.0, 80.0), "POST /api/jobs": endpoint(50.0, 10.0, 20.0)}}
+    report = {"endpoints": {"GET /api/jobs": endpoint(85.0, 52.0, 120.0), "POST /api/jobs": endpoint(50.0, 10.5, 20.0)}}
+
+    regressed = {(name, metric) for name, metric, _, _, _, worse in compare(baseline, report, threshold=10.0) if worse}
+
+    assert regressed == {("GET /api/jobs", "ok_rps"), ("GET /api/jobs", "p99_ms")}
@@ -0,0 +1,31 @@
+import functools
+import importlib
+import sys
+import pytest
+from unittest.mock import patch
+
+
+@pytest.fixture(scope="module")
+def api():
+    """Import the Flask API on in-memory Redis and MongoDB, leaving process-wide singletons as they were"""
+    fakeredis = pytest.importorskip("fakeredis")
+    mongomock = pytest.importorskip("mongomock")
+    import app.db.mongodb
+    import app.queue.redis
+    import job_boards.analysis_cache
+    import job_boards.artifacts
+    import job_boards.rate_limit
+    import job_boards.seen_index
+
+    server = fakeredis.FakeServer()
+    with patch("redis.Redis", functools.partial(fakeredis.FakeRedis, server=server)), \
+            patch.object(app.db.mongodb, "MongoClient", mongomock.MongoClient), \
+            patch.object(app.queue.redis, "_client", None), \
+            patch.object(app.db.mongodb, "_client", None), \
+            patch.object(job_boards.analysis_cache, "_cache", None), \
+            patch.object(job_boards.rate_limit, "_limiter", None), \
+            patch.object(job_boards.seen_index, "_index", None), \
+            patch.object(job_boards.artifacts, "_sink", None):
+        sys.modules.pop("app.main", None)
+        yield importlib.import_module("app.main")
+        sys.modules.pop("app.main", None)
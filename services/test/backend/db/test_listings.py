@@ -0,0 +1,126 @@
+import pytest
+from unittest.mock import MagicMock
+
+from app.db.listings import ListingWriteError, ListingWriter, first_results, job_results, listing_key
+
+
+@pytest.fixture
+def mock_db():
+    """Create a mock MongoDB database"""
+    return MagicMock()
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_by_size(mock_db):
+    """Test that a full buffer is written as one unordered bulk upsert per collection"""
+    writer = ListingWriter(mock_db.listings, mock_db.job_listings, batch_size=2, max_delay=60)
+
+    await writer.add("job-1", "remoteok", 0, {"job_id": "L1"})
+    mock_db.listings.bulk_write.assert_not_called()
+    await writer.add("job-1", "remoteok", 1, {"job_id": "L2"})
+
+    mock_db.listings.bulk_write.assert_called_once()
+    ops = mock_db.listings.bulk_write.call_args.args[0]
+    assert mock_db.listings.bulk_write.call_args.kwargs["ordered"] is False
+    assert len(ops) == 2
+    assert ops[0]._filter == {"board": "remoteok", "listing_id": "L1"}
+    assert ops[0]._upsert is True
+    assert set(ops[0]._doc) == {"$set", "$setOnInsert"}
+
+    links = mock_db.job_listings.bulk_write.call_args.args[0]
+    assert links[1]._filter == {"job_id": "job-1", "board": "remoteok", "listing_id": "L2"}
+    assert links[1]._doc == {"$set": {"rank": 1}} and links[1]._upsert is True
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_by_age(mock_db):
+    """Test that buffered listings are written once they reach max_delay"""
+    writer = ListingWriter(mock_db.listings, mock_db.job_listings, batch_size=100, max_delay=0)
+
+    await writer.flush_if_due()
+    mock_db.listings.bulk_write.assert_not_called()
+
+    await writer.add("job-1", "remoteok", 0, {"job_id": "L1"})
+    await writer.flush_if_due()
+    mock_db.listings.bulk_write.assert_called_once()
+
+    await writer.flush()
+    assert mock_db.listings.bulk_write.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_link_does_not_overwrite_stored_listing(mock_db):
+    """Test that linking an unchanged listing only records that the job found it"""
+    writer = ListingWriter(mock_db.listings, mock_db.job_listings, batch_size=1, max_delay=60)
+
+    await writer.link("job-2", "remoteok", 3, {"job_id": "L1"})
+
+    op = mock_db.listings.bulk_write.call_args.args[0][0]
+    assert op._filter == {"board": "remoteok", "listing_id": "L1"}
+    assert set(op._doc) == {"$setOnInsert"}
+    link = mock_db.job_listings.bulk_write.call_args.args[0][0]
+    assert link._filter == {"job_id": "job-2", "board": "remoteok", "listing_id": "L1"}
+
+
+@pytest.mark.asyncio
+async def test_failed_write_is_retried_then_reported_to_its_job(mock_db):
+    """Test a failed batch is kept for the next flush and its job fails once retries run out"""
+    writer = ListingWriter(mock_db.listings, mock_db.job_listings, batch_size=100, max_delay=60, max_attempts=2)
+    mock_db.listings.bulk_write.side_effect = [ConnectionError("down"), None]
+
+    await writer.add("job-1", "remoteok", 0, {"job_id": "L1"})
+    await writer.flush()
+    writer.raise_for_job("job-2")
+    # Still buffered after the failure; the failing job drops its writes
+    with pytest.raises(ListingWriteError):
+        writer.raise_for_job("job-1")
+
+    await writer.add("job-3", "remoteok", 0, {"job_id": "L1"})
+    await writer.flush()
+    writer.raise_for_job("job-3")
+    assert len(mock_db.listings.bulk_write.call_args.args[0]) == 1
+
+    mock_db.listings.bulk_write.side_effect = ConnectionError("down")
+    await writer.add("job-4", "remoteok", 0, {"job_id": "L2"})
+    await writer.flush()
+    await writer.flush()
+    assert mock_db.listings.bulk_write.call_count == 4
+    with pytest.raises(ListingWriteError, match="down"):
+        writer.raise_for_job("job-4")
+    # Given up on, not retried again
+    await writer.flush()
+    assert mock_db.listings.bulk_write.call_count == 4
+
+
+def test_listing_key_without_board_id():
+    """Test listings without a board id are keyed by URL, else by their content"""
+    assert listing_key({"job_id": 42}) == "42"
+    assert listing_key({"job_url": "https://example.com/jobs/1"}) == "https://example.com/jobs/1"
+    first, second = listing_key({"position": "SRE"}), listing_key({"position": "DevOps"})
+    assert first.startswith("sha256:") and first != second
+
+
+@pytest.mark.asyncio
+async def test_listing_found_by_many_jobs_stays_one_document():
+    """Test results are read back per job while the listing itself does not grow"""
+    mongomock = pytest.importorskip("mongomock")
+    db = mongomock.MongoClient().jobboard
+    writer = ListingWriter(db.listings, db.job_listings, batch_size=100, max_delay=60)
+
+    await writer.add("job-0", "remoteok", 0, {"job_id": "L1"})
+    await writer.add("job-1", "remoteok", 0, {"job_id": "L2"})
+    await writer.link("job-1", "remoteok", 1, {"job_id": "L1"})
+    # Same id on another board is another listing
+    await writer.add("job-2", "weworkremotely", 5, {"job_id": "L1", "board": "wwr"})
+    await writer.flush()
+
+    assert db.listings.count_documents({}) == 3
+    assert set(db.listings.find_one({"board": "remoteok", "listing_id": "L1"})) == {
+        "_id", "board", "listing_id", "data", "created_at", "updated_at"
+    }
+    assert [(r["rank"], r["job_data"]) for r in job_results(db, "job-1")] == [(0, {"job_id": "L2"}), (1, {"job_id": "L1"})]
+    first = first_results(db, ["job-0", "job-1", "job-2"])
+    assert {job_id: row["job_data"] for job_id, row in first.items()} == {
+        "job-0": {"job_id": "L1"}, "job-1": {"job_id": "L2"}, "job-2": {"job_id": "L1", "board": "wwr"}
+    }
+    assert set(first["job-2"]) == {"job_id", "rank", "job_data", "created_at"}
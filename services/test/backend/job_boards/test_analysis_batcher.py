@@ -0,0 +1,246 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+from job_boards.analysis_batcher import AnalysisBatcher
+from job_boards.analysis_cache import AnalysisCache
+from job_boards.remoteok.board import RemoteOKBoard
+
+
+def make_batcher(batch_results=None, **options):
+    """Create a batcher whose batched and single calls are mocks"""
+    async def analyze_batch(items):
+        analyze_batch.calls.append(items)
+        if batch_results is None:
+            return {listing_id: {"text": text} for listing_id, text in items}
+        return batch_results
+    analyze_batch.calls = []
+
+    analyze_one = AsyncMock(side_effect=lambda text: {"single": text})
+    options.setdefault("max_wait", 0.01)
+    return AnalysisBatcher(analyze_batch, analyze_one, **options), analyze_batch, analyze_one
+
+
+@pytest.mark.asyncio
+async def test_concurrent_descriptions_share_a_request():
+    """Test descriptions submitted together are sent in one batch"""
+    batcher, analyze_batch, analyze_one = make_batcher(batch_size=3)
+
+    results = await asyncio.gather(*(batcher.submit(f"desc {i}") for i in range(3)))
+
+    assert results == [{"text": f"desc {i}"} for i in range(3)]
+    assert len(analyze_batch.calls) == 1
+    analyze_one.assert_not_called()
+    assert batcher.stats()["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_size_and_token_budget_split_batches():
+    """Test batches are capped by size and by estimated prompt tokens"""
+    batcher, analyze_batch, _ = make_batcher(batch_size=2, token_budget=1000)
+    await asyncio.gather(*(batcher.submit(f"desc {i}") for i in range(4)))
+    assert [len(items) for items in analyze_batch.calls] == [2, 2]
+
+    batcher, analyze_batch, _ = make_batcher(batch_size=10, token_budget=350)
+    await asyncio.gather(*(batcher.submit("x" * 600) for _ in range(4)))
+    assert [len(items) for items in analyze_batch.calls] == [2, 2]
+
+
+@pytest.mark.asyncio
+async def test_results_are_matched_by_listing_id():
+    """Test batched results reach their listings whatever order the model answers in"""
+    batcher, analyze_batch, analyze_one = make_batcher(
+        batch_results={"L2": {"title": "DBA"}, "L1": {"title": "SRE"}},
+        batch_size=2
+    )
+
+    results = await asyncio.gather(batcher.submit("first", "L1"), batcher.submit("second", "L2"))
+
+    assert results == [{"title": "SRE"}, {"title": "DBA"}]
+    assert [listing_id for listing_id, _ in analyze_batch.calls[0]] == ["L1", "L2"]
+    analyze_one.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_count_mismatch_falls_back_to_single_calls():
+    """Test an answer that leaves out listings is not used for any of them"""
+    batcher, _, analyze_one = make_batcher(
+        batch_results={"L1": {"ok": True}, "L2": {"ok": True}},
+        batch_size=3
+    )
+
+    results = await asyncio.gather(*(batcher.submit(f"desc {i}", f"L{i}") for i in range(3)))
+
+    assert results == [{"single": f"desc {i}"} for i in range(3)]
+    assert analyze_one.await_count == 3
+    assert batcher.stats()["fallbacks"] == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_listings_fall_back_to_single_calls():
+    """Test listings returned with an error are retried alone and the rest are kept"""
+    batcher, _, analyze_one = make_batcher(
+        batch_results={"L0": {"ok": True}, "L1": {"error": "bad"}},
+        batch_size=2
+    )
+
+    results = await asyncio.gather(batcher.submit("desc 0", "L0"), batcher.submit("desc 1", "L1"))
+
+    assert results == [{"ok": True}, {"single": "desc 1"}]
+    assert analyze_one.await_count == 1
+    assert batcher.stats()["fallbacks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_repeated_or_missing_listing_ids_get_positions():
+    """Test descriptions without a unique listing id are sent under their position"""
+    batcher, analyze_batch, _ = make_batcher(batch_size=3)
+
+    await asyncio.gather(batcher.submit("a", "L1"), batcher.submit("b", "L1"), batcher.submit("c"))
+
+    assert [listing_id for listing_id, _ in analyze_batch.calls[0]] == ["L1", "item-1", "item-2"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_break_its_batch():
+    """Test the other listings of a batch get their results when one caller gave up"""
+    batcher, _, _ = make_batcher(batch_size=2, max_wait=60)
+
+    first = asyncio.create_task(batcher.submit("a", "L1"))
+    await asyncio.sleep(0)
+    first.cancel()
+    second = await batcher.submit("b", "L2")
+
+    assert second == {"text": "b"}
+
+
+@pytest.mark.asyncio
+async def test_batch_request_error_falls_back():
+    """Test an exception from the batched call sends every listing alone"""
+    batcher, _, analyze_one = make_batcher(batch_size=2)
+    batcher.analyze_batch = AsyncMock(side_effect=RuntimeError("429"))
+
+    results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
+
+    assert results == [{"single": "a"}, {"single": "b"}]
+
+
+@pytest.mark.asyncio
+async def test_lone_and_oversized_descriptions_are_sent_alone():
+    """Test a description alone in its window or over budget skips the batch prompt"""
+    batcher, analyze_batch, _ = make_batcher(batch_size=5, token_budget=100)
+
+    assert await batcher.submit("short") == {"single": "short"}
+    assert await batcher.submit("x" * 1000) == {"single": "x" * 1000}
+    assert analyze_batch.calls == []
+
+
+def test_clean_groq_batch_response(tmp_path, monkeypatch):
+    """Test batched responses are split back per listing id"""
+    monkeypatch.chdir(tmp_path)
+    board = RemoteOKBoard("devops")
+
+    text = '```json\n[{"listing_id": "0", "analysis": {"title": "SRE"}}, {"listing_id": 1, "analysis": "oops"}]\n```'
+
+    assert board.clean_groq_batch_response(text) == {"0": {"title": "SRE"}}
+    assert board.clean_groq_batch_response("not json") == {}
+
+
+class StreamingLLMClient:
+    """Stands in for the LLM client, streaming a canned completion"""
+
+    model = "test-model"
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.sent = 0
+
+    async def stream_chat(self, messages, on_content=None, **params):
+        content = ""
+        for chunk in self.chunks:
+            content += chunk
+            self.sent += 1
+            if on_content(chunk):
+                break
+        return {"choices": [{"message": {"content": content}}]}
+
+
+@pytest.mark.asyncio
+async def test_streamed_analysis_reports_partial_fields(tmp_path, monkeypatch):
+    """Test analysis fields reach on_partial_analysis before the analysis is done"""
+    monkeypatch.chdir(tmp_path)
+    client = StreamingLLMClient(['{"title": "SRE", ', '"skills": ["Go"]', '}', ' Hope this helps!'])
+    monkeypatch.setattr("job_boards.base.get_llm_client", lambda: client)
+    monkeypatch.setattr("job_boards.base.get_analysis_cache", lambda: AnalysisCache())
+    board = RemoteOKBoard("devops")
+    board.analysis_batcher.batch_size = 1
+    partial = []
+    board.on_partial_analysis = lambda listing_id, fields: partial.append((listing_id, fields))
+
+    result = await board.parse_job_description("Run our clusters", listing_id="42")
+
+    assert result == {"title": "SRE", "skills": ["Go"]}
+    assert partial == [("42", {"title": "SRE"}), ("42", {"skills": ["Go"]})]
+    assert client.sent == 3
+
+
+@pytest.mark.asyncio
+async def test_streamed_batch_reports_each_listing(tmp_path, monkeypatch):
+    """Test each entry of a streamed batch is reported to its own listing"""
+    monkeypatch.chdir(tmp_path)
+    client = StreamingLLMClient([
+        '[{"listing_id": "a", "analysis": {"title": "SRE"}}, ',
+        '{"listing_id": "b", "analysis": {"title": "DBA"}}]'
+    ])
+    monkeypatch.setattr("job_boards.base.get_llm_client", lambda: client)
+    monkeypatch.setattr("job_boards.base.get_analysis_cache", lambda: AnalysisCache())
+    board = RemoteOKBoard("devops")
+    board.analysis_batcher.batch_size = 2
+    partial = []
+    board.on_partial_analysis = lambda listing_id, fields: partial.append((listing_id, fields))
+
+    results = await asyncio.gather(
+        board.parse_job_description("first", listing_id="a"),
+        board.parse_job_description("second", listing_id="b")
+    )
+
+    assert results == [{"title": "SRE"}, {"title": "DBA"}]
+    assert partial == [("a", {"title": "SRE"}), ("b", {"title": "DBA"})]
+
+
+class TruncatingLLMClient:
+    """Stands in for the LLM client, cutting off its first answer at max_tokens"""
+
+    model = "test-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def chat(self, messages, **params):
+        self.calls += 1
+        if self.calls == 1:
+            return {"choices": [{"message": {"content": '{"title": "SRE", "skills": ["Go'}, "finish_reason": "length"}]}
+        return {"choices": [{"message": {"content": '{"title": "SRE", "skills": ["Go", "K8s"]}'}, "finish_reason": "stop"}]}
+
+    async def stream_chat(self, messages, on_content=None, **params):
+        return await self.chat(messages, **params)
+
+
+@pytest.mark.asyncio
+async def test_truncated_analysis_is_not_cached(tmp_path, monkeypatch):
+    """Test an analysis repaired after hitting max_tokens is returned but asked for again next time"""
+    monkeypatch.chdir(tmp_path)
+    client = TruncatingLLMClient()
+    cache = AnalysisCache()
+    monkeypatch.setattr("job_boards.base.get_llm_client", lambda: client)
+    monkeypatch.setattr("job_boards.base.get_analysis_cache", lambda: cache)
+    board = RemoteOKBoard("devops")
+    board.analysis_batcher.batch_size = 1
+
+    first = await board.parse_job_description("Run our clusters")
+    second = await board.parse_job_description("Run our clusters")
+    third = await board.parse_job_description("Run our clusters")
+
+    assert first == {"title": "SRE", "skills": ["Go"]}
+    assert second == third == {"title": "SRE", "skills": ["Go", "K8s"]}
+    assert client.calls == 2
@@ -0,0 +1,87 @@
+import pytest
+from unittest.mock import MagicMock
+
+from job_boards.analysis_cache import AnalysisCache, LRUCache, analysis_cache_key
+
+
+@pytest.fixture
+def mock_redis():
+    """Create a mock Redis client backed by a dict"""
+    store = {}
+    redis = MagicMock()
+    redis.get = MagicMock(side_effect=store.get)
+    redis.set = MagicMock(side_effect=lambda key, value, ex=None: store.__setitem__(key, value))
+    redis.store = store
+    return redis
+
+
+def test_cache_key_normalizes_whitespace():
+    """Test that keys ignore whitespace differences but not model or prompt version"""
+    key = analysis_cache_key("Senior  DevOps\n\nEngineer ", "model-a", 1)
+    assert key == analysis_cache_key("Senior DevOps Engineer", "model-a", 1)
+    assert key != analysis_cache_key("Senior DevOps Engineer", "model-b", 1)
+    assert key != analysis_cache_key("Senior DevOps Engineer", "model-a", 2)
+    assert key.startswith("analysis:")
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test size-based eviction order"""
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_expires_entries():
+    """Test TTL expiry"""
+    cache = LRUCache(maxsize=2, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_memory_hit_returns_fresh_copy():
+    """Test that hits are served from memory and can be mutated safely"""
+    cache = AnalysisCache()
+    await cache.set("key", {"skills": ["python"]})
+
+    first = await cache.get("key")
+    first["search_context"] = {}
+    second = await cache.get("key")
+
+    assert second == {"skills": ["python"]}
+    assert cache.memory_hits == 2
+    assert cache.misses == 0
+
+
+@pytest.mark.asyncio
+async def test_redis_hit_backfills_memory(mock_redis):
+    """Test that a Redis hit populates the in-process tier"""
+    writer = AnalysisCache(redis_client=mock_redis, ttl=60)
+    await writer.set("key", {"role": "SRE"})
+    mock_redis.set.assert_called_once()
+    assert mock_redis.set.call_args.kwargs["ex"] == 60
+
+    reader = AnalysisCache(redis_client=mock_redis)
+    assert await reader.get("key") == {"role": "SRE"}
+    assert await reader.get("key") == {"role": "SRE"}
+
+    assert reader.redis_hits == 1
+    assert reader.memory_hits == 1
+    assert mock_redis.get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_miss_and_redis_failure(mock_redis):
+    """Test that misses are counted and Redis errors degrade to a miss"""
+    mock_redis.get.side_effect = ConnectionError("down")
+    cache = AnalysisCache(redis_client=mock_redis)
+
+    assert await cache.get("missing") is None
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,94 @@
+import gzip
+import json
+import pytest
+from unittest.mock import patch
+
+from job_boards.artifacts import ArtifactSink
+from job_boards.remoteok.board import RemoteOKBoard
+from job_boards.storage import LocalStorage
+
+
+def read_lines(path, opener=open):
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def sink(tmp_path):
+    sink = ArtifactSink(LocalStorage(tmp_path), compression="", fsync_interval=60)
+    yield sink
+    sink.close()
+
+
+def test_records_appended_to_one_file(tmp_path, sink):
+    """Test records for a run share one JSON Lines file"""
+    for i in range(3):
+        sink.write("run/metadata.jsonl", {"job_id": str(i), "title": "Ingénieur"})
+    sink.flush()
+
+    assert read_lines(tmp_path / "run" / "metadata.jsonl") == [{"job_id": str(i), "title": "Ingénieur"} for i in range(3)]
+    assert sink.stats()["records_written"] == 3
+
+
+def test_records_are_snapshotted_when_queued(tmp_path, sink):
+    """Test later changes to a record do not reach the file"""
+    record = {"job_id": "1"}
+    sink.write("run/job_listings.jsonl", record)
+    record["job_id"] = "changed"
+    sink.flush()
+
+    assert read_lines(tmp_path / "run" / "job_listings.jsonl") == [{"job_id": "1"}]
+
+
+def test_release_closes_run_files(tmp_path, sink):
+    """Test releasing a run closes only that run's files"""
+    sink.write("run-1/a.jsonl", {"n": 1})
+    sink.write("run-10/a.jsonl", {"n": 2})
+    sink.release("run-1")
+    sink.flush()
+
+    assert sink.stats()["open_files"] == 1
+
+
+def test_gzip_members_read_back_as_one_stream(tmp_path):
+    """Test compressed files reopened after a release stay readable"""
+    sink = ArtifactSink(LocalStorage(tmp_path), compression="gzip", fsync_interval=60)
+
+    sink.write("run/groq_responses.jsonl", {"n": 1})
+    sink.release("run")
+    sink.write("run/groq_responses.jsonl", {"n": 2})
+    sink.close()
+
+    assert read_lines(tmp_path / "run" / "groq_responses.jsonl.gz", gzip.open) == [{"n": 1}, {"n": 2}]
+
+
+def test_fsync_cadence(tmp_path):
+    """Test dirty files are fsynced once per interval rather than per record"""
+    sink = ArtifactSink(LocalStorage(tmp_path), compression="", fsync_interval=0.05)
+    with patch("job_boards.storage.os.fsync") as fsync:
+        for i in range(50):
+            sink.write("run/metadata.jsonl", {"n": i})
+        sink.flush()
+        sink.close()
+
+    assert 1 <= fsync.call_count < 50
+
+
+def test_board_saves_through_sink(tmp_path, monkeypatch):
+    """Test the save_* methods append to per-run files without blocking on disk"""
+    sink = ArtifactSink(LocalStorage(tmp_path), compression="", fsync_interval=60)
+    monkeypatch.setattr("job_boards.base.get_artifact_sink", lambda: sink)
+    board = RemoteOKBoard("devops engineer")
+
+    board.save_metadata("1", {"position": "SRE"})
+    board.save_groq_response("1", {"role": "SRE"})
+    board.save_job_listing("1", {"position": "SRE"})
+    sink.close()
+
+    run_dir = tmp_path / board.run_dir
+    files = sorted(p.name for p in run_dir.iterdir())
+    assert files == ["groq_responses.jsonl", "job_listings.jsonl", "metadata.jsonl"]
+    assert run_dir.parent == tmp_path / "remoteok" / "devops_engineer"
+    metadata = read_lines(run_dir / "metadata.jsonl")[0]
+    assert metadata["job_id"] == "1"
+    assert metadata["data"]["search_context"]["job_board"] == "remoteok"
@@ -0,0 +1,47 @@
+import pytest
+
+from run_benchmarks import compare, summarize
+from scenario import percentile
+
+
+def run(listings_per_second, p50, p95, rss=60.0, browsers=0):
+    return {"status": "ok", "listings_per_second": listings_per_second, "latency_ms": {"p50": p50, "p95": p95},
+            "peak_rss_mb": rss, "peak_browsers": browsers}
+
+
+def test_percentile_nearest_rank():
+    """Test percentiles pick an observed value by nearest rank"""
+    values = [float(v) for v in range(1, 21)]
+
+    assert percentile(values, 50) == 10.0
+    assert percentile(values, 95) == 19.0
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) is None
+
+
+def test_summary_takes_medians_and_skips_failed_runs():
+    """Test a scenario's headline numbers come from its successful runs"""
+    summary = summarize([run(2.0, 100, 200, rss=50), {"status": "error", "error": "boom"},
+                         run(4.0, 300, 400, rss=70, browsers=2), run(3.0, 200, 300)])
+
+    assert summary["status"] == "partial"
+    assert summary["listings_per_second"] == 3.0
+    assert summary["latency_p95_ms"] == 300
+    assert summary["peak_rss_mb"] == 70 and summary["peak_browsers"] == 2
+    assert summarize([{"status": "error", "error": "boom"}]) == {"status": "error", "error": "boom"}
+
+
+def test_compare_flags_changes_beyond_noise():
+    """Test comparing reports marks throughput gains as better, latency growth as worse, and small changes as noise"""
+    baseline = {"scenarios": {"cli/remoteok": {"summary": summarize([run(2.0, 1000, 1200)])}}}
+    report = {"scenarios": {
+        "cli/remoteok": {"summary": summarize([run(3.0, 1020, 1500)])},
+        "cli/wellfound": {"summary": summarize([run(1.0, 100, 100)])},
+    }}
+
+    rows = {metric: (change, better) for _, metric, _, _, change, better in compare(baseline, report)}
+
+    assert rows["listings_per_second"] == (pytest.approx(50.0), True)
+    assert rows["latency_p50_ms"][1] is None
+    assert rows["latency_p95_ms"] == (pytest.approx(25.0), False)
+    assert len(rows) == 5
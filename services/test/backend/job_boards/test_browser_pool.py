@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from job_boards.browser_pool import BrowserPool
+
+
+def make_browser():
+    """Create a mock Playwright browser that tracks its connection state"""
+    browser = MagicMock()
+    browser.connected = True
+    browser.is_connected = MagicMock(side_effect=lambda: browser.connected)
+    browser.handlers = {}
+    browser.on = MagicMock(side_effect=lambda event, handler: browser.handlers.setdefault(event, handler))
+
+    async def close():
+        browser.connected = False
+
+    browser.close = AsyncMock(side_effect=close)
+
+    context = MagicMock()
+    context.close = AsyncMock()
+    context.new_page = AsyncMock(return_value=MagicMock())
+    browser.new_context = AsyncMock(return_value=context)
+    return browser
+
+
+@pytest.fixture
+def mock_playwright():
+    """Create a mock Playwright instance whose launches return fresh browsers"""
+    playwright = MagicMock()
+    playwright.chromium.launch = AsyncMock(side_effect=lambda **kwargs: make_browser())
+    return playwright
+
+
+@pytest.mark.asyncio
+async def test_browsers_are_reused(mock_playwright):
+    """Test that sequential checkouts share a single browser"""
+    pool = BrowserPool(mock_playwright, size=2, max_pages=10)
+
+    for _ in range(5):
+        async with pool.page() as page:
+            assert page is not None
+
+    assert mock_playwright.chromium.launch.call_count == 1
+    assert pool.browser_count == 1
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_browsers_are_recycled_after_max_pages(mock_playwright):
+    """Test that a browser is closed and replaced after serving max_pages contexts"""
+    pool = BrowserPool(mock_playwright, size=1, max_pages=2)
+
+    for _ in range(4):
+        async with pool.context():
+            pass
+
+    assert mock_playwright.chromium.launch.call_count == 2
+    assert pool.recycled == 2
+    assert pool.browser_count == 0
+
+
+@pytest.mark.asyncio
+async def test_crashed_browser_is_replaced(mock_playwright):
+    """Test that a disconnected browser is dropped and a new one launched"""
+    pool = BrowserPool(mock_playwright, size=1, max_pages=10)
+
+    async with pool.context():
+        pass
+    crashed = pool._browsers[0].browser
+    crashed.connected = False
+    crashed.handlers['disconnected'](crashed)
+
+    async with pool.context():
+        pass
+
+    assert pool.crashes == 1
+    assert mock_playwright.chromium.launch.call_count == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_close_rejects_new_checkouts(mock_playwright):
+    """Test that a closed pool refuses to hand out contexts"""
+    pool = BrowserPool(mock_playwright)
+    async with pool.context():
+        pass
+    await pool.close()
+
+    with pytest.raises(RuntimeError):
+        async with pool.context():
+            pass
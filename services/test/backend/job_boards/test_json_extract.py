@@ -0,0 +1,146 @@
+import gzip
+import json
+import os
+import pytest
+from pathlib import Path
+
+from job_boards.json_extract import (
+    JSONScanner,
+    StreamingJSONParser,
+    decode_truncated,
+    extract_json_array,
+    extract_json_object,
+    strip_trailing_commas,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def load_corpus():
+    """Load saved analyses from groq_responses artifact files.
+
+    Set GROQ_RESPONSES_CORPUS to an artifacts directory to benchmark
+    against real runs; the bundled fixture is used otherwise.
+    """
+    root = Path(os.getenv("GROQ_RESPONSES_CORPUS", FIXTURES))
+    analyses = []
+    for path in sorted(root.rglob("groq_responses.jsonl*")):
+        opener = gzip.open if path.suffix == ".gz" else open
+        if path.suffix not in (".jsonl", ".gz"):
+            continue
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                data = json.loads(line)["data"]
+                if isinstance(data, dict) and "error" not in data:
+                    data.pop("search_context", None)
+                    analyses.append(data)
+    return analyses
+
+
+def raw_responses(analyses):
+    """Render analyses the ways the model tends to answer"""
+    responses = []
+    for analysis in analyses:
+        body = json.dumps(analysis, indent=2, ensure_ascii=False)
+        responses.append(body)
+        responses.append(f"```json\n{body}\n```")
+        responses.append(f"Here is the analysis {{as requested}}:\n\n{body}\n\nLet me know if you need {{more}} details.")
+    return responses
+
+
+@pytest.fixture
+def benchmark_or_skip(request):
+    pytest.importorskip("pytest_benchmark")
+    return request.getfixturevalue("benchmark")
+
+
+def test_scanner_handles_strings_and_split_input():
+    """Test braces inside strings are ignored, also when fed one character at a time"""
+    text = 'noise {"a": "x}{\\"y", "b": [1, {"c": "]"}]} more {"d": 1}'
+    scanner = JSONScanner('{')
+
+    found = []
+    for char in text:
+        found.extend(scanner.feed(char))
+
+    assert [json.loads(v) for v in found] == [{"a": 'x}{"y', "b": [1, {"c": "]"}]}, {"d": 1}]
+    assert scanner.pending == ""
+
+
+def test_extract_object_skips_prose_braces():
+    """Test braces in prose before the JSON do not break extraction"""
+    text = 'Sure {here it is}: ```json\n{"title": "SRE", "skills": ["Go"]}\n``` and {"other": true}'
+
+    assert extract_json_object(text) == {"title": "SRE", "skills": ["Go"]}
+    assert extract_json_object("no json here") is None
+
+
+def test_extract_object_repairs_trailing_commas():
+    """Test trailing commas are dropped only in repair mode"""
+    text = '{"skills": ["Go", "Python",], "remote": true,}'
+
+    assert extract_json_object(text) == {"skills": ["Go", "Python"], "remote": True}
+    assert extract_json_object(text, repair=False) is None
+    assert strip_trailing_commas('{"a": ",]"}') == '{"a": ",]"}'
+
+
+@pytest.mark.parametrize("text,expected", [
+    ('{"title": "SRE", "skills": ["Go", "Pyth', {"title": "SRE", "skills": ["Go", "Pyth"]}),
+    ('{"title": "SRE", "salary": ', {"title": "SRE", "salary": None}),
+    ('{"title": "SRE", "remote": tr', {"title": "SRE"}),
+    ('{"title": "SRE", "location"', {"title": "SRE"}),
+    ('{"title": "a\\', {"title": "a"}),
+])
+def test_decode_truncated(text, expected):
+    """Test output cut off by max_tokens is completed"""
+    assert decode_truncated(text) == expected
+    assert extract_json_object("Result: " + text) == expected
+
+
+def test_extract_array_keeps_complete_items_of_truncated_batch():
+    """Test a cut off batch keeps its complete entries and drops the unfinished one"""
+    text = '[{"listing_id": "0", "analysis": {"a": 1}}, {"listing_id": "1", "analysis": {"b": [2'
+
+    assert extract_json_array(text) == [{"listing_id": "0", "analysis": {"a": 1}}]
+    assert extract_json_array(text, repair=False) is None
+    assert extract_json_array('Listings [0] and [1]: [{"listing_id": "0"}]') == [{"listing_id": "0"}]
+
+
+def test_streaming_parser_reports_completed_members():
+    """Test members are reported once a top-level comma or the closing brace ends them"""
+    parser = StreamingJSONParser('{')
+    chunks = ['Sure: {"title": "S', 'RE", "skills": ["Go",', ' "Rust"], "remote"', ': true}', ' Anything else?']
+
+    reported = [parser.feed(chunk) for chunk in chunks]
+
+    assert reported == [[], [("title", "SRE")], [("skills", ["Go", "Rust"])], [("remote", True)], []]
+    assert parser.result == {"title": "SRE", "skills": ["Go", "Rust"], "remote": True}
+
+
+def test_streaming_parser_skips_rejected_arrays():
+    """Test an array in prose is not taken for the batched answer"""
+    parser = StreamingJSONParser('[', accept=lambda value: all(isinstance(v, dict) for v in value))
+
+    assert parser.feed('Listing [0] first: [{"listing_id": "0"}, ') == [(0, {"listing_id": "0"})]
+    assert parser.result is None
+    assert parser.feed('{"listing_id": "1"}]') == [(1, {"listing_id": "1"})]
+    assert parser.result == [{"listing_id": "0"}, {"listing_id": "1"}]
+
+
+def test_corpus_round_trips():
+    """Test every saved analysis is recovered from the usual response shapes"""
+    analyses = load_corpus()
+    assert analyses
+
+    for analysis in analyses:
+        for response in raw_responses([analysis]):
+            assert extract_json_object(response) == analysis
+
+
+def test_benchmark_extract_json_object(benchmark_or_skip):
+    """Benchmark extraction over the saved response corpus"""
+    responses = raw_responses(load_corpus())
+
+    results = benchmark_or_skip(lambda: [extract_json_object(r) for r in responses])
+
+    assert all(results)
@@ -0,0 +1,210 @@
+import pytest
+from contextlib import asynccontextmanager
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+pytest.importorskip("selectolax.lexbor")
+
+from job_boards.remoteok.board import RemoteOKBoard
+from job_boards.wellfound.board import WellFoundBoard
+from job_boards.weworkremotely.board import WeWorkRemotelyBoard
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def load_fixture(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+@pytest.fixture(autouse=True)
+def artifacts_in_tmp(tmp_path, monkeypatch):
+    """Keep board artifact directories out of the source tree"""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def benchmark_or_skip(request):
+    pytest.importorskip("pytest_benchmark")
+    return request.getfixturevalue("benchmark")
+
+
+def test_remoteok_parse_listings():
+    """Test RemoteOK search results are parsed from static HTML"""
+    jobs = RemoteOKBoard("devops").parse_job_listings_html(load_fixture("remoteok_search.html"))
+
+    assert [job["job_id"] for job in jobs] == ["1001", "1002"]
+    assert jobs[0] == {
+        "position": "Senior DevOps Engineer",
+        "company": "Acme Cloud",
+        "location": "Worldwide",
+        "salary": "$120k - $160k",
+        "tags": ["devops", "aws", "kubernetes"],
+        "posted": "",
+        "description": "Run our platform.",
+        "job_id": "1001"
+    }
+    assert jobs[1]["salary"] == ""
+
+
+def test_remoteok_parse_details():
+    """Test RemoteOK detail pages yield the description without scripts and the stats"""
+    description, details = RemoteOKBoard("devops").parse_job_details_html(load_fixture("remoteok_job.html"))
+
+    assert "Kubernetes platform" in description
+    assert "Terraform" in description
+    assert "track" not in description
+    assert details == {
+        "posted": "2024-01-15T10:00:00+00:00",
+        "views": "1,234 views",
+        "applicants": "56",
+        "apply_percentage": "4%"
+    }
+
+
+def test_weworkremotely_parse_listings():
+    """Test WeWorkRemotely search results skip articles without a company"""
+    jobs = WeWorkRemotelyBoard("devops").parse_job_listings_html(load_fixture("weworkremotely_search.html"))
+
+    assert [job["job_id"] for job in jobs] == ["remote-platform-engineer", "remote-devops-lead"]
+    assert jobs[0]["tags"] == ["Full-Time", "DevOps"]
+    assert jobs[1]["location"] == "Remote"
+
+
+def test_weworkremotely_parse_details():
+    """Test WeWorkRemotely detail pages yield the description and stats"""
+    description, details = WeWorkRemotelyBoard("devops").parse_job_details_html(
+        load_fixture("weworkremotely_job.html")
+    )
+
+    assert description.startswith("Initech is hiring")
+    assert details == {"posted": "2024-02-01T08:30:00Z", "views": "870", "applicants": "42"}
+
+
+def test_parse_details_missing_container():
+    """Test a detail page without the description container asks for the browser"""
+    assert RemoteOKBoard("devops").parse_job_details_html("<html><body></body></html>") is None
+
+
+@pytest.mark.asyncio
+async def test_get_job_details_uses_http():
+    """Test server-rendered detail pages are scraped without opening a browser"""
+    board = RemoteOKBoard("devops")
+    board.fetch_html = AsyncMock(return_value=load_fixture("remoteok_job.html"))
+    board.new_page = MagicMock()
+
+    description, details = await board.get_job_details("https://remoteok.com/remote-jobs/1001", MagicMock())
+
+    assert "Kubernetes platform" in description
+    assert details["applicants"] == "56"
+    board.new_page.assert_not_called()
+    assert board.scrape_stats == {"http": 1}
+
+
+@pytest.mark.asyncio
+async def test_get_job_details_falls_back_to_browser():
+    """Test the browser is used when the fetched HTML lacks the expected markup"""
+    board = RemoteOKBoard("devops")
+    board.fetch_html = AsyncMock(return_value="<html><body>Enable JavaScript</body></html>")
+    page = MagicMock()
+    page.goto = AsyncMock()
+
+    @asynccontextmanager
+    async def new_page(playwright, extra_resource_types=()):
+        yield page
+
+    board.new_page = new_page
+    board.scrape_job_details = AsyncMock(return_value=("from browser", {}))
+
+    result = await board.get_job_details("https://remoteok.com/remote-jobs/1001", MagicMock())
+
+    assert result == ("from browser", {})
+    page.goto.assert_awaited_once_with("https://remoteok.com/remote-jobs/1001")
+    assert board.scrape_stats == {"browser": 1}
+
+
+@pytest.mark.asyncio
+async def test_client_rendered_board_skips_http():
+    """Test boards that need JavaScript never try the HTTP path"""
+    board = WellFoundBoard("devops")
+    board.fetch_html = AsyncMock()
+    page = MagicMock()
+    page.goto = AsyncMock()
+
+    @asynccontextmanager
+    async def new_page(playwright, extra_resource_types=()):
+        yield page
+
+    board.new_page = new_page
+    board.extract_job_listings = AsyncMock(return_value=[{"job_id": "1"}])
+
+    assert await board.get_job_listings(MagicMock()) == [{"job_id": "1"}]
+    board.fetch_html.assert_not_called()
+
+
+def fake_route(resource_type, url):
+    route = MagicMock()
+    route.request.resource_type = resource_type
+    route.request.url = url
+    route.continue_ = AsyncMock()
+    route.abort = AsyncMock()
+    return route
+
+
+@pytest.mark.asyncio
+async def test_browser_fallback_loads_scripts_on_document_only_board():
+    """Test a board that only loads documents lets scripts through once its HTTP path failed"""
+    board = RemoteOKBoard("devops")
+    board.request_filter.enabled = True
+    board.fetch_html = AsyncMock(return_value="<html><body>Enable JavaScript</body></html>")
+    board.scrape_job_details = AsyncMock(return_value=("from browser", {}))
+    page = MagicMock()
+    page.goto = AsyncMock()
+    page.route = AsyncMock()
+
+    @asynccontextmanager
+    async def pool_page():
+        yield page
+
+    board.browser_pool = MagicMock(page=pool_page)
+
+    assert await board.get_job_details("https://remoteok.com/remote-jobs/1001", MagicMock()) == ("from browser", {})
+
+    handle_route = page.route.call_args.args[1]
+    script = fake_route("script", "https://remoteok.com/assets/app.js")
+    image = fake_route("image", "https://remoteok.com/logo.png")
+    tracker = fake_route("script", "https://www.googletagmanager.com/gtag.js")
+    for route in (script, image, tracker):
+        await handle_route(route)
+    script.continue_.assert_awaited_once()
+    image.abort.assert_awaited_once()
+    tracker.abort.assert_awaited_once()
+    # Pages opened without a fallback still load documents only
+    assert not board.request_filter.is_allowed("script", "https://remoteok.com/assets/app.js")
+
+
+def test_boards_without_http_parsers_fall_back():
+    """Test the base parsers report that a browser is needed instead of raising"""
+    board = WellFoundBoard("devops")
+
+    assert board.parse_job_listings_html("<html></html>") is None
+    assert board.parse_job_details_html("<html></html>") is None
+
+
+def test_benchmark_remoteok_parse_listings(benchmark_or_skip):
+    """Benchmark parsing a RemoteOK search page from a saved fixture"""
+    board = RemoteOKBoard("devops")
+    html = load_fixture("remoteok_search.html")
+
+    jobs = benchmark_or_skip(board.parse_job_listings_html, html)
+
+    assert len(jobs) == 2
+
+
+def test_benchmark_weworkremotely_parse_details(benchmark_or_skip):
+    """Benchmark parsing a WeWorkRemotely detail page from a saved fixture"""
+    board = WeWorkRemotelyBoard("devops")
+    html = load_fixture("weworkremotely_job.html")
+
+    description, _ = benchmark_or_skip(board.parse_job_details_html, html)
+
+    assert description
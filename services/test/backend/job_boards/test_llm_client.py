@@ -0,0 +1,187 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from job_boards.llm_client import LLMAPIError, LLMClient
+from job_boards.rate_limit import CircuitBreaker
+
+
+@pytest_asyncio.fixture
+async def groq_stub():
+    """Start a local server mimicking the Groq chat-completions endpoint"""
+    state = {'requests': [], 'peers': set(), 'status': 200, 'failures': None, 'headers': {},
+             'stream_chunks': [], 'stream_sent': 0}
+
+    async def stream_completion(request):
+        # Server-sent events, one content delta each, until the client disconnects
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        try:
+            for chunk in state['stream_chunks']:
+                event = {'choices': [{'delta': {'content': chunk}, 'finish_reason': None}]}
+                await response.write(f"data: {json.dumps(event)}\n\n".encode())
+                state['stream_sent'] += 1
+                await asyncio.sleep(0.02)
+            await response.write(b'data: {"choices": [{"delta": {}, "finish_reason": "stop"}]}\n\n')
+            await response.write(b"data: [DONE]\n\n")
+        except (ConnectionResetError, RuntimeError):
+            pass
+        return response
+
+    async def chat_completions(request):
+        body = await request.json()
+        state['requests'].append(body)
+        if body.get('stream'):
+            return await stream_completion(request)
+        state['peers'].add(request.transport.get_extra_info('peername'))
+        # Fail every request, or only the first 'failures' of them
+        failing = state['failures'] is None or len(state['requests']) <= state['failures']
+        if state['status'] != 200 and failing:
+            return web.json_response({'error': 'unavailable'}, status=state['status'], headers=state['headers'])
+        return web.json_response({
+            'choices': [{'message': {'content': '{"role": "DevOps Engineer"}'}}]
+        })
+
+    app = web.Application()
+    app.router.add_post('/openai/v1/chat/completions', chat_completions)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    state['url'] = f'http://127.0.0.1:{port}/openai/v1/chat/completions'
+
+    yield state
+
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_chat_reuses_connection(groq_stub):
+    """Test that consecutive calls share one keep-alive connection"""
+    client = LLMClient(api_key='test-key', api_url=groq_stub['url'], model='test-model')
+
+    for _ in range(3):
+        result = await client.chat([{'role': 'user', 'content': 'hi'}], max_tokens=10)
+        assert result['choices'][0]['message']['content'] == '{"role": "DevOps Engineer"}'
+
+    await client.close()
+
+    assert len(groq_stub['requests']) == 3
+    assert len(groq_stub['peers']) == 1
+    assert groq_stub['requests'][0]['model'] == 'test-model'
+    assert groq_stub['requests'][0]['max_tokens'] == 10
+
+
+@pytest.mark.asyncio
+async def test_chat_raises_on_error_status(groq_stub):
+    """Test that non-200 responses raise LLMAPIError with the status"""
+    groq_stub['status'] = 429
+    client = LLMClient(api_key='test-key', api_url=groq_stub['url'], max_retries=0)
+
+    with pytest.raises(LLMAPIError) as exc_info:
+        await client.chat([{'role': 'user', 'content': 'hi'}])
+
+    assert exc_info.value.status == 429
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_close_releases_session(groq_stub):
+    """Test that close() shuts the session down and a new call reopens it"""
+    client = LLMClient(api_key='test-key', api_url=groq_stub['url'])
+    await client.chat([{'role': 'user', 'content': 'hi'}])
+    session = client._get_session()
+
+    await client.close()
+    assert session.closed
+
+    await client.chat([{'role': 'user', 'content': 'hi'}])
+    assert len(groq_stub['peers']) == 2
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_chat_retries_honoring_retry_after(groq_stub, monkeypatch):
+    """Test that rate-limited calls are retried no sooner than Retry-After"""
+    groq_stub.update(status=429, failures=2, headers={'Retry-After': '7'})
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr('job_boards.llm_client.asyncio.sleep', fake_sleep)
+    client = LLMClient(api_key='test-key', api_url=groq_stub['url'], max_retries=3)
+
+    result = await client.chat([{'role': 'user', 'content': 'hi'}])
+
+    assert result['choices']
+    assert len(groq_stub['requests']) == 3
+    assert sleeps == [7.0, 7.0]
+    assert client.circuit_breaker.failures == 0
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_chat_does_not_retry_client_errors(groq_stub):
+    """Test that errors other than 429 and 5xx are raised immediately"""
+    groq_stub['status'] = 400
+    client = LLMClient(api_key='test-key', api_url=groq_stub['url'], max_retries=3)
+
+    with pytest.raises(LLMAPIError):
+        await client.chat([{'role': 'user', 'content': 'hi'}])
+
+    assert len(groq_stub['requests']) == 1
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_server_errors_open_the_circuit(groq_stub):
+    """Test that repeated 5xx responses open the circuit breaker"""
+    groq_stub['status'] = 503
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    client = LLMClient(
+        api_key='test-key', api_url=groq_stub['url'],
+        max_retries=1, backoff_base=0, circuit_breaker=breaker
+    )
+
+    with pytest.raises(LLMAPIError):
+        await client.chat([{'role': 'user', 'content': 'hi'}])
+
+    assert breaker.state == "open"
+    assert breaker.retry_after() > 0
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_chat_collects_deltas(groq_stub):
+    """Test streamed content is passed on piece by piece and returned whole"""
+    groq_stub['stream_chunks'] = ['{"role": ', '"SRE"', '}']
+    client = LLMClient(api_key='test-key', api_url=groq_stub['url'])
+    deltas = []
+
+    result = await client.stream_chat([{'role': 'user', 'content': 'hi'}], deltas.append)
+    await client.close()
+
+    assert deltas == ['{"role": ', '"SRE"', '}']
+    assert result['choices'][0]['message']['content'] == '{"role": "SRE"}'
+    assert result['choices'][0]['finish_reason'] == 'stop'
+    assert groq_stub['requests'][0]['stream'] is True
+
+
+@pytest.mark.asyncio
+async def test_stream_chat_stops_early(groq_stub):
+    """Test returning True from on_content closes the stream"""
+    groq_stub['stream_chunks'] = ['{"role": "SRE"}', '\n\nHope', ' this', ' helps', '!'] * 5
+    client = LLMClient(api_key='test-key', api_url=groq_stub['url'])
+
+    result = await client.stream_chat([{'role': 'user', 'content': 'hi'}], lambda delta: delta.endswith('}'))
+    await client.close()
+    await asyncio.sleep(0.1)
+
+    assert result['choices'][0]['message']['content'] == '{"role": "SRE"}'
+    assert result['choices'][0]['finish_reason'] == 'early_stop'
+    assert client.streams_stopped_early == 1
+    assert groq_stub['stream_sent'] < len(groq_stub['stream_chunks'])
@@ -0,0 +1,113 @@
+import socket
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from job_boards import metrics
+from job_boards.browser_pool import BrowserPool
+from job_boards.metrics import InstrumentedPage, NoopMetric
+
+
+def sample(name, **labels):
+    """Read a metric sample from the default registry, 0 if it was never recorded"""
+    prometheus_client = pytest.importorskip("prometheus_client")
+    return prometheus_client.REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.fixture
+def require_metrics():
+    if not metrics.metrics_enabled():
+        pytest.skip("prometheus_client is not installed or metrics are disabled")
+
+
+def test_noop_metric_accepts_every_call():
+    """Test the disabled stand-in supports the calls made on real metrics"""
+    metric = NoopMetric()
+
+    child = metric.labels("remoteok", step="goto")
+    child.inc()
+    child.dec(2)
+    child.set(3)
+    child.observe(0.5)
+    with child.time():
+        with child.time():
+            pass
+
+    assert child is metric
+
+
+@pytest.mark.asyncio
+async def test_instrumented_page_times_browser_steps(require_metrics):
+    """Test goto, wait_for_selector and evaluate are timed and other calls pass through"""
+    page = MagicMock()
+    page.goto = AsyncMock(return_value="response")
+    page.evaluate = AsyncMock(return_value={"title": "SRE"})
+    page.url = "https://remoteok.com"
+    before = sample("jobboard_browser_step_seconds_count", board="metricstest", step="goto")
+
+    wrapped = InstrumentedPage(page, "metricstest")
+
+    assert await wrapped.goto("https://remoteok.com") == "response"
+    assert await wrapped.evaluate("() => 1") == {"title": "SRE"}
+    assert wrapped.url == "https://remoteok.com"
+    assert sample("jobboard_browser_step_seconds_count", board="metricstest", step="goto") == before + 1
+    assert sample("jobboard_browser_step_seconds_count", board="metricstest", step="evaluate") >= 1
+
+
+@pytest.mark.asyncio
+async def test_active_browsers_gauge_follows_pool(require_metrics):
+    """Test the browser gauge rises on launch and falls when the pool closes"""
+    browser = MagicMock()
+    browser.is_connected = MagicMock(return_value=True)
+    browser.close = AsyncMock()
+    browser.new_context = AsyncMock(return_value=MagicMock(close=AsyncMock()))
+    playwright = MagicMock()
+    playwright.chromium.launch = AsyncMock(return_value=browser)
+    before = sample("jobboard_active_browsers")
+    pool = BrowserPool(playwright, size=2, max_pages=10)
+
+    async with pool.context():
+        assert sample("jobboard_active_browsers") == before + 1
+    await pool.close()
+
+    assert sample("jobboard_active_browsers") == before
+
+
+def test_record_failure_counts_by_type(require_metrics):
+    """Test failures are counted under their stage and error class"""
+    before = sample("jobboard_failures_total", stage="llm", type="TimeoutError")
+
+    metrics.record_failure("llm", TimeoutError())
+
+    assert sample("jobboard_failures_total", stage="llm", type="TimeoutError") == before + 1
+
+
+def test_render_metrics_uses_text_format(require_metrics):
+    """Test the exposition contains the pipeline metrics"""
+    body, content_type = metrics.render_metrics()
+
+    assert content_type.startswith("text/plain")
+    assert b"jobboard_llm_seconds" in body
+
+
+def test_metrics_server_takes_next_free_port(require_metrics):
+    """Test a second process on the host serves metrics on the next port instead of failing"""
+    with socket.socket() as taken:
+        taken.bind(("0.0.0.0", 0))
+        taken.listen()
+        port = taken.getsockname()[1]
+
+        served = metrics.start_metrics_server(port, attempts=5)
+        assert served is not None and port < served < port + 5
+        assert metrics.start_metrics_server(port, attempts=1) is None
+
+
+def test_multiprocess_mode_renders_every_process(require_metrics, tmp_path, monkeypatch):
+    """Test metrics are read from the shared directory when multiprocess mode is on"""
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    registry = metrics._registry()
+    body, _ = metrics.render_metrics()
+
+    assert registry is not pytest.importorskip("prometheus_client").REGISTRY
+    # Nothing was written to the directory, and this process's own samples are not read
+    assert b"jobboard_llm_seconds" not in body
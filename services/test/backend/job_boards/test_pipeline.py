@@ -0,0 +1,139 @@
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from job_boards.pipeline import DomainThrottle, load_board_class, process_jobs, run_search
+from job_boards.seen_index import SeenIndex
+from job_boards.remoteok.board import RemoteOKBoard
+from job_boards.weworkremotely.board import WeWorkRemotelyBoard
+
+
+class FakeBoard:
+    """Minimal board whose process_job sleeps for a per-listing delay"""
+
+    board_name = 'fake'
+    base_url = 'https://example.com'
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def process_job(self, job, playwright):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(job['delay'])
+        self.in_flight -= 1
+        if job.get('fail'):
+            raise RuntimeError('boom')
+        return {'job_id': job['job_id']}
+
+
+def test_load_board_class():
+    """Test resolving board names to their board classes"""
+    assert load_board_class('remoteok') is RemoteOKBoard
+    assert load_board_class('weworkremotely') is WeWorkRemotelyBoard
+
+
+@pytest.mark.asyncio
+async def test_process_jobs_preserves_order_and_limits_concurrency():
+    """Test that results come back in listing order with bounded concurrency"""
+    board = FakeBoard()
+    jobs = [{'job_id': str(i), 'position': str(i), 'delay': 0.05 - i * 0.01} for i in range(5)]
+    progress = []
+
+    results = await process_jobs(
+        board, jobs, MagicMock(), concurrency=2, politeness_delay=0,
+        on_progress=lambda done, total, index, job, result: progress.append((done, total, index))
+    )
+
+    assert [r['job_id'] for r in results] == ['0', '1', '2', '3', '4']
+    assert board.max_in_flight == 2
+    assert [p[0] for p in progress] == [1, 2, 3, 4, 5]
+    assert all(p[1] == 5 for p in progress)
+
+
+@pytest.mark.asyncio
+async def test_process_jobs_failure_yields_none():
+    """Test that a failing listing does not abort the others"""
+    board = FakeBoard()
+    jobs = [{'job_id': '0', 'position': 'a', 'delay': 0},
+            {'job_id': '1', 'position': 'b', 'delay': 0, 'fail': True}]
+
+    results = await process_jobs(board, jobs, MagicMock(), concurrency=2, politeness_delay=0)
+
+    assert results[0] == {'job_id': '0'}
+    assert results[1] is None
+
+
+@pytest.mark.asyncio
+async def test_domain_throttle_spaces_out_requests():
+    """Test that starts to the same domain are spaced by the delay"""
+    throttle = DomainThrottle(0.05)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    await asyncio.gather(*(throttle.wait('https://example.com/a') for _ in range(3)))
+    await throttle.wait('https://other.example.com/b')
+
+    assert loop.time() - start >= 0.1
+    assert loop.time() - start < 0.2
+
+
+def make_search_board(listings):
+    """FakeBoard with the hooks run_search needs, returning fixed search results"""
+    board = FakeBoard()
+    board.get_job_listings = AsyncMock(side_effect=lambda playwright: [dict(job) for job in listings])
+    board.request_filter = MagicMock()
+    board.analysis_batcher = MagicMock()
+    board.scrape_stats = {}
+    board.close = AsyncMock()
+    return board
+
+
+@asynccontextmanager
+async def fake_playwright():
+    yield MagicMock()
+
+
+@pytest.mark.asyncio
+async def test_run_search_skips_unchanged_listings():
+    """Test listings processed before are skipped until they change or a refresh is forced"""
+    listings = [{'job_id': 'a', 'delay': 0}, {'job_id': 'b', 'delay': 0}]
+    seen_index = SeenIndex()
+    progress, unchanged = [], []
+
+    with patch('job_boards.pipeline.async_playwright', fake_playwright), \
+            patch('job_boards.pipeline.get_seen_index', return_value=seen_index):
+        first = await run_search(make_search_board(listings), 10, politeness_delay=0)
+        assert first == [{'job_id': 'a'}, {'job_id': 'b'}]
+
+        listings[1] = {'job_id': 'b', 'delay': 0, 'salary': 'changed'}
+        second = await run_search(
+            make_search_board(listings), 10, politeness_delay=0,
+            on_progress=lambda done, total, index, job, result: progress.append(index),
+            on_unchanged=lambda index, job: unchanged.append(index)
+        )
+        assert second == [None, {'job_id': 'b'}]
+        assert unchanged == [0]
+        assert progress == [1]
+
+        forced = await run_search(make_search_board(listings), 10, politeness_delay=0, force_refresh=True)
+        assert forced == [{'job_id': 'a'}, {'job_id': 'b'}]
+
+
+@pytest.mark.asyncio
+async def test_run_search_hands_seen_hashes_to_the_caller():
+    """Test listings are left unseen when the caller marks them after storing the results"""
+    listings = [{'job_id': 'a', 'delay': 0}, {'job_id': 'b', 'delay': 0, 'fail': True}]
+    seen_index = SeenIndex()
+    seen_hashes = {}
+
+    with patch('job_boards.pipeline.async_playwright', fake_playwright), \
+            patch('job_boards.pipeline.get_seen_index', return_value=seen_index):
+        await run_search(make_search_board(listings), 10, politeness_delay=0, seen_hashes=seen_hashes)
+        assert list(seen_hashes) == ['a']
+        assert await seen_index.unchanged('fake', listings) == set()
+
+        await seen_index.mark_seen('fake', seen_hashes)
+        assert await seen_index.unchanged('fake', listings) == {0}
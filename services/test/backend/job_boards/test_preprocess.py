@@ -0,0 +1,49 @@
+from job_boards.llm_client import estimate_tokens
+from job_boards.preprocess import preprocess_description, truncate_to_tokens
+
+
+def test_whitespace_boilerplate_and_duplicates_removed():
+    """Test descriptions are normalized before being sent to Groq"""
+    text = """
+        Platform   Engineer
+
+        We run   Kubernetes\tat scale.
+        Apply now
+        Share this job:
+        We run Kubernetes at scale.
+        Back to all jobs
+    """
+
+    cleaned, counts = preprocess_description(text, boilerplate=(r'back to all jobs',))
+
+    assert cleaned == "Platform Engineer\nWe run Kubernetes at scale."
+    assert counts["sent_tokens"] < counts["original_tokens"]
+
+
+def test_boilerplate_only_matches_whole_lines():
+    """Test boilerplate patterns do not remove sentences that merely contain them"""
+    cleaned, _ = preprocess_description("You will apply now-proven patterns\nApply")
+
+    assert cleaned == "You will apply now-proven patterns"
+
+
+def test_truncated_to_token_budget():
+    """Test long descriptions are cut to the token budget at a word boundary"""
+    text = " ".join(f"word{i}" for i in range(2000))
+
+    cleaned, counts = preprocess_description(text, max_tokens=100)
+
+    assert estimate_tokens(cleaned) <= 100
+    assert text.startswith(cleaned)
+    assert cleaned.split()[-1] in text.split()
+    assert counts["sent_tokens"] <= 100 < counts["original_tokens"]
+
+
+def test_short_text_untouched_by_truncation():
+    """Test text within the budget is returned as is"""
+    assert truncate_to_tokens("short text", 100) == "short text"
+
+
+def test_empty_description():
+    """Test an empty description yields zero token counts"""
+    assert preprocess_description("") == ("", {"original_tokens": 0, "sent_tokens": 0})
@@ -0,0 +1,89 @@
+import pytest
+from unittest.mock import patch
+
+from job_boards.rate_limit import CircuitBreaker, TokenBucketLimiter, backoff_delay, parse_retry_after
+
+
+@pytest.fixture
+def redis_client():
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.mark.parametrize("use_redis", [False, True])
+@pytest.mark.asyncio
+async def test_limiter_enforces_request_and_token_limits(use_redis, request):
+    """Test both buckets are drawn from and report how long to wait"""
+    client = request.getfixturevalue("redis_client") if use_redis else None
+    limiter = TokenBucketLimiter(client, requests_per_minute=2, tokens_per_minute=600)
+
+    with patch("job_boards.rate_limit.time.time", return_value=1000.0):
+        assert await limiter._take(100) == 0
+        assert await limiter._take(100) == 0
+        # Out of requests: one refills every 30 seconds
+        assert await limiter._take(100) == pytest.approx(30, abs=0.01)
+
+    with patch("job_boards.rate_limit.time.time", return_value=1030.0):
+        assert await limiter._take(100) == 0
+
+    tokens_only = TokenBucketLimiter(client, requests_per_minute=0, tokens_per_minute=600, prefix='tokens-only')
+    with patch("job_boards.rate_limit.time.time", return_value=1000.0):
+        assert await tokens_only._take(600) == 0
+        # 300 tokens short at 10 tokens per second
+        assert await tokens_only._take(300) == pytest.approx(30, abs=0.01)
+        # Requests larger than the whole budget only wait for a full bucket
+        assert await tokens_only._take(10_000) == pytest.approx(60, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_limiter_buckets_are_shared_through_redis(redis_client):
+    """Test two limiters on the same Redis draw from one budget"""
+    first = TokenBucketLimiter(redis_client, requests_per_minute=1, tokens_per_minute=0)
+    second = TokenBucketLimiter(redis_client, requests_per_minute=1, tokens_per_minute=0)
+
+    with patch("job_boards.rate_limit.time.time", return_value=1000.0):
+        assert await first._take(0) == 0
+        assert await second._take(0) > 0
+
+
+@pytest.mark.asyncio
+async def test_unlimited_limiter_never_waits():
+    """Test zero limits disable limiting"""
+    limiter = TokenBucketLimiter(requests_per_minute=0, tokens_per_minute=0)
+    for _ in range(100):
+        await limiter.acquire(10_000)
+    assert limiter.waits == 0
+
+
+def test_backoff_delay():
+    """Test backoff grows with attempts, is capped and honors Retry-After"""
+    with patch("job_boards.rate_limit.random.uniform", side_effect=lambda low, high: high):
+        assert backoff_delay(0, base=1, maximum=60) == 1
+        assert backoff_delay(3, base=1, maximum=60) == 8
+        assert backoff_delay(10, base=1, maximum=60) == 60
+        assert backoff_delay(0, base=1, maximum=60, retry_after=12) == 12
+        assert backoff_delay(0, base=1, maximum=60, retry_after=600) == 60
+
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") is None
+
+
+def test_circuit_breaker_states():
+    """Test the breaker opens on repeated failures, half-opens after the timeout and closes on success"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    with patch("job_boards.rate_limit.time.monotonic", return_value=100.0):
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.retry_after() == 30
+
+    with patch("job_boards.rate_limit.time.monotonic", return_value=131.0):
+        assert breaker.state == "half-open"
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.stats()["times_opened"] == 2
@@ -0,0 +1,62 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from job_boards.request_filter import RequestFilter
+
+
+def make_route(resource_type, url):
+    """Create a mock Playwright route for a request"""
+    route = MagicMock()
+    route.request.resource_type = resource_type
+    route.request.url = url
+    route.continue_ = AsyncMock()
+    route.abort = AsyncMock()
+    return route
+
+
+@pytest.fixture
+def request_filter():
+    return RequestFilter({"document", "script"}, {"remoteok.com"})
+
+
+def test_is_allowed(request_filter):
+    """Test resource type and domain allowlisting"""
+    assert request_filter.is_allowed("document", "https://remoteok.com/remote-devops-jobs")
+    assert request_filter.is_allowed("script", "https://static.remoteok.com/app.js")
+    assert not request_filter.is_allowed("image", "https://remoteok.com/logo.png")
+    assert not request_filter.is_allowed("script", "https://www.googletagmanager.com/gtag.js")
+    assert not request_filter.is_allowed("document", "https://evilremoteok.com/")
+
+
+@pytest.mark.asyncio
+async def test_routes_are_continued_or_aborted(request_filter):
+    """Test that blocked requests are aborted and counted"""
+    allowed = make_route("document", "https://remoteok.com/")
+    image = make_route("image", "https://remoteok.com/logo.png")
+    tracker = make_route("script", "https://analytics.example.com/t.js")
+
+    for route in (allowed, image, tracker):
+        await request_filter._handle_route(route)
+
+    allowed.continue_.assert_awaited_once()
+    image.abort.assert_awaited_once()
+    tracker.abort.assert_awaited_once()
+
+    stats = request_filter.stats()
+    assert stats["allowed"] == 1
+    assert stats["blocked"] == 2
+    assert stats["blocked_by_type"] == {"image": 1, "script": 1}
+    assert stats["estimated_bytes_saved"] > 0
+
+
+@pytest.mark.asyncio
+async def test_install_skipped_when_disabled():
+    """Test that a disabled filter leaves the page untouched"""
+    page = MagicMock()
+    page.route = AsyncMock()
+
+    await RequestFilter({"document"}, {"remoteok.com"}, enabled=False).install(page)
+    page.route.assert_not_called()
+
+    await RequestFilter({"document"}, {"remoteok.com"}).install(page)
+    page.route.assert_awaited_once()
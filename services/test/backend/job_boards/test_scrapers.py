@@ -1,154 +1,95 @@
+import json
 import pytest
-from unittest.mock import patch, MagicMock
-from datetime import datetime
-
-# Import scrapers
-from app.job_boards.base import BaseScraper
-from app.job_boards.indeed import IndeedScraper
-from app.job_boards.linkedin import LinkedInScraper
-
-@pytest.fixture
-def mock_page():
-    """Create a mock Playwright page"""
-    page = MagicMock()
-    page.goto = MagicMock()
-    page.wait_for_selector = MagicMock()
-    page.query_selector = MagicMock()
-    page.query_selector_all = MagicMock()
-    page.evaluate = MagicMock()
-    return page
-
-@pytest.fixture
-def mock_browser():
-    """Create a mock Playwright browser"""
-    browser = MagicMock()
-    browser.new_page = MagicMock(return_value=mock_page())
-    return browser
-
-@pytest.fixture
-def mock_playwright():
-    """Create a mock Playwright instance"""
-    playwright = MagicMock()
-    playwright.chromium = MagicMock()
-    playwright.chromium.launch = MagicMock(return_value=mock_browser())
-    return playwright
-
-def test_base_scraper_initialization():
-    """Test BaseScraper initialization"""
-    scraper = BaseScraper("https://example.com/job/123")
-    assert scraper.url == "https://example.com/job/123"
-    assert scraper.job_data == {}
-
-def test_base_scraper_abstract_methods():
-    """Test BaseScraper abstract methods"""
-    scraper = BaseScraper("https://example.com/job/123")
-    
-    with pytest.raises(NotImplementedError):
-        scraper.scrape()
-    
-    with pytest.raises(NotImplementedError):
-        scraper.parse_job_data()
-
-@patch('app.job_boards.indeed.sync_playwright')
-def test_indeed_scraper(mock_playwright, mock_page):
-    """Test IndeedScraper"""
-    # Mock Playwright
-    mock_playwright.return_value = mock_playwright
-    mock_playwright.chromium.launch.return_value.new_page.return_value = mock_page
-    
-    # Mock page content
-    mock_page.evaluate.return_value = {
-        "title": "Software Engineer",
-        "company": "Example Corp",
-        "location": "Remote",
-        "description": "Job description",
-        "salary": "$100k - $150k"
-    }
-    
-    # Create scraper
-    scraper = IndeedScraper("https://indeed.com/job/123")
-    
-    # Test scraping
-    job_data = scraper.scrape()
-    
-    # Verify results
-    assert job_data["title"] == "Software Engineer"
-    assert job_data["company"] == "Example Corp"
-    assert job_data["location"] == "Remote"
-    assert job_data["description"] == "Job description"
-    assert job_data["salary"] == "$100k - $150k"
-    
-    # Verify Playwright calls
-    mock_page.goto.assert_called_once_with("https://indeed.com/job/123")
-    mock_page.wait_for_selector.assert_called()
-
-@patch('app.job_boards.linkedin.sync_playwright')
-def test_linkedin_scraper(mock_playwright, mock_page):
-    """Test LinkedInScraper"""
-    # Mock Playwright
-    mock_playwright.return_value = mock_playwright
-    mock_playwright.chromium.launch.return_value.new_page.return_value = mock_page
-    
-    # Mock page content
-    mock_page.evaluate.return_value = {
-        "title": "Senior Developer",
-        "company": "Tech Corp",
-        "location": "San Francisco",
-        "description": "Job description",
-        "salary": "Not specified"
-    }
-    
-    # Create scraper
-    scraper = LinkedInScraper("https://linkedin.com/job/123")
-    
-    # Test scraping
-    job_data = scraper.scrape()
-    
-    # Verify results
-    assert job_data["title"] == "Senior Developer"
-    assert job_data["company"] == "Tech Corp"
-    assert job_data["location"] == "San Francisco"
-    assert job_data["description"] == "Job description"
-    assert job_data["salary"] == "Not specified"
-    
-    # Verify Playwright calls
-    mock_page.goto.assert_called_once_with("https://linkedin.com/job/123")
-    mock_page.wait_for_selector.assert_called()
-
-def test_scraper_error_handling():
-    """Test scraper error handling"""
-    # Create scraper with invalid URL
-    scraper = IndeedScraper("invalid-url")
-    
-    # Test scraping with error
-    with pytest.raises(Exception):
-        scraper.scrape()
-
-def test_scraper_timeout():
-    """Test scraper timeout handling"""
-    # Create scraper
-    scraper = IndeedScraper("https://indeed.com/job/123")
-    
-    # Mock page with timeout
-    mock_page = MagicMock()
-    mock_page.wait_for_selector.side_effect = Exception("Timeout")
-    
-    # Test scraping with timeout
-    with pytest.raises(Exception):
-        scraper.scrape()
-
-def test_scraper_retry():
-    """Test scraper retry mechanism"""
-    # Create scraper
-    scraper = IndeedScraper("https://indeed.com/job/123")
-    
-    # Mock page with initial failure then success
-    mock_page = MagicMock()
-    mock_page.wait_for_selector.side_effect = [
-        Exception("Timeout"),
-        None  # Success on retry
-    ]
-    
-    # Test scraping with retry
-    job_data = scraper.scrape()
-    assert job_data is not None 
\ No newline at end of file
+import pytest_asyncio
+
+pytest.importorskip("selectolax.lexbor")
+
+from fake_groq import FakeGroq, completion_for
+from fixture_server import FixtureServer, BoardFixtures
+from job_boards import llm_client
+from job_boards.llm_client import LLMClient
+from job_boards.pipeline import run_search
+from job_boards.remoteok.board import RemoteOKBoard
+from job_boards.wellfound.board import WellFoundBoard
+from job_boards.weworkremotely.board import WeWorkRemotelyBoard
+
+
+@pytest.fixture(autouse=True)
+def artifacts_in_tmp(tmp_path, monkeypatch):
+    """Keep board artifact directories out of the source tree"""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest_asyncio.fixture
+async def offline_boards(monkeypatch):
+    """Point the boards at recorded pages and Groq at a local fake"""
+    fixtures = FixtureServer(listings=4)
+    groq = FakeGroq(latency=0)
+    await fixtures.start()
+    await groq.start()
+    for board in fixtures.boards:
+        monkeypatch.setenv(f"BOARD_BASE_URL_{board.upper()}", fixtures.base_url(board))
+    client = LLMClient(api_key="test-key", api_url=groq.url)
+    monkeypatch.setattr(llm_client, "_client", client)
+
+    yield fixtures, groq
+
+    await client.close()
+    await groq.close()
+    await fixtures.close()
+
+
+@pytest.mark.parametrize("board_class", [RemoteOKBoard, WeWorkRemotelyBoard])
+def test_recorded_pages_parse(board_class):
+    """Test the benchmark's recorded pages still parse with the boards' extractors"""
+    board = board_class("DevOps Engineer")
+    fixtures = BoardFixtures(board.board_name, listings=3)
+
+    jobs = board.parse_job_listings_html(fixtures.search_page())
+    description, details = board.parse_job_details_html(fixtures.detail_page(jobs[1]["job_id"]))
+
+    assert [job["job_id"] for job in jobs] == ["100001", "100002", "100003"]
+    assert jobs[0]["position"] == "Senior DevOps Engineer" and jobs[0]["company"] == "Cloudbase"
+    assert jobs[1]["tags"] == ["sre", "gcp", "go", "prometheus"]
+    assert "Reference: 100002" in description and "window.__listing" not in description
+    assert details["posted"].startswith("2024-03-02")
+    assert details["views"] and details["applicants"]
+
+
+def test_base_url_override(monkeypatch):
+    """Test BOARD_BASE_URL_<BOARD> points a board's search and detail pages at a mirror"""
+    monkeypatch.setenv("BOARD_BASE_URL_WELLFOUND", "http://127.0.0.1:8000/wellfound")
+
+    board = WellFoundBoard("DevOps Engineer")
+
+    assert board.base_url == "http://127.0.0.1:8000/wellfound"
+    assert board.search_url == "http://127.0.0.1:8000/wellfound/jobs?query=DevOps+Engineer"
+    assert RemoteOKBoard("DevOps Engineer").base_url == "https://remoteok.com"
+
+
+def test_fake_groq_answers_batched_prompts():
+    """Test the fake model returns one analysis per listing of a batched prompt"""
+    prompt = "Here are the job descriptions:\n### Listing a1\nRemote Go role\n\n### Listing b2\nAWS and Terraform\n\nReturn a JSON array"
+
+    entries = json.loads(completion_for(prompt))
+
+    assert [entry["listing_id"] for entry in entries] == ["a1", "b2"]
+    assert entries[0]["analysis"]["skills"] == ["go"] and entries[0]["analysis"]["remote"]
+    assert entries[1]["analysis"]["skills"] == ["aws", "terraform"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("board_class", [RemoteOKBoard, WeWorkRemotelyBoard])
+async def test_run_search_against_recorded_pages(offline_boards, board_class):
+    """Test a board scrapes and analyzes every listing served by the fixture server"""
+    fixtures, groq = offline_boards
+    board = board_class("DevOps Engineer")
+
+    results = await run_search(board, limit=3, politeness_delay=0, force_refresh=True)
+
+    assert [result["job_id"] for result in results] == ["100001", "100002", "100003"]
+    assert all("error" not in result["parsed_description"] for result in results)
+    assert "kubernetes" in results[0]["parsed_description"]["skills"]
+    assert results[0]["job_url"] == f"{fixtures.base_url(board.board_name)}/remote-jobs/100001"
+    assert fixtures.requests[(board.board_name, "detail")] == 3
+    assert groq.stats["batched_listings"] == 3
@@ -0,0 +1,51 @@
+import pytest
+
+from job_boards.seen_index import SeenIndex, listing_hash
+
+
+@pytest.fixture(params=["memory", "redis"])
+def seen_index(request):
+    if request.param == "memory":
+        return SeenIndex(max_age=60)
+    fakeredis = pytest.importorskip("fakeredis")
+    return SeenIndex(fakeredis.FakeRedis(decode_responses=True), max_age=60)
+
+
+@pytest.mark.asyncio
+async def test_unchanged_listings(seen_index):
+    """Test only listings recorded with the same search-page data count as unchanged"""
+    jobs = [
+        {"job_id": "1", "position": "SRE"},
+        {"job_id": "2", "position": "DevOps"},
+        {"job_id": "3", "position": "Platform"},
+        {"job_id": None, "position": "No id"}
+    ]
+    assert await seen_index.unchanged("remoteok", jobs) == set()
+
+    await seen_index.mark_seen("remoteok", {job["job_id"]: listing_hash(job) for job in jobs[:3]})
+    jobs[1] = {"job_id": "2", "position": "DevOps", "salary": "$100k"}
+
+    assert await seen_index.unchanged("remoteok", jobs) == {0, 2}
+    assert await seen_index.unchanged("weworkremotely", jobs) == set()
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_max_age():
+    """Test the max-age policy is enforced with a TTL on each entry"""
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis(decode_responses=True)
+    seen_index = SeenIndex(client, max_age=3600)
+
+    await seen_index.mark_seen("remoteok", {"1": "abc"})
+
+    assert 0 < client.ttl("seen:remoteok:1") <= 3600
+
+    expired = SeenIndex(max_age=-1)
+    await expired.mark_seen("remoteok", {"1": listing_hash({"job_id": "1"})})
+    assert await expired.unchanged("remoteok", [{"job_id": "1"}]) == set()
+
+
+def test_listing_hash_ignores_key_order():
+    """Test the fingerprint depends on content only"""
+    assert listing_hash({"a": 1, "b": [1, 2]}) == listing_hash({"b": [1, 2], "a": 1})
+    assert listing_hash({"a": 1}) != listing_hash({"a": 2})
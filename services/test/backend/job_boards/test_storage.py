@@ -0,0 +1,113 @@
+import gzip
+import pytest
+
+from job_boards.artifacts import ArtifactSink
+from job_boards.storage import S3_MIN_PART_SIZE, GridFSStorage, LocalStorage, S3Storage, create_storage
+
+
+class FakeS3Client:
+    """In-memory stand-in for the S3 API calls the storage makes"""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.calls = []
+
+    def put_object(self, Bucket, Key, Body):
+        self.calls.append("put_object")
+        self.objects[(Bucket, Key)] = Body
+
+    def create_multipart_upload(self, Bucket, Key):
+        self.calls.append("create_multipart_upload")
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.calls.append("complete_multipart_upload")
+        parts = self.uploads.pop(UploadId)
+        assert [p["ETag"] for p in MultipartUpload["Parts"]] == [f"etag-{n}" for n in sorted(parts)]
+        self.objects[(Bucket, Key)] = b"".join(parts[n] for n in sorted(parts))
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId)
+
+
+def test_local_storage_appends(tmp_path):
+    """Test reopening a local file appends to it"""
+    storage = LocalStorage(tmp_path)
+    for data in (b"a\n", b"b\n"):
+        stream = storage.open("run/x.jsonl")
+        stream.write(data)
+        stream.close()
+
+    assert (tmp_path / "run" / "x.jsonl").read_bytes() == b"a\nb\n"
+
+
+def test_s3_small_object_uses_single_put():
+    """Test streams smaller than one part are uploaded with put_object"""
+    client = FakeS3Client()
+    stream = S3Storage(bucket="b", prefix="artifacts", client=client).open("run/x.jsonl")
+    stream.write(b"hello\n")
+    stream.close()
+
+    assert client.objects == {("b", "artifacts/run/x.jsonl"): b"hello\n"}
+    assert client.calls == ["put_object"]
+
+
+def test_s3_large_object_streams_multipart_parts():
+    """Test large streams are uploaded part by part and reassembled in order"""
+    client = FakeS3Client()
+    storage = S3Storage(bucket="b", client=client, part_size=S3_MIN_PART_SIZE)
+    chunk = b"x" * (1024 * 1024)
+
+    stream = storage.open("run/big.jsonl")
+    for i in range(12):
+        stream.write(bytes([65 + i]) + chunk)
+    stream.close()
+
+    body = client.objects[("b", "run/big.jsonl")]
+    assert len(body) == 12 * (len(chunk) + 1)
+    assert body[0:1] == b"A" and body[-len(chunk) - 1:-len(chunk)] == b"L"
+    assert client.calls == ["create_multipart_upload", "complete_multipart_upload"]
+
+
+def test_s3_reopened_name_gets_new_key():
+    """Test a reopened name does not overwrite the object written before"""
+    client = FakeS3Client()
+    storage = S3Storage(bucket="b", client=client)
+    for data in (b"1", b"2"):
+        stream = storage.open("run/x.jsonl")
+        stream.write(data)
+        stream.close()
+
+    assert client.objects == {("b", "run/x.jsonl"): b"1", ("b", "run/x.jsonl.1"): b"2"}
+
+
+def test_gridfs_storage_through_sink():
+    """Test the sink can write compressed artifacts to GridFS"""
+    mongomock = pytest.importorskip("mongomock")
+    import mongomock.gridfs
+    mongomock.gridfs.enable_gridfs_integration()
+    db = mongomock.MongoClient().jobboard
+
+    sink = ArtifactSink(GridFSStorage(db), compression="gzip", fsync_interval=60)
+    sink.write("run/metadata.jsonl", {"job_id": "1"})
+    sink.close()
+
+    from gridfs import GridFSBucket
+    data = GridFSBucket(db, bucket_name="artifacts").open_download_stream_by_name("run/metadata.jsonl.gz").read()
+    assert gzip.decompress(data) == b'{"job_id":"1"}\n'
+
+
+def test_create_storage():
+    """Test backends are chosen by name"""
+    assert isinstance(create_storage('local'), LocalStorage)
+    with pytest.raises(ValueError):
+        create_storage('gridfs')
+    with pytest.raises(ValueError):
+        create_storage('ftp')
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import pytest
+import time
+
+from job_boards import trace_report, tracing
+from job_boards.tracing import BatchingExporter, JSONFileExporter, OTLPExporter, Span, Tracer, parse_traceparent
+
+
+class ListExporter:
+    """Collects finished spans in memory"""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def close(self):
+        pass
+
+
+def by_name(spans):
+    return {span.name: span for span in spans}
+
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_tasks():
+    """Test spans opened in tasks started inside a span become its children"""
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+
+    async def listing(i):
+        with tracer.span("process_job", rank=i):
+            await asyncio.sleep(0)
+
+    with tracer.span("run_job", job_id="j1") as root:
+        await asyncio.gather(listing(0), listing(1))
+
+    spans = exporter.spans
+    children = [s for s in spans if s.name == "process_job"]
+    assert len(spans) == 3 and len(children) == 2
+    assert all(s.parent_id == root.span_id and s.trace_id == root.trace_id for s in children)
+    assert root.parent_id is None
+    assert by_name(spans)["run_job"].end_ns >= max(s.end_ns for s in children)
+
+
+def test_traceparent_continues_a_remote_trace():
+    """Test a span given another process's traceparent joins its trace"""
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+
+    with tracer.span("create_job") as api_span:
+        traceparent = api_span.traceparent
+    with tracer.span("run_job", parent=traceparent) as worker_span:
+        pass
+
+    assert parse_traceparent(traceparent) == (api_span.trace_id, api_span.span_id)
+    assert worker_span.trace_id == api_span.trace_id
+    assert worker_span.parent_id == api_span.span_id
+    assert parse_traceparent("not-a-traceparent") is None
+
+
+def test_errors_are_recorded_and_raised():
+    """Test a failing block marks its span and the exception still propagates"""
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+
+    with pytest.raises(RuntimeError):
+        with tracer.span("llm.chat"):
+            raise RuntimeError("502")
+
+    assert exporter.spans[0].error == "RuntimeError: 502"
+
+
+def test_disabled_tracer_records_nothing():
+    """Test a tracer without exporter hands out a span without a trace"""
+    tracer = Tracer()
+
+    with tracer.span("create_job", job_id="j1") as span:
+        span.set_attribute("attached_to", "j0")
+
+    assert span.traceparent is None
+    assert not tracer.enabled
+
+
+def test_otlp_payload():
+    """Test spans are mapped to the OTLP JSON request format"""
+    exporter = OTLPExporter.__new__(OTLPExporter)
+    exporter.service_name = "job-board"
+    span = Span("llm.chat", "a" * 32, "b" * 16, {"prompt_tokens": 120, "model": "llama"})
+    span.end_ns = span.start_ns + 5
+    span.error = "TimeoutError: "
+
+    resource = exporter.payload([span])["resourceSpans"][0]
+    otlp_span = resource["scopeSpans"][0]["spans"][0]
+
+    assert resource["resource"]["attributes"][0] == {"key": "service.name", "value": {"stringValue": "job-board"}}
+    assert otlp_span["traceId"] == "a" * 32 and otlp_span["parentSpanId"] == "b" * 16
+    assert otlp_span["endTimeUnixNano"] == str(span.start_ns + 5)
+    assert {"key": "prompt_tokens", "value": {"intValue": "120"}} in otlp_span["attributes"]
+    assert otlp_span["status"]["code"] == 2
+
+
+def test_json_exporter_writes_in_batches(tmp_path):
+    """Test spans are written once a batch is full, and the rest on close"""
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(JSONFileExporter(path, batch_size=3, interval=60))
+
+    for i in range(4):
+        with tracer.span("process_job", rank=i):
+            pass
+    deadline = time.monotonic() + 5
+    while (not path.exists() or len(path.read_text().splitlines()) < 3) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(path.read_text().splitlines()) == 3
+
+    tracer.close()
+    assert [json.loads(line)["attributes"]["rank"] for line in path.read_text().splitlines()] == [0, 1, 2, 3]
+
+
+def test_exporter_without_write_batch_cannot_be_created():
+    """Test an exporter missing write_batch fails when created, not when its first batch is due"""
+    class IncompleteExporter(BatchingExporter):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteExporter()
+
+
+def test_tracer_closed_at_exit_is_registered_once(monkeypatch):
+    """Test re-initializing the tracer does not pile up exit handlers"""
+    registered = []
+    monkeypatch.setattr(tracing.atexit, "register", registered.append)
+    monkeypatch.setattr(tracing, "_tracer", None)
+    monkeypatch.setattr(tracing, "_close_at_exit", False)
+
+    tracing.init_tracer(ListExporter())
+    tracing.init_tracer(ListExporter())
+
+    assert registered == [tracing._close_tracer]
+
+
+def test_json_dump_renders_slowest_traces(tmp_path, capsys):
+    """Test the report reads a JSON dump and prints the slowest trace first as a tree"""
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(JSONFileExporter(path))
+    for job_id, listings, delay in (("fast", 1, 0), ("slow", 3, 0.02)):
+        with tracer.span("run_job", job_id=job_id):
+            for i in range(listings):
+                with tracer.span("process_job", rank=i):
+                    with tracer.span("llm.chat"):
+                        time.sleep(delay)
+    tracer.close()
+
+    traces = trace_report.load_traces(path)
+    slowest = trace_report.slowest_traces(traces, top=1)
+    trace_report.main([str(path), "--top", "2", "--max-children", "2"])
+    output = capsys.readouterr().out
+
+    assert len(traces) == 2
+    assert len(slowest) == 1 and len(slowest[0][2]) == 7
+    assert all(json.loads(line)["duration_ms"] >= 0 for line in path.read_text().splitlines())
+    assert "2 traces" in output
+    assert output.index("job_id=slow") < output.index("job_id=fast")
+    assert "  process_job" in output and "    llm.chat" in output
+    assert "... 1 faster spans" in output
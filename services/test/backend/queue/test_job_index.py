@@ -0,0 +1,45 @@
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.queue.job_index import JOB_INDEX_KEY, add_job, backfill_job_index, page_job_ids
+
+
+@pytest.fixture
+def redis_client():
+    """Create an in-memory Redis stand-in"""
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def test_page_job_ids_newest_first(redis_client):
+    """Test cursor pagination over the job index"""
+    for i in range(5):
+        add_job(redis_client, f"job-{i}", created_at=1000 + i)
+
+    first = page_job_ids(redis_client, 2)
+    second = page_job_ids(redis_client, 2, after=first[-1])
+    third = page_job_ids(redis_client, 2, after=second[-1])
+
+    assert first == ["job-4", "job-3"]
+    assert second == ["job-2", "job-1"]
+    assert third == ["job-0"]
+
+
+def test_page_job_ids_unknown_cursor(redis_client):
+    """Test that an unknown cursor is reported as None"""
+    add_job(redis_client, "job-0")
+    assert page_job_ids(redis_client, 10, after="missing") is None
+
+
+def test_backfill_indexes_existing_jobs(redis_client):
+    """Test that job hashes created before the index are picked up"""
+    redis_client.hset("job:old", mapping={"created_at": "2024-03-19T12:00:00"})
+    redis_client.hset("job:new", mapping={"created_at": "2024-03-20T12:00:00"})
+    redis_client.xadd("job:new:events", {"status": "pending"})
+
+    assert backfill_job_index(redis_client, batch_size=1) == 2
+    assert page_job_ids(redis_client, 10) == ["new", "old"]
+
+    # Existing index is left alone
+    assert backfill_job_index(redis_client) == 0
+    assert redis_client.zcard(JOB_INDEX_KEY) == 2
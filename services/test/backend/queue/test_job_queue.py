@@ -0,0 +1,80 @@
+import json
+import time
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.queue.job_queue import JobQueue, QueueFullError
+
+
+@pytest.fixture
+def redis_client():
+    """Create an in-memory Redis stand-in"""
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def job_queue(redis_client):
+    """Create a small queue with a short visibility timeout"""
+    return JobQueue(redis_client, name="job_queue", max_depth=2, visibility_timeout=60)
+
+
+def test_enqueue_and_reserve_fifo(job_queue):
+    """Test that jobs are reserved in the order they were queued"""
+    job_queue.enqueue({"job_id": "a"})
+    job_queue.enqueue({"job_id": "b"})
+
+    first = job_queue.reserve(timeout=1)
+    second = job_queue.reserve(timeout=1)
+
+    assert first.job_id == "a"
+    assert second.job_id == "b"
+    assert job_queue.depth() == 0
+    assert job_queue.in_flight() == 2
+
+
+def test_enqueue_rejects_when_full(job_queue):
+    """Test backpressure once max_depth jobs are pending"""
+    job_queue.enqueue({"job_id": "a"})
+    job_queue.enqueue({"job_id": "b"})
+
+    with pytest.raises(QueueFullError):
+        job_queue.enqueue({"job_id": "c"})
+    assert job_queue.depth() == 2
+
+
+def test_ack_removes_message(job_queue, redis_client):
+    """Test that acknowledged jobs leave the processing list and leases"""
+    job_queue.enqueue({"job_id": "a"})
+    job = job_queue.reserve(timeout=1)
+
+    job_queue.ack(job)
+
+    assert job_queue.in_flight() == 0
+    assert redis_client.zcard(job_queue.leases_key) == 0
+    assert job_queue.requeue_expired() == 0
+
+
+def test_expired_lease_is_requeued(job_queue, redis_client):
+    """Test that a job whose worker died is delivered again"""
+    job_queue.enqueue({"job_id": "a"})
+    job = job_queue.reserve(timeout=1)
+    redis_client.zadd(job_queue.leases_key, {job.raw: time.time() - 1})
+
+    assert job_queue.requeue_expired() == 1
+
+    again = job_queue.reserve(timeout=1)
+    assert again.job_id == "a"
+    assert job_queue.in_flight() == 1
+
+
+def test_orphaned_message_gets_a_lease(job_queue, redis_client):
+    """Test that a message moved without a lease is eventually requeued"""
+    redis_client.lpush(job_queue.processing_key, json.dumps({"job_id": "a"}))
+
+    assert job_queue.requeue_expired() == 0
+    assert redis_client.zcard(job_queue.leases_key) == 1
+
+    redis_client.zadd(job_queue.leases_key, {json.dumps({"job_id": "a"}): time.time() - 1})
+    assert job_queue.requeue_expired() == 1
+    assert job_queue.depth() == 1
@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.queue.job_index import JOB_INDEX_KEY, add_job
+from app.queue.progress import ProgressReporter, events_key
+
+
+@pytest.fixture
+def redis_client():
+    """Create an in-memory Redis stand-in"""
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def test_updates_are_coalesced_and_throttled(redis_client):
+    """Test that updates within the interval are merged into one write"""
+    reporter = ProgressReporter(redis_client, "job-1", interval=3600)
+
+    reporter.update(status="processing", force=True)
+    reporter.update(progress=10)
+    reporter.update(progress=20)
+
+    assert redis_client.hgetall("job:job-1") == {"status": "processing"}
+
+    reporter.flush()
+    assert redis_client.hgetall("job:job-1") == {"status": "processing", "progress": "20"}
+
+
+def test_updates_written_after_interval(redis_client):
+    """Test that updates are written immediately when the interval has passed"""
+    reporter = ProgressReporter(redis_client, "job-1", interval=0)
+
+    reporter.update(progress=50)
+
+    assert redis_client.hget("job:job-1", "progress") == "50"
+
+
+def test_finish_writes_pending_fields_and_sets_ttl(redis_client):
+    """Test that finishing flushes everything and expires the hash"""
+    add_job(redis_client, "stale", created_at=1)
+    add_job(redis_client, "job-1")
+    reporter = ProgressReporter(redis_client, "job-1", interval=3600, ttl=60)
+
+    reporter.update(status="processing", force=True)
+    reporter.update(progress=80)
+    reporter.finish("completed", progress=100)
+
+    assert redis_client.hgetall("job:job-1") == {"status": "completed", "progress": "100"}
+    assert 0 < redis_client.ttl("job:job-1") <= 60
+    assert redis_client.zrange(JOB_INDEX_KEY, 0, -1) == ["job-1"]
+
+
+def test_writes_are_appended_to_event_stream(redis_client):
+    """Test that every write is recorded as an event and announced"""
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(events_key("job-1"))
+    reporter = ProgressReporter(redis_client, "job-1", interval=0, ttl=60)
+
+    reporter.update(status="processing")
+    reporter.update(progress=50)
+    reporter.publish("listing", {"rank": 0})
+    reporter.finish("completed")
+
+    events = redis_client.xrange(events_key("job-1"))
+    assert [fields["event"] for _, fields in events] == ["status", "progress", "listing", "status"]
+    assert json.loads(events[-1][1]["data"]) == {"status": "completed"}
+    assert 0 < redis_client.ttl(events_key("job-1")) <= 60
+
+    announced = []
+    for _ in range(10):
+        message = pubsub.get_message(timeout=0.1)
+        if message:
+            announced.append(message["data"])
+    assert announced == ["status", "progress", "listing", "status"]
+
+
+def test_partial_analyses_are_coalesced_into_the_next_write(redis_client):
+    """Test analysis fields queued between writes are merged into one event per listing"""
+    reporter = ProgressReporter(redis_client, "job-1", interval=3600, ttl=60)
+
+    reporter.queue_analysis("L1", {"title": "SRE"})
+    reporter.queue_analysis("L1", {"skills": ["Go"]})
+    reporter.queue_analysis("L2", {"title": "DBA"})
+    assert redis_client.xlen(events_key("job-1")) == 0
+
+    reporter.flush()
+    reporter.flush()
+
+    events = redis_client.xrange(events_key("job-1"))
+    assert [json.loads(fields["data"]) for _, fields in events] == [
+        {"listing_id": "L1", "fields": {"title": "SRE", "skills": ["Go"]}},
+        {"listing_id": "L2", "fields": {"title": "DBA"}}
+    ]
+    assert redis_client.exists("job:job-1") == 0
+
+    reporter.queue_analysis("L3", {"title": "QA"})
+    reporter.publish("listing", {"rank": 3})
+    reporter.queue_analysis("L4", {"title": "PM"})
+    reporter.finish("completed")
+    events = [fields["event"] for _, fields in redis_client.xrange(events_key("job-1"))]
+    assert events[2:] == ["analysis", "listing", "analysis", "status"]
+
+
+def test_concurrent_writes_land_in_order(redis_client):
+    """Test a write started before finish() cannot land after the final status"""
+    reporter = ProgressReporter(redis_client, "job-1", interval=3600)
+    pipeline = redis_client.pipeline
+    in_flight = threading.Event()
+
+    def slow_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        def slow_execute():
+            if not in_flight.is_set():
+                in_flight.set()
+                time.sleep(0.2)
+            return execute()
+
+        pipe.execute = slow_execute
+        return pipe
+
+    with patch.object(redis_client, "pipeline", slow_pipeline):
+        writer = threading.Thread(target=reporter.update, kwargs={"progress": 90, "force": True})
+        writer.start()
+        in_flight.wait(5)
+        reporter.finish("completed", progress=100)
+        writer.join(5)
+
+    events = [fields["event"] for _, fields in redis_client.xrange(events_key("job-1"))]
+    assert events == ["progress", "status"]
+    assert redis_client.hgetall("job:job-1") == {"status": "completed", "progress": "100"}
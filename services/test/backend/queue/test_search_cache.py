@@ -0,0 +1,70 @@
+import pytest
+
+from app.queue.search_cache import SearchCache, search_key
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def search_cache(redis_client):
+    return SearchCache(redis_client, ttl=60)
+
+
+def test_search_key_normalizes_title():
+    """Test searches differing only in case and spacing share a key"""
+    assert search_key("RemoteOK", "  DevOps   Engineer ", 3) == search_key("remoteok", "devops engineer", 3)
+    assert search_key("remoteok", "devops engineer", 3) != search_key("remoteok", "devops engineer", 5)
+
+
+def test_identical_searches_share_a_job(redis_client, search_cache):
+    """Test the first search registers its job and later ones attach to it"""
+    key = search_key("remoteok", "devops", 3)
+
+    assert search_cache.claim(key, "job-1") is None
+    # Not queued yet: the job hash does not exist, so it counts as running
+    assert search_cache.claim(key, "job-2") == "job-1"
+
+    redis_client.hset("job:job-1", "status", "completed")
+    assert search_cache.claim(key, "job-3") == "job-1"
+    assert 0 < redis_client.ttl(key) <= 60
+
+
+def test_failed_job_is_not_reused(redis_client, search_cache):
+    """Test a failed job is replaced by the next identical search"""
+    key = search_key("remoteok", "devops", 3)
+    search_cache.claim(key, "job-1")
+    redis_client.hset("job:job-1", "status", "failed")
+
+    assert search_cache.claim(key, "job-2") is None
+    assert redis_client.get(key) == "job-2"
+
+
+def test_force_refresh_replaces_the_job(redis_client, search_cache):
+    """Test a forced search starts a new job that later searches attach to"""
+    key = search_key("remoteok", "devops", 3)
+    search_cache.claim(key, "job-1")
+
+    assert search_cache.claim(key, "job-2", force=True) is None
+    assert search_cache.claim(key, "job-3") == "job-2"
+
+
+def test_release_and_refresh_only_touch_own_job(redis_client, search_cache):
+    """Test an older job cannot drop or extend a key now held by a newer one"""
+    key = search_key("remoteok", "devops", 3)
+    search_cache.claim(key, "job-2")
+    redis_client.expire(key, 5)
+
+    search_cache.completed(key, "job-1")
+    assert redis_client.ttl(key) <= 5
+    search_cache.release(key, "job-1")
+    assert redis_client.get(key) == "job-2"
+
+    search_cache.completed(key, "job-2")
+    assert redis_client.ttl(key) > 5
+    search_cache.release(key, "job-2")
+    assert redis_client.get(key) is None
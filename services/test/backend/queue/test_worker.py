@@ -0,0 +1,82 @@
+import importlib
+import json
+import sys
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock, patch
+
+pytest.importorskip("fakeredis")
+pytest.importorskip("mongomock")
+
+from app.db.listings import job_results
+from app.queue.job_queue import QueuedJob
+from app.queue.search_cache import search_key
+
+
+@pytest.fixture(scope="module")
+def worker(api):
+    """Import the worker on the in-memory stores of the API"""
+    sys.modules.pop("app.worker", None)
+    yield importlib.import_module("app.worker")
+    sys.modules.pop("app.worker", None)
+
+
+class SearchBoard:
+    """Board returning fixed search results and recording which listings it processed"""
+
+    board_name = 'remoteok'
+    base_url = 'https://remoteok.com'
+
+    def __init__(self, listings):
+        self.listings = listings
+        self.processed = []
+        self.request_filter = MagicMock()
+        self.scrape_stats = {}
+
+    async def get_job_listings(self, playwright):
+        return [dict(job) for job in self.listings]
+
+    async def process_job(self, job, playwright):
+        self.processed.append(job['job_id'])
+        return {**job, 'parsed_description': {'title': job['position']}}
+
+    async def close(self):
+        pass
+
+
+@asynccontextmanager
+async def fake_playwright():
+    yield MagicMock()
+
+
+@pytest.mark.asyncio
+async def test_listings_lost_on_a_failed_write_are_analyzed_again(api, worker):
+    """Test a job whose listings were not stored leaves them unseen, so the next search processes them"""
+    board = SearchBoard([{'job_id': 'L1', 'position': 'SRE'}])
+    failing = MagicMock()
+    failing.bulk_write.side_effect = ConnectionError("MongoDB is down")
+
+    with patch.object(worker, 'load_board_class', return_value=lambda title: board), \
+            patch('job_boards.pipeline.async_playwright', fake_playwright):
+        with patch.object(worker.listing_writer, 'listings', failing):
+            await worker.process_job('job-1', 'remoteok', 'SRE', 10)
+        assert api.redis_client.hget('job:job-1', 'status') == 'failed'
+
+        await worker.process_job('job-2', 'remoteok', 'SRE', 10)
+
+    assert board.processed == ['L1', 'L1']
+    assert api.redis_client.hget('job:job-2', 'status') == 'completed'
+    assert [result['job_data']['parsed_description'] for result in job_results(api.db, 'job-2')] == [{'title': 'SRE'}]
+
+
+@pytest.mark.asyncio
+async def test_message_with_invalid_limit_fails_the_job(api, worker):
+    """Test a malformed message fails its job and frees the search instead of being redelivered"""
+    key = search_key('remoteok', 'SRE', 'lots')
+    worker.search_cache.claim(key, 'job-3')
+    job = QueuedJob(json.dumps({'job_id': 'job-3', 'board': 'remoteok', 'title': 'SRE', 'limit': 'lots', 'search_key': key}))
+
+    await worker.handle(job)
+
+    assert api.redis_client.hget('job:job-3', 'status') == 'failed'
+    assert worker.search_cache.claim(key, 'job-4') is None
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import random
+import re
+from collections import Counter
+from aiohttp import web
+
+# Skills the fake analysis picks out of descriptions
+SKILLS = (
+    "aws", "azure", "gcp", "kubernetes", "terraform", "helm", "argocd", "docker", "linux",
+    "python", "go", "rust", "bash", "prometheus", "observability", "vault", "jenkins", "ci/cd"
+)
+
+LISTING_HEADER = re.compile(r"^### Listing (\S+)$", re.MULTILINE)
+SINGLE_DESCRIPTION = re.compile(r"Here's the job description:\n(.*)\n\nReturn a JSON object", re.DOTALL)
+
+# Characters per streamed delta; about four tokens
+CHUNK_SIZE = 16
+
+
+def fake_analysis(text):
+    """A small, deterministic analysis of a description."""
+    lowered = text.lower()
+    return {
+        "summary": text.strip().split("\n", 1)[0][:160],
+        "skills": [skill for skill in SKILLS if re.search(rf"(?<![\w/]){re.escape(skill)}(?![\w/])", lowered)],
+        "remote": "remote" in lowered,
+        "description_length": len(text)
+    }
+
+
+def completion_for(prompt):
+    """The content the fake model answers a single or batched analysis prompt with."""
+    headers = list(LISTING_HEADER.finditer(prompt))
+    if headers:
+        entries = []
+        for header, following in zip(headers, headers[1:] + [None]):
+            text = prompt[header.end():following.start() if following else len(prompt)]
+            text = text.split("\n\nReturn a JSON array", 1)[0]
+            entries.append({"listing_id": header.group(1), "analysis": fake_analysis(text)})
+        return json.dumps(entries)
+
+    match = SINGLE_DESCRIPTION.search(prompt)
+    return json.dumps(fake_analysis(match.group(1) if match else prompt))
+
+
+class FakeGroq:
+    """Local stand-in for Groq's chat-completions endpoint.
+
+    Answers analysis prompts with a deterministic JSON analysis after
+    ``latency`` seconds (varied by up to ``jitter`` of it) and, when
+    ``tokens_per_second`` is set, generates the completion at that rate,
+    streamed or not. Jitter is drawn from a seeded generator so runs
+    with the same settings see the same delays.
+    """
+
+    def __init__(self, latency=0.2, tokens_per_second=0, jitter=0.0, seed=0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.jitter = jitter
+        self.stats = Counter()
+        self.url = None
+        self._random = random.Random(seed)
+        self._runner = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        app = web.Application()
+        app.router.add_post("/openai/v1/chat/completions", self.chat_completions)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}/openai/v1/chat/completions"
+        return self.url
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _first_token_delay(self):
+        return max(0.0, self.latency * (1 + self._random.uniform(-self.jitter, self.jitter)))
+
+    def _generation_time(self, content):
+        return len(content) / 4 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    async def chat_completions(self, request):
+        body = await request.json()
+        prompt = "\n".join(message.get("content") or "" for message in body.get("messages", []))
+        content = completion_for(prompt)
+        self.stats["requests"] += 1
+        self.stats["batched_listings"] += len(LISTING_HEADER.findall(prompt)) or 1
+
+        await asyncio.sleep(self._first_token_delay())
+        if body.get("stream"):
+            return await self._stream(request, content)
+
+        await asyncio.sleep(self._generation_time(content))
+        return web.json_response({
+            "choices": [{"message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+        })
+
+    async def _stream(self, request, content):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        delay = self._generation_time(content[:CHUNK_SIZE])
+        try:
+            for start in range(0, len(content), CHUNK_SIZE):
+                event = {"choices": [{"delta": {"content": content[start:start + CHUNK_SIZE]}, "finish_reason": None}]}
+                await response.write(f"data: {json.dumps(event)}\n\n".encode())
+                if delay:
+                    await asyncio.sleep(delay)
+            await response.write(b'data: {"choices": [{"delta": {}, "finish_reason": "stop"}]}\n\n')
+            await response.write(b"data: [DONE]\n\n")
+        except (ConnectionResetError, RuntimeError):
+            # The client stopped reading once it had the whole object
+            self.stats["stopped_early"] += 1
+        return response
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from string import Template
+from aiohttp import web
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Search and detail page paths of each board, served below /<board>
+BOARD_ROUTES = {
+    "remoteok": (re.compile(r"/remote-[\w-]+-jobs"), re.compile(r"/remote-jobs/(?P<job_id>\w+)")),
+    "weworkremotely": (re.compile(r"/remote-jobs/search"), re.compile(r"/remote-jobs/(?P<job_id>\w+)")),
+    "wellfound": (re.compile(r"/jobs"), re.compile(r"/jobs/(?P<job_id>\w+)")),
+}
+
+# Listing ids are numbered from here so every board can use them as-is
+FIRST_JOB_ID = 100001
+
+
+def load_listings():
+    with open(FIXTURES_DIR / "listings.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def listing_fields(index, listings):
+    """Template fields of the listing at ``index``, cycling through the recorded listings."""
+    listing = listings[index % len(listings)]
+    job_id = str(FIRST_JOB_ID + index)
+    return {
+        **listing,
+        "job_id": job_id,
+        "slug": re.sub(r"[^a-z0-9]+", "-", listing["position"].lower()).strip("-"),
+        "day": f"{index % 28 + 1:02d}",
+        "tags": "".join(f'<span class="tag">{tag}</span>' for tag in listing["tags"]),
+        "tag_list": ", ".join(listing["tags"]),
+        "summary": f"We are a remote-first team of {20 + index % 7 * 15} people hiring for listing {job_id}.",
+        "views": f"{1000 + index * 37:,}",
+        "applicants": str(40 + index % 60),
+        "apply_percentage": str(2 + index % 9),
+    }
+
+
+class BoardFixtures:
+    """Renders a board's recorded search and detail pages for a number of listings.
+
+    The recorded pages are split into a page shell, a listing row and a
+    detail page so the listing count can vary; every listing gets its own
+    id and description, so analyses are never shared through the cache.
+    """
+
+    def __init__(self, board, listings=20):
+        self.board = board
+        self.listings = listings
+        board_dir = FIXTURES_DIR / board
+        self.search_template = Template((board_dir / "search.html").read_text(encoding="utf-8"))
+        self.listing_template = Template((board_dir / "listing.html").read_text(encoding="utf-8"))
+        self.detail_template = Template((board_dir / "detail.html").read_text(encoding="utf-8"))
+        recorded = load_listings()
+        self.fields = {
+            fields["job_id"]: fields
+            for fields in (listing_fields(i, recorded) for i in range(listings))
+        }
+
+    def search_page(self, title="DevOps Engineer"):
+        rows = "".join(self.listing_template.substitute(fields) for fields in self.fields.values())
+        return self.search_template.substitute(title=title, listings=rows)
+
+    def detail_page(self, job_id):
+        """The listing's detail page, or None if there is no such listing."""
+        fields = self.fields.get(job_id)
+        return self.detail_template.substitute(fields) if fields else None
+
+
+class FixtureServer:
+    """Serves every board's fixtures from one local HTTP server.
+
+    A board is pointed at it with BOARD_BASE_URL_<BOARD>=``base_url(board)``.
+    ``latency`` seconds are added to every page to stand in for the network.
+    """
+
+    def __init__(self, listings=20, latency=0.0, boards=tuple(BOARD_ROUTES)):
+        self.latency = latency
+        self.boards = {board: BoardFixtures(board, listings) for board in boards}
+        self.requests = Counter()
+        self.url = None
+        self._runner = None
+
+    def base_url(self, board):
+        return f"{self.url}/{board}"
+
+    async def start(self, host="127.0.0.1", port=0):
+        app = web.Application()
+        app.router.add_get("/{board}{path:.*}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def handle(self, request):
+        board = request.match_info["board"]
+        path = request.match_info["path"]
+        fixtures = self.boards.get(board)
+        if fixtures is None:
+            raise web.HTTPNotFound()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        search_path, detail_path = BOARD_ROUTES[board]
+        if search_path.fullmatch(path):
+            self.requests[(board, "search")] += 1
+            title = request.query.get("term") or request.query.get("query") or "DevOps Engineer"
+            return web.Response(text=fixtures.search_page(title), content_type="text/html")
+
+        match = detail_path.fullmatch(path)
+        page = fixtures.detail_page(match["job_id"]) if match else None
+        if page is None:
+            # Assets referenced by the recorded pages are not recorded
+            self.requests[(board, "missing")] += 1
+            raise web.HTTPNotFound()
+        self.requests[(board, "detail")] += 1
+        return web.Response(text=page, content_type="text/html")
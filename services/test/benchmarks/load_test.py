@@ -0,0 +1,468 @@
+"""Load test of the jobs API: POST /api/jobs, GET /api/jobs/<id> and GET /api/jobs.
+
+By default the API is started in a child process on in-memory Redis and
+MongoDB (fakeredis and mongomock), seeded with a job history of the
+requested size, and served with Werkzeug's threaded server. Requests are
+sent open-loop at a fixed rate, so a slow server shows up as latency
+instead of as a lower request rate, and each endpoint's throughput, status
+codes and latency percentiles are written to a JSON report:
+
+    python benchmarks/load_test.py --jobs 1000 --rps 20 --output reports/load-main.json
+    python benchmarks/load_test.py --jobs 1000 --rps 20 --compare reports/load-main.json
+
+mongomock has no indexes and scans the collection on every query, so
+in-memory runs are for comparing commits at small histories. For sizing
+(10k-1M jobs at 500 rps) load a deployment instead (gunicorn, real Redis
+and MongoDB): seed its stores once and point the load test at it; the
+same --seed gives the same job ids:
+
+    python benchmarks/load_test.py --seed-only --real-stores --jobs 1000000
+    python benchmarks/load_test.py --url http://localhost:5000 --jobs 1000000 --rps 500
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import aiohttp
+
+from fake_groq import fake_analysis
+from fixture_server import load_listings, listing_fields
+from run_benchmarks import BACKEND_DIR, BENCHMARKS_DIR, git_revision
+from scenario import percentile, use_fake_stores
+
+ENDPOINTS = {
+    "create": "POST /api/jobs",
+    "status": "GET /api/jobs/<id>",
+    "list": "GET /api/jobs",
+}
+
+BOARDS = ("remoteok", "weworkremotely", "wellfound")
+TITLES = (
+    "DevOps Engineer", "Site Reliability Engineer", "Platform Engineer", "Backend Engineer",
+    "Data Engineer", "Frontend Engineer", "Full Stack Engineer", "Machine Learning Engineer",
+    "Security Engineer", "Cloud Architect", "Engineering Manager", "Product Designer",
+)
+
+# Share of seeded jobs in each state; most history is finished work
+STATUS_MIX = (("completed", 0.8), ("failed", 0.1), ("processing", 0.05), ("pending", 0.05))
+
+# Settings of the served API; the queue is never drained, so its limit would turn most POSTs into 429s
+SERVER_ENV = {
+    "JOB_QUEUE_MAX_DEPTH": "100000000",
+    "METRICS_ENABLED": "true",
+    "TRACE_EXPORTER": "",
+}
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def seeded_job_ids(count, seed=0):
+    """The ids of a seeded history; the same seed always gives the same ids."""
+    rng = random.Random(seed)
+    return [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(count)]
+
+
+def seeded_listing(index, board, recorded):
+    """A processed listing as the worker stores it, built from the benchmark fixtures."""
+    fields = listing_fields(index, recorded)
+    description = f"{fields['position']} at {fields['company']}. {fields['summary']} Skills: {fields['tag_list']}."
+    return {
+        "job_id": fields["job_id"],
+        "position": fields["position"],
+        "company": fields["company"],
+        "location": fields["location"],
+        "salary": fields["salary"],
+        "tags": list(recorded[index % len(recorded)]["tags"]),
+        "job_url": f"https://{board}.example/jobs/{fields['job_id']}",
+        "posted": f"2024-03-{fields['day']}",
+        "views": fields["views"],
+        "applicants": fields["applicants"],
+        "parsed_description": fake_analysis(description),
+    }
+
+
+def seed_history(redis_client, db, job_ids, results_per_job=3, history_days=7, seed=0, batch_size=1000):
+    """Write a job history: job hashes and the job index in Redis, results in MongoDB.
+
+    Jobs are spread over the last ``history_days`` days. Completed jobs
+    get ``results_per_job`` listings; searches are repeated, so listings
+    are shared between jobs like re-scraped listings are. Returns the
+    number of jobs per status.
+    """
+    from app.db.mongodb import ensure_indexes
+    from app.queue.job_index import JOB_INDEX_KEY
+    from app.queue.search_cache import search_key
+
+    rng = random.Random(seed)
+    recorded = load_listings()
+    statuses = [status for status, _ in STATUS_MIX]
+    weights = [weight for _, weight in STATUS_MIX]
+    now = time.time()
+    listing_pool = max(100, len(job_ids) * results_per_job // 4)
+    listings = {}
+    links = []
+    counts = Counter()
+
+    for start in range(0, len(job_ids), batch_size):
+        pipe = redis_client.pipeline(transaction=False)
+        scores = {}
+        for job_id in job_ids[start:start + batch_size]:
+            board = rng.choice(BOARDS)
+            title = rng.choice(TITLES)
+            limit = rng.choice((3, 5, 10))
+            status = rng.choices(statuses, weights)[0]
+            created = now - rng.random() * history_days * 86400
+            job = {
+                "board": board,
+                "title": title,
+                "limit": limit,
+                "search_key": search_key(board, title, limit),
+                "status": status,
+                "created_at": datetime.utcfromtimestamp(created).isoformat(),
+                "progress": 100 if status == "completed" else rng.choice((0, 33.3, 66.7)),
+                "attempts": 1
+            }
+            if status == "failed":
+                job["error"] = "Gave up after 3 attempts"
+            pipe.hset(f"job:{job_id}", mapping=job)
+            scores[job_id] = created
+            counts[status] += 1
+
+            if status == "completed":
+                for rank, index in enumerate(rng.sample(range(listing_pool), results_per_job)):
+                    doc = listings.get((board, index))
+                    if doc is None:
+                        doc = listings[(board, index)] = {
+                            "board": board,
+                            "listing_id": str(100001 + index),
+                            "data": seeded_listing(index, board, recorded),
+                            "created_at": datetime.utcfromtimestamp(created)
+                        }
+                    doc["updated_at"] = max(doc["created_at"], datetime.utcfromtimestamp(created))
+                    links.append({"job_id": job_id, "board": board, "listing_id": doc["listing_id"], "rank": rank})
+        pipe.zadd(JOB_INDEX_KEY, scores)
+        pipe.execute()
+
+    # Into an empty collection, load first and build the indexes after; in
+    # mongomock every insert otherwise scans the collection for duplicates
+    bulk_load = db.listings.count_documents({}, limit=1) == 0 and db.job_listings.count_documents({}, limit=1) == 0
+    if bulk_load:
+        db.listings.drop_indexes()
+        db.job_listings.drop_indexes()
+    for collection, docs in ((db.listings, list(listings.values())), (db.job_listings, links)):
+        for start in range(0, len(docs), batch_size):
+            collection.insert_many(docs[start:start + batch_size], ordered=False)
+    if bulk_load:
+        ensure_indexes(db)
+    return counts
+
+
+def parse_mix(value):
+    """Parse create=1,status=6,list=3 into normalized endpoint weights."""
+    weights = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {name!r}; use {', '.join(ENDPOINTS)}")
+        weights[name.strip()] = float(weight)
+    total = sum(weights.values())
+    if total <= 0:
+        raise argparse.ArgumentTypeError("The mix needs a positive weight")
+    return {name: weight / total for name, weight in weights.items()}
+
+
+class LoadGenerator:
+    """Sends a mix of API requests at a fixed rate and records each one's latency and status.
+
+    Latency is measured from when a request was due, not when it was
+    sent, so requests held up behind a slow server count as slow.
+    """
+
+    def __init__(self, url, job_ids, mix, seed=0, connections=200, timeout=30):
+        self.url = url.rstrip("/")
+        self.job_ids = job_ids
+        self.mix = mix
+        self.connections = connections
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.samples = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.created = []
+        self._rng = random.Random(seed)
+
+    def _request(self):
+        """Pick the next request as (endpoint, method, path, params, body)."""
+        endpoint = self._rng.choices(list(self.mix), list(self.mix.values()))[0]
+        if endpoint == "create":
+            body = {"board": self._rng.choice(BOARDS), "title": self._rng.choice(TITLES),
+                    "limit": self._rng.choice((3, 5, 10))}
+            return endpoint, "POST", "/api/jobs", None, body
+        if endpoint == "status":
+            # Mostly history, sometimes a job created during the run
+            pool = self.created if self.created and self._rng.random() < 0.1 else self.job_ids
+            return endpoint, "GET", f"/api/jobs/{self._rng.choice(pool)}", None, None
+        # Mostly the first page, sometimes a later one
+        params = {"after": self._rng.choice(self.job_ids)} if self.job_ids and self._rng.random() < 0.3 else None
+        return endpoint, "GET", "/api/jobs", params, None
+
+    async def _send(self, session, due, recording, endpoint, method, path, params, body):
+        try:
+            async with session.request(method, self.url + path, params=params, json=body) as response:
+                payload = await response.read()
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            status, payload = type(e).__name__, b""
+        latency = (time.perf_counter() - due) * 1000
+        if endpoint == "create" and status == 200:
+            job_id = json.loads(payload).get("job_id")
+            if job_id:
+                self.created.append(job_id)
+        if recording:
+            self.samples[endpoint].append(latency)
+            self.statuses[endpoint][str(status)] += 1
+
+    async def run(self, rps, duration, warmup=0.0):
+        """Send requests for warmup + duration seconds; only the last ``duration`` are recorded."""
+        connector = aiohttp.TCPConnector(limit=self.connections)
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout) as session:
+            tasks = set()
+            start = time.perf_counter()
+            end = start + warmup + duration
+            sent = 0
+            while True:
+                due = start + sent / rps
+                if due >= end:
+                    break
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                task = asyncio.create_task(self._send(session, due, due >= start + warmup, *self._request()))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                sent += 1
+            if tasks:
+                await asyncio.wait(tasks)
+            # Requests still running at the end stretch the window they are counted in
+            return max(duration, time.perf_counter() - start - warmup)
+
+    def report(self, elapsed):
+        endpoints = {}
+        for endpoint, name in ENDPOINTS.items():
+            samples = self.samples.get(endpoint, [])
+            if not samples:
+                continue
+            statuses = self.statuses[endpoint]
+            ok = sum(count for status, count in statuses.items() if status.isdigit() and int(status) < 400)
+            endpoints[name] = {
+                "requests": len(samples),
+                "throughput_rps": round(len(samples) / elapsed, 1),
+                "ok_rps": round(ok / elapsed, 1),
+                "error_rate": round(1 - ok / len(samples), 4),
+                "status": dict(statuses),
+                "latency_ms": {
+                    **{f"p{p}": round(percentile(samples, p), 2) for p in PERCENTILES},
+                    "max": round(max(samples), 2)
+                }
+            }
+        return endpoints
+
+
+def compare(baseline, report, threshold=10.0):
+    """Rows of (endpoint, metric, baseline, current, change in %, regressed) for endpoints in both reports."""
+    rows = []
+    for name, current in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        for metric, old, new, higher_is_better in (
+            ("ok_rps", before["ok_rps"], current["ok_rps"], True),
+            ("p95_ms", before["latency_ms"]["p95"], current["latency_ms"]["p95"], False),
+            ("p99_ms", before["latency_ms"]["p99"], current["latency_ms"]["p99"], False),
+        ):
+            change = (new - old) / old * 100 if old else 0.0
+            regressed = (change < -threshold) if higher_is_better else (change > threshold)
+            rows.append((name, metric, old, new, change, regressed))
+    return rows
+
+
+def print_report(report):
+    print(f"\n{'endpoint':<22}{'requests':>10}{'ok rps':>10}{'errors':>9}" + "".join(f"{'p' + str(p) + ' ms':>11}" for p in PERCENTILES))
+    for name, stats in report["endpoints"].items():
+        latency = stats["latency_ms"]
+        print(f"{name:<22}{stats['requests']:>10}{stats['ok_rps']:>10}{stats['error_rate']:>9.1%}"
+              + "".join(f"{latency[f'p{p}']:>11}" for p in PERCENTILES))
+
+
+def server_process(args, stdout=None):
+    """Start this script in API mode in a child process, with the backend importable."""
+    command = [
+        sys.executable, str(BENCHMARKS_DIR / "load_test.py"), "--serve",
+        "--jobs", str(args.jobs), "--results-per-job", str(args.results_per_job),
+        "--history-days", str(args.history_days), "--seed", str(args.seed)
+    ]
+    if not args.fake_stores:
+        command.append("--real-stores")
+    if args.server != "flask":
+        command += ["--server", args.server]
+    if args.seed_only:
+        command.append("--seed-only")
+    env = {
+        **os.environ,
+        **SERVER_ENV,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(BACKEND_DIR), os.environ.get("PYTHONPATH")])),
+        "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "load-test")
+    }
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=stdout, text=True)
+
+
+def start_server(args):
+    """Start the API with a seeded history in a child process and return (process, url)."""
+    process = server_process(args, stdout=subprocess.PIPE)
+    # The child prints progress while seeding and READY <port> once it serves
+    for line in process.stdout:
+        if line.startswith("READY "):
+            return process, f"http://127.0.0.1:{line.split()[1]}"
+        print(line, end="")
+    raise RuntimeError(f"API server exited with {process.wait()} before it was ready")
+
+
+def serve(args):
+    """Child process: seed the stores and serve the API until killed."""
+    if args.fake_stores:
+        use_fake_stores()
+    from werkzeug.serving import make_server
+    from app import main as api
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    seed_stores(api, args)
+    if args.seed_only:
+        return
+    if args.server == "aiohttp":
+        asyncio.run(serve_async(api, args.port))
+        return
+    server = make_server("127.0.0.1", args.port, api.app, threaded=True)
+    print(f"READY {server.server_port}", flush=True)
+    server.serve_forever()
+
+
+async def serve_async(api, port):
+    """Serve app/async_main.py on the stores app/main.py was seeded through."""
+    import redis.asyncio
+    from aiohttp import web
+    from app import async_main
+
+    redis_client = redis.asyncio.Redis(host=async_main.REDIS_HOST, port=async_main.REDIS_PORT, decode_responses=True)
+    runner = web.AppRunner(async_main.build_app(redis_client, api.db), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    print(f"READY {site._server.sockets[0].getsockname()[1]}", flush=True)
+    await asyncio.Event().wait()
+
+
+def seed_stores(api, args):
+    if not args.jobs:
+        return
+    start = time.perf_counter()
+    print(f"Seeding {args.jobs} jobs", flush=True)
+    counts = seed_history(
+        api.redis_client, api.db, seeded_job_ids(args.jobs, args.seed),
+        results_per_job=args.results_per_job, history_days=args.history_days, seed=args.seed
+    )
+    print(f"Seeded {dict(counts)} in {time.perf_counter() - start:.1f}s", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the jobs API')
+    parser.add_argument('--url', help='API to load instead of starting one, e.g. http://localhost:5000')
+    parser.add_argument('--jobs', type=int, default=10000, help='Jobs in the seeded history')
+    parser.add_argument('--results-per-job', type=int, default=3, help='Listings stored per completed job')
+    parser.add_argument('--history-days', type=float, default=7,
+                        help='Days the seeded jobs are spread over (finished jobs expire after JOB_RESULT_TTL)')
+    parser.add_argument('--rps', type=float, default=500, help='Requests per second, across all endpoints')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of recorded load')
+    parser.add_argument('--warmup', type=float, default=5, help='Seconds of unrecorded load first')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix("create=1,status=6,list=3"),
+                        help='Relative share of each endpoint, e.g. create=1,status=6,list=3')
+    parser.add_argument('--connections', type=int, default=200, help='Maximum open connections')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--real-stores', dest='fake_stores', action='store_false',
+                        help='Seed and serve from REDIS_HOST and MONGODB_URI instead of in-memory stores')
+    parser.add_argument('--server', choices=['flask', 'aiohttp'], default='flask',
+                        help='Serve app/main.py with Werkzeug or app/async_main.py with aiohttp')
+    parser.add_argument('--seed-only', action='store_true', help='Only seed the stores')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument('--output', default='reports/load_test.json')
+    parser.add_argument('--compare', metavar='REPORT', help='Earlier report; exit with 1 on a regression')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Percent by which throughput may drop or p95/p99 grow before it counts as a regression')
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args)
+        return 0
+    if args.seed_only:
+        return server_process(args).wait()
+
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else None
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_server(args)
+    try:
+        generator = LoadGenerator(url, seeded_job_ids(args.jobs, args.seed), args.mix,
+                                  seed=args.seed, connections=args.connections)
+        print(f"Sending {args.rps:g} requests/s to {url} for {args.warmup:g}s + {args.duration:g}s")
+        elapsed = asyncio.run(generator.run(args.rps, args.duration, args.warmup))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    report = {
+        "commit": git_revision(),
+        "created_at": datetime.now().astimezone().isoformat(),
+        "target": args.url or "local",
+        "config": {
+            "jobs": args.jobs,
+            "results_per_job": args.results_per_job,
+            "history_days": args.history_days,
+            "rps": args.rps,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "mix": args.mix,
+            "connections": args.connections,
+            "seed": args.seed,
+            "stores": "fake" if args.fake_stores and not args.url else "real",
+            "server": None if args.url else args.server
+        },
+        "elapsed": round(elapsed, 2),
+        "endpoints": generator.report(elapsed)
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print_report(report)
+    print(f"\nReport written to {output}")
+
+    if baseline is None:
+        return 0
+    rows = compare(baseline, report, args.threshold)
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    for name, metric, old, new, change, regressed in rows:
+        print(f"{name:<22}{metric:<8}{old:>10} -> {new:<10}{change:>+8.1f}%  {'REGRESSION' if regressed else ''}")
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""End-to-end benchmarks of the scraping pipeline against recorded pages and a fake Groq.
+
+Each scenario scrapes one board through the command-line path (run_search
+in-process) or the worker path (POST /api/jobs, queue, worker, MongoDB) in
+a process of its own. The JSON report can be compared with one from
+another commit:
+
+    python benchmarks/run_benchmarks.py --output reports/benchmark.json
+    python benchmarks/run_benchmarks.py --compare reports/benchmark.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from fake_groq import FakeGroq
+from fixture_server import BOARD_ROUTES, FixtureServer
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCHMARKS_DIR.parents[1] / "backend"
+
+# Settings every scenario runs with unless overridden with --env; the real
+# politeness delay and Groq rate limits would make the benchmark measure them
+DEFAULT_ENV = {
+    "SCRAPE_POLITENESS_DELAY": "0",
+    "GROQ_REQUESTS_PER_MINUTE": "100000",
+    "GROQ_TOKENS_PER_MINUTE": "100000000",
+    "METRICS_ENABLED": "true",
+    "TRACE_EXPORTER": "",
+}
+
+# Headline numbers compared between reports; True when higher is better
+COMPARED_METRICS = {
+    "listings_per_second": True,
+    "latency_p50_ms": False,
+    "latency_p95_ms": False,
+    "peak_rss_mb": False,
+    "peak_browsers": False,
+}
+
+
+def git_revision():
+    """Commit the benchmarked tree is at, marked -dirty with uncommitted changes."""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARKS_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=BENCHMARKS_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{revision}-dirty" if dirty else revision
+
+
+def summarize(runs):
+    """Headline numbers of a scenario: medians over its successful runs, maxima for resources."""
+    ok = [run for run in runs if run.get("status") == "ok"]
+    if not ok:
+        return {"status": "error", "error": runs[-1].get("error") if runs else "not run"}
+
+    def median(values):
+        values = [v for v in values if v is not None]
+        return round(statistics.median(values), 3) if values else None
+
+    return {
+        "status": "ok" if len(ok) == len(runs) else "partial",
+        "listings_per_second": median(run["listings_per_second"] for run in ok),
+        "latency_p50_ms": median(run["latency_ms"]["p50"] for run in ok),
+        "latency_p95_ms": median(run["latency_ms"]["p95"] for run in ok),
+        "peak_rss_mb": max(run["peak_rss_mb"] for run in ok),
+        "peak_browsers": max(run["peak_browsers"] for run in ok),
+    }
+
+
+def compare(baseline, report, threshold=5.0):
+    """Rows of (scenario, metric, baseline, current, change in %, better) for scenarios in both reports.
+
+    ``better`` is None for changes within ``threshold`` percent, which are
+    usually run-to-run noise.
+    """
+    rows = []
+    for name, scenario in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or before["summary"]["status"] == "error" or scenario["summary"]["status"] == "error":
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = before["summary"].get(metric), scenario["summary"].get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else None
+            noise = abs(change) < threshold if change is not None else new == old
+            better = None if noise else (new > old) == higher_is_better
+            rows.append((name, metric, old, new, change, better))
+    return rows
+
+
+def print_summary(report):
+    print(f"\n{'scenario':<28}{'listings/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'RSS MB':>10}{'browsers':>10}")
+    for name, scenario in report["scenarios"].items():
+        summary = scenario["summary"]
+        if summary["status"] == "error":
+            print(f"{name:<28}  error: {summary['error']}")
+            continue
+        values = [summary[m] for m in COMPARED_METRICS]
+        print(f"{name:<28}" + "".join(f"{'-' if v is None else v:>{w}}" for v, w in zip(values, (12, 10, 10, 10, 10))))
+
+
+def print_comparison(rows, baseline):
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    for name, metric, old, new, change, better in rows:
+        verdict = "~" if better is None else ("better" if better else "worse")
+        delta = f"{change:+.1f}%" if change is not None else "n/a"
+        print(f"{name:<28}{metric:<22}{old:>10} -> {new:<10}{delta:>9}  {verdict}")
+
+
+async def run_scenario(path, board, args, env):
+    """Run one scenario in a child process and return its result."""
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as tmp:
+        result_path = Path(tmp) / "result.json"
+        command = [
+            sys.executable, str(BENCHMARKS_DIR / "scenario.py"),
+            "--path", path, "--board", board, "--title", args.title,
+            "--limit", str(args.listings), "--result", str(result_path)
+        ]
+        if args.fake_stores:
+            command.append("--fake-stores")
+        # The pipeline prints every listing; keep it out of the summary unless asked for
+        output = None if args.verbose else asyncio.subprocess.DEVNULL
+        process = await asyncio.create_subprocess_exec(
+            *command, cwd=BACKEND_DIR, stdout=output, stderr=output,
+            env={**env, "ARTIFACTS_DIR": str(Path(tmp) / "artifacts")}
+        )
+        await process.wait()
+        if not result_path.exists():
+            return {"status": "error", "error": f"Scenario exited with {process.returncode}"}
+        return json.loads(result_path.read_text(encoding="utf-8"))
+
+
+async def run(args):
+    fixtures = FixtureServer(listings=args.listings, latency=args.page_latency, boards=args.boards)
+    groq = FakeGroq(
+        latency=args.groq_latency, tokens_per_second=args.groq_tokens_per_second,
+        jitter=args.groq_jitter, seed=args.seed
+    )
+    await fixtures.start()
+    await groq.start()
+
+    settings = {**DEFAULT_ENV, **dict(item.split("=", 1) for item in args.env)}
+    env = {
+        **os.environ,
+        **settings,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(BACKEND_DIR), os.environ.get("PYTHONPATH")])),
+        "GROQ_API_KEY": "benchmark",
+        "GROQ_API_URL": groq.url,
+        **{f"BOARD_BASE_URL_{board.upper()}": fixtures.base_url(board) for board in args.boards}
+    }
+
+    scenarios = {}
+    try:
+        for path in args.paths:
+            for board in args.boards:
+                name = f"{path}/{board}"
+                runs = []
+                for i in range(args.repeat):
+                    print(f"Running {name} ({i + 1}/{args.repeat})")
+                    runs.append(await run_scenario(path, board, args, env))
+                scenarios[name] = {"path": path, "board": board, "summary": summarize(runs), "runs": runs}
+    finally:
+        await groq.close()
+        await fixtures.close()
+
+    return {
+        "commit": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "listings": args.listings,
+            "repeat": args.repeat,
+            "title": args.title,
+            "page_latency": args.page_latency,
+            "groq_latency": args.groq_latency,
+            "groq_tokens_per_second": args.groq_tokens_per_second,
+            "groq_jitter": args.groq_jitter,
+            "seed": args.seed,
+            "fake_stores": args.fake_stores,
+            "env": settings
+        },
+        "groq": dict(groq.stats),
+        "scenarios": scenarios
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the scraping pipeline offline')
+    parser.add_argument('--boards', nargs='+', choices=list(BOARD_ROUTES), default=list(BOARD_ROUTES))
+    parser.add_argument('--paths', nargs='+', choices=['cli', 'worker'], default=['cli', 'worker'])
+    parser.add_argument('--listings', type=int, default=20,
+                        help='Listings on each search page; all of them are processed')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per scenario; the report keeps the median')
+    parser.add_argument('--title', default='DevOps Engineer')
+    parser.add_argument('--page-latency', type=float, default=0.05,
+                        help='Seconds added to every page the fixture server returns')
+    parser.add_argument('--groq-latency', type=float, default=0.3,
+                        help='Seconds before the fake Groq answers')
+    parser.add_argument('--groq-tokens-per-second', type=float, default=1000,
+                        help='Completion tokens the fake Groq generates per second (0 for instant)')
+    parser.add_argument('--groq-jitter', type=float, default=0.2,
+                        help='Fraction by which the Groq latency varies between requests')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE',
+                        help='Extra setting for the scenarios, e.g. SCRAPE_CONCURRENCY=8')
+    parser.add_argument('--real-stores', dest='fake_stores', action='store_false',
+                        help='Run the worker path against REDIS_HOST and MONGODB_URI instead of in-memory stores')
+    parser.add_argument('--output', default='reports/benchmark.json')
+    parser.add_argument('--compare', metavar='REPORT', help='Earlier report to compare the results with')
+    parser.add_argument('--threshold', type=float, default=5.0,
+                        help='Changes smaller than this many percent are reported as noise')
+    parser.add_argument('--verbose', action='store_true', help="Show the pipeline's output")
+    args = parser.parse_args(argv)
+
+    # Read the baseline first; it may be the report about to be overwritten
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else None
+    report = asyncio.run(run(args))
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print_summary(report)
+    print(f"\nReport written to {output}")
+
+    if baseline is not None:
+        print_comparison(compare(baseline, report, args.threshold), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Runs one benchmark scenario in a fresh process and writes its measurements as JSON.
+
+Started by run_benchmarks.py with the board pointed at the fixture server,
+GROQ_API_URL at the fake Groq and the backend on PYTHONPATH. A process per
+scenario keeps peak RSS, browsers and module-level state from leaking
+between scenarios.
+"""
+import argparse
+import asyncio
+import json
+import math
+import resource
+import sys
+import time
+import traceback
+
+try:
+    import psutil
+except ImportError:  # Peak RSS then covers this process only, not its browsers
+    psutil = None
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values``, or None when there are none."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def round_ms(value):
+    return round(value, 1) if value is not None else None
+
+
+class SpanCollector:
+    """Tracing exporter keeping the durations of finished spans by name."""
+
+    def __init__(self):
+        self.durations = {}
+
+    def export(self, span):
+        self.durations.setdefault(span.name, []).append((span.end_ns - span.start_ns) / 1e6)
+
+    def close(self):
+        pass
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+class ResourceSampler:
+    """Samples the resident memory of the process and its browsers, and the live browser count."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_rss_mb = 0.0
+        self.peak_browsers = 0
+        self._process = psutil.Process() if psutil else None
+
+    @property
+    def rss_scope(self):
+        return "process_tree" if self._process else "process"
+
+    def sample(self):
+        if self._process:
+            rss = self._process.memory_info().rss
+            for child in self._process.children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            self.peak_rss_mb = max(self.peak_rss_mb, rss / 1024 / 1024)
+        else:
+            self.peak_rss_mb = max(self.peak_rss_mb, peak_rss_mb())
+        self.peak_browsers = max(self.peak_browsers, int(metric_sample('jobboard_active_browsers') or 0))
+
+    async def run(self, stopping):
+        while not stopping.is_set():
+            self.sample()
+            try:
+                await asyncio.wait_for(stopping.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+        self.sample()
+
+
+def metric_sample(name, **labels):
+    """Current value of a Prometheus sample, or None when metrics are disabled."""
+    from job_boards.metrics import metrics_enabled
+    if not metrics_enabled():
+        return None
+    import prometheus_client
+    return prometheus_client.REGISTRY.get_sample_value(name, labels)
+
+
+def page_loads(board):
+    """Pages loaded per page type and method, from the page load histogram."""
+    loads = {}
+    for page in ('search', 'detail'):
+        for method in ('http', 'browser'):
+            count = metric_sample('jobboard_page_load_seconds_count', board=board, page=page, method=method)
+            if count:
+                loads[f"{page}/{method}"] = int(count)
+    return loads
+
+
+def use_fake_stores():
+    """Back the API and worker with in-memory Redis and MongoDB so the benchmark runs offline.
+
+    Every Redis client created afterwards, sync or asyncio, shares one in-memory server.
+    """
+    import functools
+    import fakeredis
+    import mongomock
+    import pymongo
+    import redis
+    import redis.asyncio
+    server = fakeredis.FakeServer()
+    redis.Redis = functools.partial(fakeredis.FakeRedis, server=server)
+    redis.asyncio.Redis = functools.partial(fakeredis.FakeAsyncRedis, server=server)
+    pymongo.MongoClient = mongomock.MongoClient
+
+
+async def run_cli(board, title, limit):
+    """Scrape like the command line does: one board, no queue, no database."""
+    from job_boards.pipeline import load_board_class, run_search
+    results = await run_search(load_board_class(board)(title), limit, force_refresh=True)
+    return [result for result in results if result]
+
+
+async def run_worker(board, title, limit):
+    """Create the job through the API and run it as a worker: queue, progress, MongoDB writes."""
+    from app import main as api
+    from app import worker
+    from app.db.listings import job_results
+
+    response = api.app.test_client().post('/api/jobs', json={
+        "board": board, "title": title, "limit": limit, "force_refresh": True
+    })
+    if response.status_code != 200:
+        raise RuntimeError(f"POST /api/jobs answered {response.status_code}: {response.get_data(as_text=True)}")
+    job_id = response.get_json()["job_id"]
+
+    job = await asyncio.to_thread(api.job_queue.reserve, 1)
+    await worker.handle(job)
+    await asyncio.to_thread(api.job_queue.ack, job)
+
+    status = api.redis_client.hget(f"job:{job_id}", "status")
+    if status != "completed":
+        raise RuntimeError(f"Job ended as {status}: {api.redis_client.hget(f'job:{job_id}', 'error')}")
+    return [result["job_data"] for result in job_results(api.db, job_id)]
+
+
+async def measure(path, board, title, limit):
+    from job_boards.artifacts import close_artifact_sink
+    from job_boards.http_fetch import close_page_fetcher
+    from job_boards.llm_client import close_llm_client
+    from job_boards.tracing import init_tracer
+
+    collector = SpanCollector()
+    init_tracer(collector)
+    sampler = ResourceSampler()
+    stopping = asyncio.Event()
+    sampling = asyncio.create_task(sampler.run(stopping))
+
+    start = time.perf_counter()
+    try:
+        if path == 'cli':
+            results = await run_cli(board, title, limit)
+        else:
+            results = await run_worker(board, title, limit)
+        seconds = time.perf_counter() - start
+    finally:
+        stopping.set()
+        await sampling
+        await close_llm_client()
+        await close_page_fetcher()
+        await asyncio.to_thread(close_artifact_sink)
+
+    latencies = collector.durations.get('process_job', [])
+    processed = len(results)
+    return {
+        "status": "ok",
+        "listings": len(latencies),
+        "processed": processed,
+        "failed_analyses": sum(1 for result in results if "error" in (result.get("parsed_description") or {})),
+        "seconds": round(seconds, 4),
+        "listings_per_second": round(processed / seconds, 3) if seconds else None,
+        "latency_ms": {
+            "p50": round_ms(percentile(latencies, 50)),
+            "p95": round_ms(percentile(latencies, 95)),
+            "max": round_ms(max(latencies, default=None))
+        },
+        "peak_rss_mb": round(sampler.peak_rss_mb, 1),
+        "rss_scope": sampler.rss_scope,
+        "peak_browsers": sampler.peak_browsers,
+        "pages": page_loads(board),
+        "llm_requests": len(collector.durations.get('llm.chat', []))
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run one benchmark scenario')
+    parser.add_argument('--path', choices=['cli', 'worker'], required=True)
+    parser.add_argument('--board', required=True)
+    parser.add_argument('--title', default='DevOps Engineer')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--fake-stores', action='store_true',
+                        help='Use in-memory Redis and MongoDB for the worker path')
+    parser.add_argument('--result', required=True, help='File the JSON result is written to')
+    args = parser.parse_args(argv)
+
+    if args.fake_stores:
+        use_fake_stores()
+    try:
+        result = asyncio.run(measure(args.path, args.board, args.title, args.limit))
+    except Exception as e:
+        traceback.print_exc()
+        result = {"status": "error", "error": f"{type(e).__name__}: {str(e)}"}
+    with open(args.result, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+
+
+if __name__ == "__main__":
+    main()